@@ -30,6 +30,7 @@ if IS_V1:
 
     validate_model = lambda cls, *args: cls.parse_obj(*args)
     _model_dump = lambda cls, *args, **kwargs: cls.dict(*args, **kwargs)
+    _model_dump_json = lambda cls, *args, **kwargs: cls.json(*args, **kwargs)
 else:
     from pydantic import RootModel
 
@@ -38,6 +39,7 @@ else:
 
     validate_model = lambda cls, *args, **kwargs: cls.model_validate(*args, **kwargs)
     _model_dump = lambda cls, *args, **kwargs: cls.model_dump(*args, **kwargs)
+    _model_dump_json = lambda cls, *args, **kwargs: cls.model_dump_json(*args, **kwargs)
 
 
 def model_dump(
@@ -61,9 +63,27 @@ def model_dump(
     )
 
 
+def model_dump_json(
+    model: BaseModel,
+    *,
+    by_alias: bool = True,
+    exclude_unset: bool = False,
+    exclude_defaults: bool = False,
+    exclude_none: bool = False,
+) -> str:
+    return _model_dump_json(
+        model,
+        by_alias=by_alias,
+        exclude_unset=exclude_unset,
+        exclude_defaults=exclude_defaults,
+        exclude_none=exclude_none,
+    )
+
+
 __all__ = (
     "BaseModel",
     "RootModel",
     "Field",
     "model_dump",
+    "model_dump_json",
 )
@@ -0,0 +1,237 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
+RunStates = ("pending", "running", "finished", "failed")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "The `numpy` package is required for run analytics, "
+            "install it with `pip install flowdapt_sdk[analytics]`"
+        )
+
+
+def _field(run: Any, name: str) -> Any:
+    return run.get(name) if isinstance(run, dict) else getattr(run, name)
+
+
+def _timestamp(value: datetime | str | None) -> float:
+    if value is None:
+        return float("nan")
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    # Naive timestamps from the API are in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _is_naive_iso(value: Any) -> bool:
+    return (
+        isinstance(value, str)
+        and not value.endswith("Z")
+        and "+" not in value[10:]
+        and "-" not in value[10:]
+    )
+
+
+def _timestamps(values: list[Any]) -> Any:
+    if values and all(_is_naive_iso(value) for value in values):
+        # Naive ISO 8601 strings, as in raw API responses, are parsed in one go
+        try:
+            parsed = np.array(values, dtype="datetime64[us]")
+            return parsed.astype(np.int64) / 1e6
+        except ValueError:
+            pass
+    return np.fromiter((_timestamp(value) for value in values), dtype=np.float64, count=len(values))
+
+
+class RunColumns:
+    """
+    Workflow runs as columnar NumPy arrays, for computing statistics over many runs
+    without going through one Python object per run.
+
+    Timestamps are seconds since the epoch with NaN for runs that have not finished,
+    workflows and states are stored as integer codes into `workflows` and `states`.
+
+    :param workflow: The workflow code of every run.
+    :param state: The state code of every run.
+    :param started_at: The start time of every run.
+    :param finished_at: The finish time of every run.
+    :param workflows: The workflow names the codes refer to.
+    :param states: The state names the codes refer to.
+    """
+    def __init__(
+        self,
+        workflow: Any,
+        state: Any,
+        started_at: Any,
+        finished_at: Any,
+        workflows: list[str],
+        states: list[str],
+    ) -> None:
+        self.workflow = workflow
+        self.state = state
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.workflows = workflows
+        self.states = states
+
+    @classmethod
+    def from_runs(cls, runs: Iterable[Any]) -> RunColumns:
+        """
+        Build the columns from workflow runs, either `WorkflowRunReadResponse` objects
+        or the raw dicts of a decoded response, which skips validating each run.
+
+        :param runs: The workflow runs.
+        :type runs: Iterable[Any]
+        :return: The columns.
+        :rtype: RunColumns
+        """
+        _require_numpy()
+        runs = list(runs)
+
+        workflows, workflow_codes = np.unique(
+            np.array([_field(run, "workflow") for run in runs], dtype=object).astype(str),
+            return_inverse=True,
+        )
+
+        states = list(RunStates)
+        codes = {state: code for code, state in enumerate(states)}
+        state_codes = []
+        for run in runs:
+            state = _field(run, "state")
+            if state not in codes:
+                codes[state] = len(states)
+                states.append(state)
+            state_codes.append(codes[state])
+
+        return cls(
+            workflow=workflow_codes.astype(np.int32),
+            state=np.array(state_codes, dtype=np.int16),
+            started_at=_timestamps([_field(run, "started_at") for run in runs]),
+            finished_at=_timestamps([_field(run, "finished_at") for run in runs]),
+            workflows=workflows.tolist(),
+            states=states,
+        )
+
+    def __len__(self) -> int:
+        return len(self.state)
+
+    def state_code(self, state: str) -> int:
+        return self.states.index(state) if state in self.states else -1
+
+    def select(self, workflow: str | None = None, state: str | None = None) -> RunColumns:
+        """
+        Select the runs of a workflow and/or in a state.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if workflow is not None:
+            code = self.workflows.index(workflow) if workflow in self.workflows else -1
+            mask &= self.workflow == code
+        if state is not None:
+            mask &= self.state == self.state_code(state)
+
+        return RunColumns(
+            workflow=self.workflow[mask],
+            state=self.state[mask],
+            started_at=self.started_at[mask],
+            finished_at=self.finished_at[mask],
+            workflows=self.workflows,
+            states=self.states,
+        )
+
+    @property
+    def durations(self) -> Any:
+        """
+        The duration in seconds of every run, NaN for runs that have not finished.
+        """
+        return self.finished_at - self.started_at
+
+    def duration_percentiles(
+        self,
+        percentiles: Iterable[float] = (50, 90, 95, 99),
+    ) -> dict[float, float]:
+        """
+        Percentiles of the duration in seconds of the finished runs.
+
+        :param percentiles: The percentiles to compute, between 0 and 100.
+        :type percentiles: Iterable[float]
+        :return: A mapping of percentile to duration, NaN if no run has finished.
+        :rtype: dict[float, float]
+        """
+        percentiles = list(percentiles)
+        durations = self.durations
+        durations = durations[~np.isnan(durations)]
+
+        if not len(durations):
+            return {p: float("nan") for p in percentiles}
+
+        return dict(zip(percentiles, np.percentile(durations, percentiles).tolist()))
+
+    def throughput(self, interval: float, field: str = "finished_at") -> tuple[Any, Any]:
+        """
+        Count the runs started or finished in every interval.
+
+        :param interval: The length of an interval in seconds.
+        :type interval: float
+        :param field: Whether to count runs by `started_at` or `finished_at`.
+        :type field: str
+        :return: The start time of every interval and the number of runs in it.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        times = getattr(self, field)
+        times = times[~np.isnan(times)]
+
+        if not len(times):
+            return np.array([], dtype=np.float64), np.array([], dtype=np.int64)
+
+        origin = np.floor(times.min() / interval) * interval
+        counts = np.bincount(((times - origin) // interval).astype(np.int64))
+        return origin + np.arange(len(counts)) * interval, counts
+
+    def failure_rates(self) -> dict[str, float]:
+        """
+        The fraction of completed runs (finished or failed) that failed, per workflow.
+
+        :return: A mapping of workflow name to failure rate, for workflows with completed runs.
+        :rtype: dict[str, float]
+        """
+        size = len(self.workflows)
+        failed = np.bincount(
+            self.workflow[self.state == self.state_code("failed")], minlength=size
+        )
+        completed = failed + np.bincount(
+            self.workflow[self.state == self.state_code("finished")], minlength=size
+        )
+
+        return {
+            workflow: float(failed[code] / completed[code])
+            for code, workflow in enumerate(self.workflows)
+            if completed[code]
+        }
+
+    def queueing_gaps(self) -> Any:
+        """
+        The time between a run finishing and the next run of the same workflow starting.
+
+        Negative gaps mean runs of the workflow overlapped, e.g. because they queued up
+        behind each other, consistently large gaps mean there is spare capacity.
+
+        :return: The gap in seconds before every run but the first of each workflow,
+            in order of workflow and start time. NaN where the previous run has not finished.
+        :rtype: numpy.ndarray
+        """
+        order = np.lexsort((self.started_at, self.workflow))
+        workflow = self.workflow[order]
+        same_workflow = workflow[1:] == workflow[:-1]
+
+        gaps = self.started_at[order][1:] - self.finished_at[order][:-1]
+        return gaps[same_workflow]
@@ -1,6 +1,242 @@
-from flowdapt_sdk.client import APIClient
+import asyncio
+from functools import partial
+from typing import Any
+
+from flowdapt_sdk.batching import Batcher
+from flowdapt_sdk.client import APIClient, APIResponse
+from flowdapt_sdk.errors import (
+    APIError,
+    MethodNotAllowed,
+    ResourceNotFoundError,
+    UnsupportedVersionError,
+    error_from_response,
+)
+from flowdapt_sdk.serialize import serialize
+from flowdapt_sdk.utils import Negotiation, NegotiationTable, build_accept_header, build_path
 
 
 class BaseAPI:
     def __init__(self, client: APIClient) -> None:
         self.client = client
+        self._batchers: dict[tuple, Batcher] = {}
+
+    async def request(
+        self,
+        method: str,
+        table: NegotiationTable,
+        endpoint: str,
+        data: Any = None,
+        version: str | None = None,
+        body: Any = None,
+        **kwargs: Any,
+    ) -> tuple[APIResponse, Negotiation]:
+        """
+        Send a request to a versioned endpoint.
+
+        Unless a version is pinned, by `version` or by the model of `data`, the newest
+        version of the endpoint the server reports supporting is used, or the newest
+        version if it does not say. If the server rejects it as unsupported the next
+        older version is tried, and the version the server accepted is remembered by
+        the client so later requests use it directly. A payload with fields the older
+        version cannot represent is not downgraded: it is sent with the latest version
+        instead, and the error is raised if the server rejects it.
+
+        :param method: The HTTP method.
+        :type method: str
+        :param table: The negotiation table of the endpoint.
+        :type table: NegotiationTable
+        :param endpoint: The endpoint to send the request to.
+        :type endpoint: str
+        :param data: The payload of the request, dicts are validated into the request
+            DTO of the version.
+        :type data: Any
+        :param version: The version of the DTO to use.
+        :type version: str | None
+        :param body: A payload sent as it is instead of `data`, e.g. workflow input.
+        :type body: Any
+        :return: The response and the negotiation it was sent with.
+        :rtype: tuple[APIResponse, Negotiation]
+        """
+        payload = data
+        pinned = table.pinned(data, version) is not None
+        default = await self.client.negotiated_version(table)
+        try:
+            # An older negotiated version must not silently drop fields either
+            negotiation, data = table.negotiate(
+                payload, version, default=default,
+                lossless=not pinned and default not in (None, table.latest),
+            )
+        except ValueError:
+            if pinned:
+                raise
+            # The server may have been upgraded since, let it reject the latest version
+            negotiation, data = table.negotiate(payload, default=table.latest)
+
+        while True:
+            try:
+                response = await self.client.request(
+                    method,
+                    endpoint,
+                    body=data if data is not None else body,
+                    headers=negotiation.headers,
+                    accept=negotiation.accept,
+                    **kwargs,
+                )
+            except UnsupportedVersionError as error:
+                older = None if pinned else table.older(negotiation.version)
+                if older is None:
+                    raise
+
+                try:
+                    negotiation, data = table.negotiate(payload, older, lossless=True)
+                except ValueError as e:
+                    # Sending the payload to the older version would silently drop fields
+                    raise error from e
+
+                self.client.negotiated_versions[table] = older
+                continue
+
+            return response, negotiation
+
+    async def get_resource(
+        self,
+        table: NegotiationTable,
+        endpoint: str,
+        identifier: Any,
+        version: str | None = None,
+    ) -> Any:
+        """
+        Get a resource by its identifier.
+
+        If the client batches, the gets of an endpoint made within the batching window
+        are sent together, see `get_resources`.
+
+        :param table: The negotiation table of the endpoint.
+        :type table: NegotiationTable
+        :param endpoint: The endpoint of the resource, with an `{identifier}` parameter.
+        :type endpoint: str
+        :param identifier: The identifier of the resource.
+        :type identifier: Any
+        :param version: The version of the DTO to use.
+        :type version: str | None
+        :return: The resource.
+        :rtype: Any
+        """
+        if self.client.batching is None:
+            return await self._get_resource(table, endpoint, str(identifier), version)
+
+        key = (table, endpoint, version)
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            batcher = self._batchers[key] = Batcher(
+                partial(self.get_resources, table, endpoint, version=version),
+                self.client.batching,
+            )
+
+        return await batcher.load(str(identifier))
+
+    async def get_resources(
+        self,
+        table: NegotiationTable,
+        endpoint: str,
+        identifiers: list[str],
+        version: str | None = None,
+    ) -> list[Any]:
+        """
+        Get several resources of an endpoint at once.
+
+        They are requested in a single request if the server has a batch endpoint,
+        or else concurrently over the pooled connections of the client.
+
+        :return: The resource, or the error getting it, for every identifier in order.
+        :rtype: list[Any]
+        """
+        if len(identifiers) > 1:
+            capabilities = await self.client.server_capabilities()
+            if capabilities is not None and capabilities.batch_endpoint:
+                try:
+                    return await self._get_batch(
+                        capabilities.batch_endpoint, table, endpoint, identifiers, version
+                    )
+                except (ResourceNotFoundError, MethodNotAllowed):
+                    # The batch endpoint is gone, e.g. after a downgrade of the server
+                    pass
+
+        return await asyncio.gather(
+            *(
+                self._get_resource(table, endpoint, identifier, version)
+                for identifier in identifiers
+            ),
+            return_exceptions=True,
+        )
+
+    async def _get_resource(
+        self,
+        table: NegotiationTable,
+        endpoint: str,
+        identifier: str,
+        version: str | None,
+    ) -> Any:
+        response, negotiation = await self.request(
+            "GET",
+            table,
+            endpoint=endpoint,
+            version=version,
+            params={"identifier": identifier},
+        )
+
+        return await self.client.validate(response, negotiation.response_dto)
+
+    async def _get_batch(
+        self,
+        batch_endpoint: str,
+        table: NegotiationTable,
+        endpoint: str,
+        identifiers: list[str],
+        version: str | None,
+    ) -> list[Any]:
+        negotiation, _ = table.negotiate(
+            version=version, default=await self.client.negotiated_version(table)
+        )
+        headers = {**negotiation.headers, "Accept": build_accept_header(negotiation.accept)}
+
+        response = await self.client.post(
+            endpoint=batch_endpoint,
+            body={
+                "requests": [
+                    {
+                        "method": "GET",
+                        "path": build_path(endpoint, {"identifier": identifier}),
+                        "headers": headers,
+                    }
+                    for identifier in identifiers
+                ]
+            },
+        )
+
+        items = response.content["responses"]
+        if len(items) != len(identifiers):
+            raise APIError(
+                f"Batch returned {len(items)} responses for {len(identifiers)} requests"
+            )
+
+        results = []
+        for item in items:
+            status_code = item["status_code"]
+            item_headers = item.get("headers") or {}
+            content = item.get("body")
+
+            if status_code >= 400:
+                results.append(error_from_response(
+                    status_code,
+                    item_headers,
+                    serialize(content) if content is not None else b"",
+                ))
+                continue
+
+            results.append(await self.client.validate(
+                APIResponse.from_content(response.request, status_code, item_headers, content),
+                negotiation.response_dto,
+            ))
+
+        return results
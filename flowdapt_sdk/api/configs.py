@@ -1,7 +1,6 @@
 from typing import Union
 from uuid import UUID
 
-from flowdapt_sdk._compat import validate_model, model_dump
 from flowdapt_sdk.api.base import BaseAPI
 from flowdapt_sdk.dto.configs import (
     V1Alpha1ConfigResourceCreateRequest,
@@ -12,11 +11,8 @@ from flowdapt_sdk.dto.configs import (
     V1Alpha1ConfigResourceUpdateResponse,
     V1Alpha1ConfigResourceReadResponse,
 )
-from flowdapt_sdk.constants import APIVersionHeader
-from flowdapt_sdk.utils import (
-    build_request_data,
-    build_version_header,
-)
+from flowdapt_sdk.watch import Watcher
+from flowdapt_sdk.utils import NegotiationTable
 
 ResourceType = "config"
 
@@ -39,6 +35,9 @@ ConfigUpdateRequestDTOs = {
 ConfigReadRequestDTOs = {
     "v1alpha1": (None, V1Alpha1ConfigResourceReadResponse),
 }
+ConfigCreateRequestTable = NegotiationTable(ResourceType, ConfigCreateRequestDTOs)
+ConfigUpdateRequestTable = NegotiationTable(ResourceType, ConfigUpdateRequestDTOs)
+ConfigReadRequestTable = NegotiationTable(ResourceType, ConfigReadRequestDTOs)
 
 ConfigReadResponse = V1Alpha1ConfigResourceReadResponse
 ConfigCreateRequest = Union[
@@ -69,15 +68,14 @@ class ConfigsAPI(BaseAPI):
         :return: A list of configs.
         :rtype: list[ConfigReadResponse]
         """
-        response_dto, _, version = build_request_data(ConfigReadRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            ConfigReadRequestTable,
             endpoint="/configs/",
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            version=version,
         )
 
-        return [validate_model(response_dto, data) for data in response.content]
+        return await self.client.validate(response, negotiation.response_dto, many=True)
 
     async def create_config(
         self,
@@ -94,20 +92,15 @@ class ConfigsAPI(BaseAPI):
         :return: The new config.
         :rtype: ConfigCreateResponse
         """
-        response_dto, data, version = build_request_data(
-            ConfigCreateRequestDTOs,
-            data=data,
-            version=version
-        )
-
-        response = await self.client.post(
+        response, negotiation = await self.request(
+            "POST",
+            ConfigCreateRequestTable,
             endpoint="/configs/",
-            body=model_dump(data),
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            data=data,
+            version=version,
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
 
     async def get_config(
         self,
@@ -124,17 +117,13 @@ class ConfigsAPI(BaseAPI):
         :return: The config.
         :rtype: ConfigReadResponse
         """
-        response_dto, _, version = build_request_data(ConfigReadRequestDTOs, version=version)
-
-        response = await self.client.get(
-            endpoint=f"/configs/{identifier}",
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+        return await self.get_resource(
+            ConfigReadRequestTable,
+            endpoint="/configs/{identifier}",
+            identifier=identifier,
+            version=version,
         )
 
-        return validate_model(response_dto, response.content)
-
     async def update_config(
         self,
         identifier: str | UUID,
@@ -153,21 +142,16 @@ class ConfigsAPI(BaseAPI):
         :return: The updated config.
         :rtype: ConfigUpdateResponse
         """
-        response_dto, data, version = build_request_data(
-            ConfigUpdateRequestDTOs,
-            data=data,
-            version=version
-        )
-
-        response = await self.client.put(
+        response, negotiation = await self.request(
+            "PUT",
+            ConfigUpdateRequestTable,
             endpoint=f"/configs/{identifier}",
-            body=model_dump(data),
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+            data=data,
+            version=version,
+            params={"identifier": identifier},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
 
     async def delete_config(self, identifier: str | UUID, version: str | None = None) -> None:
         """
@@ -179,13 +163,36 @@ class ConfigsAPI(BaseAPI):
         :type version: str | None
         :return: None
         """
-        response_dto, _, version = build_request_data(ConfigReadRequestDTOs, version=version)
-
-        response = await self.client.delete(
+        response, negotiation = await self.request(
+            "DELETE",
+            ConfigReadRequestTable,
             endpoint=f"/configs/{identifier}",
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+            version=version,
+            params={"identifier": identifier},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
+
+    def watch_configs(
+        self,
+        interval: float = 1.0,
+        initial: bool = True,
+        version: str | None = None,
+    ) -> Watcher[ConfigReadResponse]:
+        """
+        Watch configs for changes.
+
+        :param interval: Seconds to wait between polls.
+        :type interval: float
+        :param initial: Whether to emit `added` events for the configs that already exist.
+        :type initial: bool
+        :param version: The version of the DTO to use. Defaults to the latest supported version.
+        :type version: str | None
+        :return: An async iterator of config change events.
+        :rtype: Watcher[ConfigReadResponse]
+        """
+        return Watcher(
+            lambda: self.list_configs(version=version),
+            interval=interval,
+            initial=initial,
+        )
@@ -1,19 +1,16 @@
 from datetime import datetime
 
-from flowdapt_sdk._compat import validate_model
 from flowdapt_sdk.api.base import BaseAPI
-from flowdapt_sdk.constants import APIVersionHeader
-from flowdapt_sdk.utils import (
-    build_request_data,
-    build_version_header,
-)
+from flowdapt_sdk.utils import NegotiationTable
 from flowdapt_sdk.dto import V1Alpha1Metrics
+from flowdapt_sdk.dto.compact import compact_metrics
 
 ResourceType = "metrics"
 
 MetricsRequestDTOs = {
     "v1alpha1": (None, V1Alpha1Metrics),
 }
+MetricsRequestTable = NegotiationTable(ResourceType, MetricsRequestDTOs)
 MetricsResponse = V1Alpha1Metrics
 
 
@@ -31,7 +28,8 @@ class MetricsAPI(BaseAPI):
         end_time: datetime | None = None,
         max_length: int | None = None,
         version: str | None = None,
-    ) -> MetricsResponse:
+        compact: bool = False,
+    ) -> MetricsResponse | dict | None:
         """
         Get metrics from the Flowdapt API.
 
@@ -45,21 +43,27 @@ class MetricsAPI(BaseAPI):
         :type max_length: int
         :param version: The version of the DTO to use. Defaults to the latest supported version.
         :type version: str
+        :param compact: Whether to return a mapping of metric name to data points with count
+            values as compact `CompactMetricsCountValue` records instead of a full model,
+            None if the server has no metrics.
+        :type compact: bool
         :return: The response from the metrics endpoint.
-        :rtype: MetricsResponse
+        :rtype: MetricsResponse | dict | None
         """
-        response_dto, _, version = build_request_data(MetricsRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            MetricsRequestTable,
             endpoint="/metrics",
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
+            version=version,
             query={
                 "name": name,
                 "start_time": start_time,
                 "end_time": end_time,
                 "max_length": max_length,
             },
-            accept=[(response_dto.__content_type__, 1.0)],
         )
 
-        return validate_model(response_dto, response.content)
+        if compact:
+            return compact_metrics(response.content)
+
+        return await self.client.validate(response, negotiation.response_dto)
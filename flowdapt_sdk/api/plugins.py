@@ -1,20 +1,28 @@
+import asyncio
+import os
+from pathlib import Path
 from typing import AsyncIterator
 
-from flowdapt_sdk._compat import validate_model
 from flowdapt_sdk.api.base import BaseAPI
-from flowdapt_sdk.utils import build_version_header, build_request_data
-from flowdapt_sdk.constants import APIVersionHeader
+from flowdapt_sdk.errors import APIError
+from flowdapt_sdk.mirror import MirrorEntry, PluginMirror, SyncResult, resolve_target
+from flowdapt_sdk.utils import NegotiationTable
 from flowdapt_sdk.dto import V1Alpha1Plugin, V1Alpha1PluginFiles
 
 PluginResourceType = "plugin"
 PluginFileResourceType = "plugin.files"
 
+# Downloaded chunks are written to disk in batches of this many bytes
+WriteBufferSize = 1024 * 1024
+
 PluginRequestDTOs = {
     "v1alpha1": (None, V1Alpha1Plugin),
 }
 PluginFileRequestDTOs = {
     "v1alpha1": (None, V1Alpha1PluginFiles),
 }
+PluginRequestTable = NegotiationTable(PluginResourceType, PluginRequestDTOs)
+PluginFileRequestTable = NegotiationTable(PluginFileResourceType, PluginFileRequestDTOs)
 
 PluginResponse = V1Alpha1Plugin
 PluginFileResponse = V1Alpha1PluginFiles
@@ -38,16 +46,15 @@ class PluginsAPI(BaseAPI):
         :return: The response from the plugin endpoint.
         :rtype: PluginResponse
         """
-        response_dto, _, version = build_request_data(PluginRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            PluginRequestTable,
             endpoint="/plugin/{plugin_name}",
-            headers={APIVersionHeader: build_version_header(PluginResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            version=version,
             params={"plugin_name": plugin_name},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
 
     async def list_plugins(self, version: str | None = None) -> list[PluginResponse]:
         """
@@ -58,15 +65,14 @@ class PluginsAPI(BaseAPI):
         :return: A list of plugins.
         :rtype: list[PluginResponse]
         """
-        response_dto, _, version = build_request_data(PluginRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            PluginRequestTable,
             endpoint="/plugin/",
-            headers={APIVersionHeader: build_version_header(PluginResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            version=version,
         )
 
-        return [validate_model(response_dto, data) for data in response.content]
+        return await self.client.validate(response, negotiation.response_dto, many=True)
 
     async def list_plugin_files(
         self,
@@ -83,16 +89,15 @@ class PluginsAPI(BaseAPI):
         :return: The response from the plugin files endpoint.
         :rtype: PluginFileResponse
         """
-        response_dto, _, version = build_request_data(PluginFileRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            PluginFileRequestTable,
             endpoint="/plugin/{plugin_name}/files",
-            headers={APIVersionHeader: build_version_header(PluginFileResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            version=version,
             params={"plugin_name": plugin_name},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
 
     async def get_plugin_file(self, plugin_name: str, file_name: str) -> AsyncIterator[bytes]:
         """
@@ -113,3 +118,167 @@ class PluginsAPI(BaseAPI):
         )
 
         return response.content
+
+    async def _fetch_plugin_file(
+        self,
+        mirror: PluginMirror,
+        plugin_name: str,
+        file_name: str,
+        entry: MirrorEntry | None,
+    ) -> MirrorEntry | None:
+        """
+        Download a plugin file into the mirror, returning None if `entry` is still current.
+        """
+        # Offsets into the partial file are of the decoded file, so ranges must not
+        # be applied to a compressed representation of it
+        headers = {"Accept-Encoding": "identity"}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        elif entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        partial = await asyncio.to_thread(mirror.open_partial, mirror.key(plugin_name, file_name))
+        try:
+            while True:
+                resume_from = partial.validator if partial.offset else None
+                if resume_from:
+                    headers["Range"] = f"bytes={partial.offset}-"
+                    headers["If-Range"] = resume_from
+
+                try:
+                    response = await self.client.get(
+                        endpoint="/plugin/{plugin_name}/files/{file_name}",
+                        headers=headers,
+                        accept=[("application/octet-stream", 1.0)],
+                        params={"plugin_name": plugin_name, "file_name": file_name},
+                        stream=True,
+                    )
+                    break
+                except APIError as e:
+                    if e.status_code != 416 or not resume_from:
+                        raise
+
+                    # The partial download does not match the file anymore, start over
+                    await asyncio.to_thread(partial.restart)
+                    await asyncio.to_thread(mirror.set_validator, partial, None)
+                    del headers["Range"], headers["If-Range"]
+
+            if response.status_code == 304:
+                await response.aclose()
+                return None
+
+            response_headers = {key.lower(): value for key, value in response.headers.items()}
+            etag = response_headers.get("etag")
+            last_modified = response_headers.get("last-modified")
+
+            content_range = response_headers.get("content-range", "")
+            if response.status_code == 206 and content_range.startswith(f"bytes {partial.offset}-"):
+                await asyncio.to_thread(partial.resume)
+            else:
+                await asyncio.to_thread(partial.restart)
+
+            # Weak ETags can not be used with If-Range
+            validator = etag if etag and not etag.startswith("W/") else last_modified
+            await asyncio.to_thread(mirror.set_validator, partial, validator)
+
+            # Chunks are written in batches in a thread, what arrived before an
+            # interruption is still written so the download can be resumed
+            buffer: list[bytes] = []
+            buffered = 0
+            try:
+                async for chunk in response.content:
+                    buffer.append(chunk)
+                    buffered += len(chunk)
+                    if buffered >= WriteBufferSize:
+                        chunks, buffer, buffered = buffer, [], 0
+                        await asyncio.to_thread(partial.writelines, chunks)
+            finally:
+                if buffer:
+                    await asyncio.to_thread(partial.writelines, buffer)
+
+            sha256, size = await asyncio.to_thread(mirror.commit, partial)
+            return MirrorEntry(sha256, size, etag=etag, last_modified=last_modified)
+        finally:
+            mirror.discard(partial)
+
+    async def sync_plugin(
+        self,
+        plugin_name: str,
+        dest: str | os.PathLike,
+        cache_dir: str | os.PathLike | None = None,
+        concurrency: int = 4,
+        version: str | None = None,
+    ) -> SyncResult:
+        """
+        Mirror all files of a plugin to a local directory.
+
+        Files are kept in a content addressed cache, see `flowdapt_sdk.mirror.PluginMirror`,
+        and linked into `dest`. Files that were mirrored before are revalidated with their
+        ETag or Last-Modified date and only downloaded again if they changed, interrupted
+        downloads are resumed with a Range request. Pointing several workers at the same
+        `cache_dir` lets them share downloads. Files that were mirrored before but no longer
+        belong to the plugin are removed from `dest`.
+
+        :param plugin_name: The name of the plugin to mirror.
+        :type plugin_name: str
+        :param dest: The directory to mirror the files to.
+        :type dest: str | os.PathLike
+        :param cache_dir: The directory of the cache. Defaults to `.flowdapt-cache` in `dest`.
+        :type cache_dir: str | os.PathLike | None
+        :param concurrency: The maximum number of files downloaded at once.
+        :type concurrency: int
+        :param version: The version of the DTO to use. Defaults to the latest supported version.
+        :type version: str | None
+        :return: The local paths of the files and what was done to them.
+        :rtype: SyncResult
+        """
+        dest = Path(dest)
+        mirror = PluginMirror(cache_dir or dest / ".flowdapt-cache")
+        files = (await self.list_plugin_files(plugin_name, version=version)).files
+        index = await asyncio.to_thread(mirror.load_index)
+        semaphore = asyncio.Semaphore(concurrency)
+        updates: dict[str, MirrorEntry] = {}
+        result = SyncResult()
+
+        async def sync_file(file_name: str) -> None:
+            target = resolve_target(dest, file_name)
+            key = mirror.key(plugin_name, file_name)
+            entry = index.get(key)
+            if entry and not mirror.object_path(entry.sha256).exists():
+                entry = None
+
+            async with semaphore:
+                fetched = await self._fetch_plugin_file(mirror, plugin_name, file_name, entry)
+
+            current = fetched or entry
+            if current is None:
+                # Only the conditional requests of mirrored files are answered with 304
+                raise APIError(f"Unexpected 304 response for plugin file {file_name}", 304)
+
+            if not await asyncio.to_thread(mirror.is_current, current, target):
+                await asyncio.to_thread(mirror.materialize, current.sha256, target)
+
+            if entry and current.sha256 == entry.sha256:
+                result.unchanged.append(file_name)
+            else:
+                result.downloaded.append(file_name)
+
+            updates[key] = current
+            result.files[file_name] = target
+
+        await asyncio.gather(*(sync_file(file_name) for file_name in files))
+
+        stale = [
+            key for key in index
+            if key.startswith(f"{plugin_name}/") and key.partition("/")[2] not in result.files
+        ]
+        for key in stale:
+            file_name = key.partition("/")[2]
+            target = resolve_target(dest, file_name)
+            # Only remove files that still hold what was mirrored, never local changes
+            if await asyncio.to_thread(mirror.is_current, index[key], target):
+                target.unlink()
+                result.removed.append(file_name)
+
+        await asyncio.to_thread(mirror.update_index, updates, stale)
+        return result
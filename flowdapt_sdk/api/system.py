@@ -1,7 +1,5 @@
-from flowdapt_sdk._compat import validate_model
 from flowdapt_sdk.api.base import BaseAPI
-from flowdapt_sdk.utils import build_version_header, build_request_data
-from flowdapt_sdk.constants import APIVersionHeader
+from flowdapt_sdk.utils import NegotiationTable
 from flowdapt_sdk.dto import V1Alpha1SystemStatus
 
 ResourceType = "system"
@@ -9,6 +7,7 @@ ResourceType = "system"
 SystemStatusRequestDTOs = {
     "v1alpha1": (None, V1Alpha1SystemStatus),
 }
+SystemStatusRequestTable = NegotiationTable(ResourceType, SystemStatusRequestDTOs)
 SystemStatusResponse = V1Alpha1SystemStatus
 
 
@@ -28,12 +27,11 @@ class SystemAPI(BaseAPI):
         :return: The response from the status endpoint.
         :rtype: SystemStatusResponse
         """
-        response_dto, _, version = build_request_data(SystemStatusRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            SystemStatusRequestTable,
             endpoint="/status",
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            version=version,
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
@@ -1,9 +1,8 @@
 from uuid import UUID
 
-from flowdapt_sdk._compat import validate_model, model_dump
 from flowdapt_sdk.api.base import BaseAPI
-from flowdapt_sdk.utils import build_version_header, build_request_data
-from flowdapt_sdk.constants import APIVersionHeader
+from flowdapt_sdk.utils import NegotiationTable
+from flowdapt_sdk.watch import Watcher
 from flowdapt_sdk.dto import (
     V1Alpha1TriggerRuleResourceCreateRequest,
     V1Alpha1TriggerRuleResourceCreateResponse,
@@ -28,6 +27,9 @@ TriggerRuleUpdateRequestDTOs = {
 TriggerRuleReadRequestDTOs = {
     "v1alpha1": (None, V1Alpha1TriggerRuleResourceReadResponse),
 }
+TriggerRuleCreateRequestTable = NegotiationTable(ResourceType, TriggerRuleCreateRequestDTOs)
+TriggerRuleUpdateRequestTable = NegotiationTable(ResourceType, TriggerRuleUpdateRequestDTOs)
+TriggerRuleReadRequestTable = NegotiationTable(ResourceType, TriggerRuleReadRequestDTOs)
 
 TriggerRuleCreateRequest = V1Alpha1TriggerRuleResourceCreateRequest
 TriggerRuleCreateResponse = V1Alpha1TriggerRuleResourceCreateResponse
@@ -52,15 +54,14 @@ class TriggersAPI(BaseAPI):
         :return: A list of triggers.
         :rtype: list[TriggerRuleReadResponse]
         """
-        response_dto, _, version = build_request_data(TriggerRuleReadRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            TriggerRuleReadRequestTable,
             endpoint="/triggers/",
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            version=version,
         )
 
-        return [validate_model(response_dto, data) for data in response.content]
+        return await self.client.validate(response, negotiation.response_dto, many=True)
 
     async def create_trigger(
         self,
@@ -77,20 +78,15 @@ class TriggersAPI(BaseAPI):
         :return: The new trigger.
         :rtype: TriggerRuleCreateResponse
         """
-        response_dto, data, version = build_request_data(
-            TriggerRuleCreateRequestDTOs,
-            data=data,
-            version=version
-        )
-
-        response = await self.client.post(
+        response, negotiation = await self.request(
+            "POST",
+            TriggerRuleCreateRequestTable,
             endpoint="/triggers/",
-            body=model_dump(data),
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            data=data,
+            version=version,
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
 
     async def get_trigger(
         self,
@@ -107,17 +103,13 @@ class TriggersAPI(BaseAPI):
         :return: The trigger.
         :rtype: TriggerRuleReadResponse
         """
-        response_dto, _, version = build_request_data(TriggerRuleReadRequestDTOs, version=version)
-
-        response = await self.client.get(
-            endpoint=f"/triggers/{identifier}",
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+        return await self.get_resource(
+            TriggerRuleReadRequestTable,
+            endpoint="/triggers/{identifier}",
+            identifier=identifier,
+            version=version,
         )
 
-        return validate_model(response_dto, response.content)
-
     async def update_trigger(
         self,
         identifier: str | UUID,
@@ -136,21 +128,16 @@ class TriggersAPI(BaseAPI):
         :return: The updated trigger.
         :rtype: TriggerRuleUpdateResponse
         """
-        response_dto, data, version = build_request_data(
-            TriggerRuleUpdateRequestDTOs,
-            data=data,
-            version=version
-        )
-
-        response = await self.client.put(
+        response, negotiation = await self.request(
+            "PUT",
+            TriggerRuleUpdateRequestTable,
             endpoint=f"/triggers/{identifier}",
-            body=model_dump(data),
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+            data=data,
+            version=version,
+            params={"identifier": identifier},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
 
     async def delete_trigger(
         self,
@@ -166,13 +153,36 @@ class TriggersAPI(BaseAPI):
         :type version: str | None
         :return: None
         """
-        response_dto, _, version = build_request_data(TriggerRuleReadRequestDTOs, version=version)
-
-        response = await self.client.delete(
+        response, negotiation = await self.request(
+            "DELETE",
+            TriggerRuleReadRequestTable,
             endpoint=f"/triggers/{identifier}",
-            headers={APIVersionHeader: build_version_header(ResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+            version=version,
+            params={"identifier": identifier},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
+
+    def watch_triggers(
+        self,
+        interval: float = 1.0,
+        initial: bool = True,
+        version: str | None = None,
+    ) -> Watcher[TriggerRuleReadResponse]:
+        """
+        Watch triggers for changes.
+
+        :param interval: Seconds to wait between polls.
+        :type interval: float
+        :param initial: Whether to emit `added` events for the triggers that already exist.
+        :type initial: bool
+        :param version: The version of the DTO to use. Defaults to the latest supported version.
+        :type version: str | None
+        :return: An async iterator of trigger change events.
+        :rtype: Watcher[TriggerRuleReadResponse]
+        """
+        return Watcher(
+            lambda: self.list_triggers(version=version),
+            interval=interval,
+            initial=initial,
+        )
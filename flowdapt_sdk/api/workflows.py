@@ -1,10 +1,16 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Iterable, Literal, overload
 from uuid import UUID
 
-from flowdapt_sdk._compat import validate_model, model_dump
 from flowdapt_sdk.api.base import BaseAPI
-from flowdapt_sdk.utils import build_version_header, build_request_data
-from flowdapt_sdk.constants import APIVersionHeader
+from flowdapt_sdk.utils import NegotiationTable
+from flowdapt_sdk.errors import APIError
+from flowdapt_sdk.ratelimit import TokenBucket
+from flowdapt_sdk.retention import CleanupProgress, DefaultCleanupStates, select_runs
+from flowdapt_sdk.watch import Watcher, run_key, run_version
 from flowdapt_sdk.dto import (
+    CompactWorkflowRun,
     V1Alpha1WorkflowResourceCreateRequest,
     V1Alpha1WorkflowResourceCreateResponse,
     V1Alpha1WorkflowResourceUpdateRequest,
@@ -34,6 +40,10 @@ WorkflowReadRequestDTOs = {
 WorkflowRunReadRequestDTOs = {
     "v1alpha1": (None, V1Alpha1WorkflowRunReadResponse),
 }
+WorkflowCreateRequestTable = NegotiationTable(WorkflowResourceType, WorkflowCreateRequestDTOs)
+WorkflowUpdateRequestTable = NegotiationTable(WorkflowResourceType, WorkflowUpdateRequestDTOs)
+WorkflowReadRequestTable = NegotiationTable(WorkflowResourceType, WorkflowReadRequestDTOs)
+WorkflowRunReadRequestTable = NegotiationTable(WorkflowRunResourceType, WorkflowRunReadRequestDTOs)
 
 WorkflowCreateRequest = V1Alpha1WorkflowResourceCreateRequest
 WorkflowCreateResponse = V1Alpha1WorkflowResourceCreateResponse
@@ -58,15 +68,14 @@ class WorkflowsAPI(BaseAPI):
         :return: A list of workflows.
         :rtype: list[WorkflowReadResponse]
         """
-        response_dto, _, version = build_request_data(WorkflowReadRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            WorkflowReadRequestTable,
             endpoint="/workflows/",
-            headers={APIVersionHeader: build_version_header(WorkflowResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            version=version,
         )
 
-        return [validate_model(response_dto, data) for data in response.content]
+        return await self.client.validate(response, negotiation.response_dto, many=True)
 
     async def create_workflow(
         self,
@@ -83,20 +92,15 @@ class WorkflowsAPI(BaseAPI):
         :return: The new workflow.
         :rtype: WorkflowCreateResponse
         """
-        response_dto, data, version = build_request_data(
-            WorkflowCreateRequestDTOs,
-            data=data,
-            version=version
-        )
-
-        response = await self.client.post(
+        response, negotiation = await self.request(
+            "POST",
+            WorkflowCreateRequestTable,
             endpoint="/workflows/",
-            body=model_dump(data),
-            headers={APIVersionHeader: build_version_header(WorkflowResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            data=data,
+            version=version,
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
 
     async def get_workflow(
         self,
@@ -113,16 +117,15 @@ class WorkflowsAPI(BaseAPI):
         :return: The workflow.
         :rtype: WorkflowReadResponse
         """
-        response_dto, _, version = build_request_data(WorkflowReadRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            WorkflowReadRequestTable,
             endpoint=f"/workflows/{identifier}",
-            headers={APIVersionHeader: build_version_header(WorkflowResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+            version=version,
+            params={"identifier": identifier},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
 
     async def update_workflow(
         self,
@@ -142,21 +145,16 @@ class WorkflowsAPI(BaseAPI):
         :return: The updated workflow.
         :rtype: WorkflowUpdateResponse
         """
-        response_dto, data, version = build_request_data(
-            WorkflowUpdateRequestDTOs,
-            data=data,
-            version=version
-        )
-
-        response = await self.client.put(
+        response, negotiation = await self.request(
+            "PUT",
+            WorkflowUpdateRequestTable,
             endpoint=f"/workflows/{identifier}",
-            body=model_dump(data),
-            headers={APIVersionHeader: build_version_header(WorkflowResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+            data=data,
+            version=version,
+            params={"identifier": identifier},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
 
     async def delete_workflow(
         self,
@@ -172,23 +170,44 @@ class WorkflowsAPI(BaseAPI):
         :type version: str | None
         :return: None
         """
-        response_dto, _, version = build_request_data(WorkflowReadRequestDTOs, version=version)
-
-        response = await self.client.delete(
+        response, negotiation = await self.request(
+            "DELETE",
+            WorkflowReadRequestTable,
             endpoint=f"/workflows/{identifier}",
-            headers={APIVersionHeader: build_version_header(WorkflowResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+            version=version,
+            params={"identifier": identifier},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
+
+    @overload
+    async def list_workflow_runs(
+        self,
+        identifier: str | UUID,
+        limit: int = ...,
+        version: str | None = ...,
+        compact: Literal[False] = ...,
+    ) -> list[WorkflowRunReadResponse]:
+        ...
+
+    @overload
+    async def list_workflow_runs(
+        self,
+        identifier: str | UUID,
+        limit: int = ...,
+        version: str | None = ...,
+        *,
+        compact: Literal[True],
+    ) -> list[CompactWorkflowRun]:
+        ...
 
     async def list_workflow_runs(
         self,
         identifier: str | UUID,
         limit: int = 10,
         version: str | None = None,
-    ) -> list[WorkflowRunReadResponse]:
+        compact: bool = False,
+    ) -> list[WorkflowRunReadResponse] | list[CompactWorkflowRun]:
         """
         List all runs for a workflow.
 
@@ -198,20 +217,24 @@ class WorkflowsAPI(BaseAPI):
         :type limit: int
         :param version: The version of the DTO to use. Defaults to the latest supported version.
         :type version: str | None
+        :param compact: Whether to return compact `CompactWorkflowRun` records, which take
+            a fraction of the memory, instead of full models.
+        :type compact: bool
         :return: A list of workflow runs.
-        :rtype: list[WorkflowRunReadResponse]
+        :rtype: list[WorkflowRunReadResponse] | list[CompactWorkflowRun]
         """
-        response_dto, _, version = build_request_data(WorkflowRunReadRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            WorkflowRunReadRequestTable,
             endpoint=f"/workflows/{identifier}/run",
-            headers={APIVersionHeader: build_version_header(WorkflowRunResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            version=version,
             params={"identifier": identifier},
-            query={"limit": limit}
+            query={"limit": limit},
         )
 
-        return [validate_model(response_dto, data) for data in response.content]
+        return await self.client.validate(
+            response, CompactWorkflowRun if compact else negotiation.response_dto, many=True
+        )
 
     async def get_workflow_run(
         self,
@@ -228,16 +251,95 @@ class WorkflowsAPI(BaseAPI):
         :return: The workflow run.
         :rtype: WorkflowRunReadResponse
         """
-        response_dto, _, version = build_request_data(WorkflowRunReadRequestDTOs, version=version)
-
-        response = await self.client.get(
+        response, negotiation = await self.request(
+            "GET",
+            WorkflowRunReadRequestTable,
             endpoint=f"/workflows/run/{identifier}",
-            headers={APIVersionHeader: build_version_header(WorkflowRunResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+            version=version,
+            params={"identifier": identifier},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
+
+    async def _fetch_workflow_runs(
+        self,
+        identifiers: Iterable[str | UUID],
+        concurrency: int,
+        version: str | None,
+    ) -> AsyncIterator[tuple[str, WorkflowRunReadResponse]]:
+        identifiers = iter(dict.fromkeys(str(identifier) for identifier in identifiers))
+        pending: dict[asyncio.Future, str] = {}
+
+        def schedule() -> None:
+            for identifier in identifiers:
+                task = asyncio.ensure_future(self.get_workflow_run(identifier, version=version))
+                pending[task] = identifier
+                if len(pending) >= concurrency:
+                    break
+
+        try:
+            schedule()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield pending.pop(task), task.result()
+                schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def iter_workflow_runs(
+        self,
+        identifiers: Iterable[str | UUID],
+        concurrency: int = 10,
+        version: str | None = None,
+    ) -> AsyncIterator[WorkflowRunReadResponse]:
+        """
+        Get many workflow runs concurrently, yielding them as they arrive.
+
+        At most `concurrency` runs are requested at once over the client's pooled
+        connections, and only as the consumer keeps up, so iterating over any number
+        of runs needs memory for `concurrency` of them at a time. Identifiers given
+        more than once are requested and yielded once.
+
+        :param identifiers: The identifiers of the workflow runs.
+        :type identifiers: Iterable[str | UUID]
+        :param concurrency: The maximum number of runs requested at once.
+        :type concurrency: int
+        :param version: The version of the DTO to use. Defaults to the latest supported version.
+        :type version: str | None
+        :return: An async iterator of the workflow runs, in the order they arrive.
+        :rtype: AsyncIterator[WorkflowRunReadResponse]
+        """
+        async for _, run in self._fetch_workflow_runs(identifiers, concurrency, version):
+            yield run
+
+    async def get_workflow_runs(
+        self,
+        identifiers: Iterable[str | UUID],
+        concurrency: int = 10,
+        version: str | None = None,
+    ) -> list[WorkflowRunReadResponse]:
+        """
+        Get many workflow runs concurrently.
+
+        Identifiers given more than once are only requested once, see `iter_workflow_runs`.
+
+        :param identifiers: The identifiers of the workflow runs.
+        :type identifiers: Iterable[str | UUID]
+        :param concurrency: The maximum number of runs requested at once.
+        :type concurrency: int
+        :param version: The version of the DTO to use. Defaults to the latest supported version.
+        :type version: str | None
+        :return: The workflow runs, in the order of `identifiers`.
+        :rtype: list[WorkflowRunReadResponse]
+        """
+        keys = [str(identifier) for identifier in identifiers]
+        runs = {
+            key: run
+            async for key, run in self._fetch_workflow_runs(keys, concurrency, version)
+        }
+        return [runs[key] for key in keys]
 
     async def delete_workflow_run(
         self,
@@ -254,21 +356,124 @@ class WorkflowsAPI(BaseAPI):
         :return: The deleted workflow run.
         :rtype: WorkflowRunReadResponse
         """
-        response_dto, _, version = build_request_data(WorkflowRunReadRequestDTOs, version=version)
-
-        response = await self.client.delete(
+        response, negotiation = await self.request(
+            "DELETE",
+            WorkflowRunReadRequestTable,
             endpoint=f"/workflows/run/{identifier}",
-            headers={APIVersionHeader: build_version_header(WorkflowRunResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
-            params={"identifier": identifier}
+            version=version,
+            params={"identifier": identifier},
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
+
+    async def cleanup_workflow_runs(
+        self,
+        identifier: str | UUID,
+        states: Iterable[str] | None = DefaultCleanupStates,
+        started_before: datetime | timedelta | None = None,
+        finished_before: datetime | timedelta | None = None,
+        limit: int = 1000,
+        concurrency: int = 5,
+        rate: float | None = None,
+        dry_run: bool = False,
+        progress: Callable[[CleanupProgress], None] | None = None,
+        version: str | None = None,
+    ) -> CleanupProgress:
+        """
+        Delete the runs of a workflow matching a retention policy.
+
+        The newest `limit` runs of the workflow are listed and filtered by state and age,
+        see `flowdapt_sdk.retention.select_runs`, then deleted with at most `concurrency`
+        deletions in flight and at most `rate` deletions per second. A run that fails to
+        be deleted is recorded and does not stop the others. The runs are listed again
+        after every pass of deletions until the listing is exhausted, or no run of a pass
+        could be deleted, in which case `CleanupProgress.more` tells that older runs may
+        not have been reached. A dry run only looks at the first listing.
+
+        :param identifier: The identifier of the workflow.
+        :type identifier: str | UUID
+        :param states: The states of the runs to delete, None for any state. Defaults to
+            runs that are no longer running.
+        :type states: Iterable[str] | None
+        :param started_before: Only delete runs started before this time, or longer ago
+            than this duration.
+        :type started_before: datetime | timedelta | None
+        :param finished_before: Only delete runs finished before this time, or longer ago
+            than this duration.
+        :type finished_before: datetime | timedelta | None
+        :param limit: The maximum number of runs to list at a time.
+        :type limit: int
+        :param concurrency: The maximum number of deletions in flight.
+        :type concurrency: int
+        :param rate: The maximum number of deletions per second, None for no limit.
+        :type rate: float | None
+        :param dry_run: Only select the runs that would be deleted.
+        :type dry_run: bool
+        :param progress: A function called with the progress after every deletion.
+        :type progress: Callable[[CleanupProgress], None] | None
+        :param version: The version of the DTO to use. Defaults to the latest supported version.
+        :type version: str | None
+        :return: The selected, deleted and failed runs.
+        :rtype: CleanupProgress
+        """
+        report = CleanupProgress([], dry_run=dry_run)
+        semaphore = asyncio.Semaphore(concurrency)
+        bucket = TokenBucket(rate) if rate else None
+
+        async def delete(uid: str) -> None:
+            async with semaphore:
+                if bucket:
+                    await bucket.acquire()
+                try:
+                    await self.delete_workflow_run(uid, version=version)
+                    report.deleted.append(uid)
+                except APIError as e:
+                    report.failed[uid] = e
+
+            if progress:
+                progress(report)
+
+        # The runs are listed newest first without paging, so the runs past the first
+        # `limit` are reached by listing again once the listed ones are deleted
+        while True:
+            listed = await self.list_workflow_runs(
+                identifier, limit=limit, version=version, compact=True
+            )
+            report.more = len(listed) >= limit
+
+            seen = set(report.selected)
+            runs = [
+                uid
+                for uid in (
+                    str(run.uid)
+                    for run in select_runs(
+                        listed,
+                        states=states,
+                        started_before=started_before,
+                        finished_before=finished_before,
+                    )
+                )
+                if uid not in seen
+            ]
+            report.selected.extend(runs)
+
+            if dry_run or not runs:
+                break
+
+            deleted = len(report.deleted)
+            await asyncio.gather(*(delete(uid) for uid in runs))
+
+            if not report.more or len(report.deleted) == deleted:
+                break
+
+        if progress and (dry_run or not report.done):
+            progress(report)
+        return report
 
     async def run_workflow(
         self,
         identifier: str | UUID,
-        input: dict | None = None,
+        input: dict | bytes | Any | None = None,
         wait: bool = True,
         namespace: str | None = None,
         version: str | None = None,
@@ -278,8 +483,10 @@ class WorkflowsAPI(BaseAPI):
 
         :param identifier: The identifier of the workflow to run.
         :type identifier: str | UUID
-        :param input: The input data for the workflow.
-        :type input: dict | None
+        :param input: The input data for the workflow. Bytes-like objects, NumPy arrays and
+            Arrow tables are sent as binary payloads, file-like objects and (async) iterables
+            of chunks are streamed as they are read, see `flowdapt_sdk.binary`.
+        :type input: dict | bytes | Any | None
         :param wait: Whether to wait for the run to complete.
         :type wait: bool
         :param namespace: The namespace to run the workflow in.
@@ -289,15 +496,74 @@ class WorkflowsAPI(BaseAPI):
         :return: The workflow run.
         :rtype: WorkflowRunReadResponse
         """
-        response_dto, _, version = build_request_data(WorkflowRunReadRequestDTOs, version=version)
-
-        response = await self.client.post(
+        response, negotiation = await self.request(
+            "POST",
+            WorkflowRunReadRequestTable,
             endpoint=f"/workflows/{identifier}/run",
             body=input,
-            headers={APIVersionHeader: build_version_header(WorkflowRunResourceType, version)},
-            accept=[(response_dto.__content_type__, 1.0)],
+            version=version,
             query={"wait": wait, "namespace": namespace},
-            params={"identifier": identifier}
+            params={"identifier": identifier},
+            long_poll=wait,
         )
 
-        return validate_model(response_dto, response.content)
+        return await self.client.validate(response, negotiation.response_dto)
+
+    def watch_workflows(
+        self,
+        interval: float = 1.0,
+        initial: bool = True,
+        version: str | None = None,
+    ) -> Watcher[WorkflowReadResponse]:
+        """
+        Watch workflows for changes.
+
+        :param interval: Seconds to wait between polls.
+        :type interval: float
+        :param initial: Whether to emit `added` events for the workflows that already exist.
+        :type initial: bool
+        :param version: The version of the DTO to use. Defaults to the latest supported version.
+        :type version: str | None
+        :return: An async iterator of workflow change events.
+        :rtype: Watcher[WorkflowReadResponse]
+        """
+        return Watcher(
+            lambda: self.list_workflows(version=version),
+            interval=interval,
+            initial=initial,
+        )
+
+    def watch_workflow_runs(
+        self,
+        identifier: str | UUID,
+        limit: int = 10,
+        interval: float = 1.0,
+        initial: bool = True,
+        version: str | None = None,
+    ) -> Watcher[WorkflowRunReadResponse]:
+        """
+        Watch the runs of a workflow for state changes.
+
+        Only the latest `limit` runs are watched, runs that fall out of that
+        window are reported as deleted.
+
+        :param identifier: The identifier of the workflow.
+        :type identifier: str | UUID
+        :param limit: The maximum number of runs to watch.
+        :type limit: int
+        :param interval: Seconds to wait between polls.
+        :type interval: float
+        :param initial: Whether to emit `added` events for the runs that already exist.
+        :type initial: bool
+        :param version: The version of the DTO to use. Defaults to the latest supported version.
+        :type version: str | None
+        :return: An async iterator of workflow run change events.
+        :rtype: Watcher[WorkflowRunReadResponse]
+        """
+        return Watcher(
+            lambda: self.list_workflow_runs(identifier, limit=limit, version=version),
+            key=run_key,
+            version=run_version,
+            interval=interval,
+            initial=initial,
+        )
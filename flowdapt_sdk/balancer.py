@@ -0,0 +1,138 @@
+from __future__ import annotations
+import asyncio
+import itertools
+import time
+from enum import Enum
+from typing import Awaitable, Callable
+
+
+class BalancingStrategy(str, Enum):
+    round_robin = "round_robin"
+    least_outstanding = "least_outstanding"
+    ewma = "ewma"
+
+
+class Endpoint:
+    """
+    A replica of the Flowdapt API and its observed health.
+    """
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.outstanding = 0
+        self.latency = 0.0
+        self.failures = 0
+        self.ejected_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.ejected_until <= time.monotonic()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(url={self.url!r}, healthy={self.healthy}, "
+            f"outstanding={self.outstanding}, latency={self.latency:.4f})"
+        )
+
+
+class LoadBalancer:
+    """
+    Client side load balancing over several replicas of the Flowdapt API.
+
+    Endpoints are picked in turn (`round_robin`), by the fewest in-flight requests
+    (`least_outstanding`) or by the lowest exponentially weighted moving average of
+    latency scaled by in-flight requests (`ewma`). An endpoint is ejected for
+    `ejection_time` seconds after `failure_threshold` consecutive failures or a failed
+    health probe. If every endpoint is ejected they are all used rather than none.
+
+    :param urls: The base URLs of the replicas.
+    :param strategy: The balancing strategy.
+    :param failure_threshold: The number of consecutive failures that ejects an endpoint.
+    :param ejection_time: Seconds an endpoint stays ejected.
+    :param decay: The weight of the latest latency sample in the moving average.
+    """
+    def __init__(
+        self,
+        urls: list[str],
+        strategy: BalancingStrategy | str = BalancingStrategy.round_robin,
+        failure_threshold: int = 3,
+        ejection_time: float = 30.0,
+        decay: float = 0.3,
+    ) -> None:
+        if not urls:
+            raise ValueError("At least one base URL is required")
+
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.strategy = BalancingStrategy(strategy)
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+        self.decay = decay
+
+        self._counter = itertools.count()
+
+    def choose(self) -> Endpoint:
+        """
+        Pick the endpoint to send the next request to.
+        """
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        candidates = candidates or self.endpoints
+
+        # Rotate the candidates so ties are broken in turn rather than always
+        # favouring the first endpoint
+        offset = next(self._counter) % len(candidates)
+        candidates = candidates[offset:] + candidates[:offset]
+
+        match self.strategy:
+            case BalancingStrategy.round_robin:
+                return candidates[0]
+            case BalancingStrategy.least_outstanding:
+                return min(candidates, key=lambda endpoint: endpoint.outstanding)
+            case BalancingStrategy.ewma:
+                return min(
+                    candidates,
+                    key=lambda endpoint: endpoint.latency * (endpoint.outstanding + 1),
+                )
+
+    def eject(self, endpoint: Endpoint) -> None:
+        endpoint.ejected_until = time.monotonic() + self.ejection_time
+
+    def record(self, endpoint: Endpoint, latency: float | None, failed: bool) -> None:
+        """
+        Record the outcome of a request sent to `endpoint`.
+
+        :param endpoint: The endpoint the request was sent to.
+        :param latency: The latency of the request if a response was received.
+        :param failed: Whether the request failed with a transport error or 5xx response.
+        """
+        if latency is not None:
+            endpoint.latency = (
+                latency if not endpoint.latency
+                else self.decay * latency + (1 - self.decay) * endpoint.latency
+            )
+
+        if failed:
+            endpoint.failures += 1
+            if endpoint.failures >= self.failure_threshold:
+                self.eject(endpoint)
+        else:
+            endpoint.failures = 0
+
+    async def probe(self, check: Callable[[Endpoint], Awaitable[bool]]) -> None:
+        """
+        Actively check the health of every endpoint, ejecting the ones that fail the
+        check and reinstating the ones that pass it.
+
+        :param check: A coroutine function returning whether an endpoint is healthy.
+        """
+        async def probe_endpoint(endpoint: Endpoint) -> None:
+            try:
+                healthy = await check(endpoint)
+            except Exception:
+                healthy = False
+
+            if healthy:
+                endpoint.failures = 0
+                endpoint.ejected_until = 0.0
+            else:
+                self.eject(endpoint)
+
+        await asyncio.gather(*(probe_endpoint(endpoint) for endpoint in self.endpoints))
@@ -0,0 +1,99 @@
+from __future__ import annotations
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchPolicy:
+    """
+    How calls are collected into batches.
+
+    :param window: Seconds to wait for more calls after the first call of a batch.
+    :param max_size: The maximum number of distinct calls in a batch, a full batch
+        is sent without waiting for the end of the window.
+    """
+    def __init__(self, window: float = 0.002, max_size: int = 100) -> None:
+        if window < 0:
+            raise ValueError("Window must not be negative")
+        if max_size < 1:
+            raise ValueError("Max size must be at least 1")
+
+        self.window = window
+        self.max_size = max_size
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(window={self.window}, max_size={self.max_size})"
+
+
+class Batcher(Generic[K, V]):
+    """
+    Collect the calls made within a short window and load them together.
+
+    Every call to `load` waits for the result of its key, keys requested more than
+    once in a window are only loaded once. `load_many` is called with the distinct
+    keys of a batch and returns a result or an exception for every key, in order.
+
+    :param load_many: The function loading a batch of keys.
+    :param policy: The batching policy.
+    """
+    def __init__(
+        self,
+        load_many: Callable[[list[K]], Awaitable[list[V | BaseException]]],
+        policy: BatchPolicy,
+    ) -> None:
+        self.load_many = load_many
+        self.policy = policy
+        self._pending: dict[K, asyncio.Future] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V:
+        future = self._pending.get(key)
+        if future is None:
+            future = self._pending[key] = asyncio.get_running_loop().create_future()
+
+            if len(self._pending) >= self.policy.max_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self.policy.window, self._flush
+                )
+
+        # A caller giving up must not cancel the load for the other callers
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: dict[K, asyncio.Future]) -> None:
+        try:
+            results = await self.load_many(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            results = [e] * len(batch)
+
+        if len(results) != len(batch):
+            results = [RuntimeError("The batch was not loaded for every key")] * len(batch)
+
+        for future, result in zip(batch.values(), results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+                # Callers that gave up must not leave the error unretrieved
+                future.exception()
+            else:
+                future.set_result(result)
@@ -0,0 +1,292 @@
+from __future__ import annotations
+import asyncio
+import base64
+import inspect
+import io
+import mimetypes
+from typing import Any, AsyncIterator, Iterator
+
+from flowdapt_sdk.serialize import media_type
+
+OctetStreamContentType = "application/octet-stream"
+NumpyContentType = "application/x-npy"
+ArrowStreamContentType = "application/vnd.apache.arrow.stream"
+
+DefaultChunkSize = 1024 * 1024
+
+
+def _module(obj: Any) -> str:
+    return type(obj).__module__.split(".", 1)[0]
+
+
+def _is_ndarray(obj: Any) -> bool:
+    # NumPy scalars are not arrays, they are serialized like other numbers
+    if _module(obj) != "numpy":
+        return False
+    import numpy as np
+    return isinstance(obj, np.ndarray)
+
+
+def _is_arrow_table(obj: Any) -> bool:
+    if _module(obj) != "pyarrow":
+        return False
+    import pyarrow as pa
+    return isinstance(obj, (pa.Table, pa.RecordBatch))
+
+
+def _is_dataframe(obj: Any) -> bool:
+    return _module(obj) == "pandas" and type(obj).__name__ == "DataFrame"
+
+
+def is_binary(obj: Any) -> bool:
+    """
+    Whether `obj` is sent as a binary payload rather than serialized, i.e. bytes-like
+    objects, NumPy arrays, Arrow tables and record batches, and pandas DataFrames.
+    """
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return True
+    return _is_ndarray(obj) or _is_arrow_table(obj) or _is_dataframe(obj)
+
+
+class BufferStream:
+    """
+    A request body made of buffers that are sent as they are, in chunks, without
+    being joined into a single bytes object first.
+
+    The stream can be iterated more than once so requests using it can be retried.
+
+    :param buffers: The buffers making up the body.
+    :param chunk_size: The maximum size of each chunk sent.
+    """
+    replayable = True
+
+    def __init__(self, buffers: list[Any], chunk_size: int = DefaultChunkSize) -> None:
+        self.buffers = [memoryview(buffer).cast("B") for buffer in buffers]
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return sum(buffer.nbytes for buffer in self.buffers)
+
+    async def __aiter__(self) -> AsyncIterator[memoryview]:
+        for buffer in self.buffers:
+            for start in range(0, buffer.nbytes, self.chunk_size):
+                yield buffer[start:start + self.chunk_size]
+
+
+def is_stream(obj: Any) -> bool:
+    """
+    Whether `obj` is a request body that is streamed as it is read, i.e. file-like
+    objects, async iterables and iterators of chunks.
+    """
+    if isinstance(obj, (str, bytes, bytearray, memoryview, BufferStream)):
+        return False
+    return (
+        callable(getattr(obj, "read", None))
+        or hasattr(obj, "__aiter__")
+        or isinstance(obj, Iterator)
+    )
+
+
+def _as_bytes(chunk: Any) -> bytes | memoryview:
+    return chunk.encode("utf-8") if isinstance(chunk, str) else memoryview(chunk).cast("B")
+
+
+class RequestStream:
+    """
+    A request body read from a file-like object, an async iterable or an iterator of
+    chunks while it is sent, so it is never held in memory in full. The body is sent
+    with chunked transfer encoding.
+
+    Reads from synchronous file-like objects happen in a thread so they do not block
+    the event loop, coroutine `read` methods (e.g. of aiofiles) are awaited.
+
+    Seekable files are rewound before every send so requests using them can be retried.
+    Other sources can only be read once, requests using them are not retried once any
+    of the body has been sent.
+
+    :param source: The file-like object or iterable to read the body from.
+    :param chunk_size: The number of bytes read from file-like objects at a time.
+    """
+    def __init__(self, source: Any, chunk_size: int = DefaultChunkSize) -> None:
+        self.source = source
+        self.chunk_size = chunk_size
+        self._start = self._tell(source)
+        self._consumed = False
+
+    @staticmethod
+    def _tell(source: Any) -> int | None:
+        try:
+            if callable(getattr(source, "seekable", None)) and source.seekable():
+                position = source.tell()
+                return position if isinstance(position, int) else None
+        except (OSError, ValueError):
+            pass
+        return None
+
+    @property
+    def replayable(self) -> bool:
+        return self._start is not None or not self._consumed
+
+    @property
+    def content_type(self) -> str:
+        """
+        The content type guessed from the name of the source file, if any.
+        """
+        name = getattr(self.source, "name", None)
+        guessed = mimetypes.guess_type(name)[0] if isinstance(name, str) else None
+        return guessed or OctetStreamContentType
+
+    async def __aiter__(self) -> AsyncIterator[bytes | memoryview]:
+        if self._start is not None:
+            self.source.seek(self._start)
+        elif self._consumed:
+            raise RuntimeError("The request body is a stream that has already been read")
+        self._consumed = True
+
+        if callable(getattr(self.source, "read", None)):
+            while True:
+                if inspect.iscoroutinefunction(self.source.read):
+                    chunk = await self.source.read(self.chunk_size)
+                else:
+                    chunk = await asyncio.to_thread(self.source.read, self.chunk_size)
+                    if inspect.isawaitable(chunk):
+                        chunk = await chunk
+
+                if not chunk:
+                    break
+                yield _as_bytes(chunk)
+        elif hasattr(self.source, "__aiter__"):
+            async for chunk in self.source:
+                if chunk:
+                    yield _as_bytes(chunk)
+        else:
+            for chunk in self.source:
+                if chunk:
+                    yield _as_bytes(chunk)
+
+
+def _encode_numpy(array: Any) -> list[Any]:
+    import numpy as np
+
+    if array.dtype.hasobject:
+        raise TypeError("NumPy arrays of objects can not be sent as binary payloads")
+
+    # Only non contiguous arrays are copied, in the layout they are sent in
+    fortran_order = array.flags.f_contiguous and not array.flags.c_contiguous
+    if not (array.flags.c_contiguous or fortran_order):
+        array = np.ascontiguousarray(array)
+
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        header,
+        {
+            "descr": np.lib.format.dtype_to_descr(array.dtype),
+            "fortran_order": bool(fortran_order),
+            "shape": array.shape,
+        },
+    )
+    data = array.T if fortran_order else array
+    return [header.getvalue(), data.reshape(-1).view(np.uint8)]
+
+
+def _encode_arrow(table: Any) -> Any:
+    import pyarrow as pa
+
+    if _is_dataframe(table):
+        table = pa.Table.from_pandas(table)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write(table)
+    return sink.getvalue()
+
+
+def encode_binary(obj: Any, chunk_size: int = DefaultChunkSize) -> tuple[BufferStream, str]:
+    """
+    Encode a binary payload into a request body and its content type.
+
+    Bytes-like objects are sent as `application/octet-stream` without copying,
+    NumPy arrays in the `.npy` format as `application/x-npy` with their data
+    sent straight from the array's buffer, and Arrow tables, record batches and
+    pandas DataFrames as an Arrow IPC stream.
+
+    :param obj: The payload to encode.
+    :type obj: Any
+    :param chunk_size: The maximum size of each chunk sent.
+    :type chunk_size: int
+    :return: The request body and its content type.
+    :rtype: tuple[BufferStream, str]
+    """
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return BufferStream([obj], chunk_size), OctetStreamContentType
+    elif _is_ndarray(obj):
+        return BufferStream(_encode_numpy(obj), chunk_size), NumpyContentType
+    elif _is_arrow_table(obj) or _is_dataframe(obj):
+        return BufferStream([_encode_arrow(obj)], chunk_size), ArrowStreamContentType
+
+    raise TypeError(f"Unsupported binary payload type: {type(obj).__name__}")
+
+
+def _decode_numpy(data: Any) -> Any:
+    import numpy as np
+
+    buffer = memoryview(data)
+    header = io.BytesIO(buffer[:min(len(buffer), 65536)].tobytes())
+    version = np.lib.format.read_magic(header)
+    shape, fortran_order, dtype = (
+        np.lib.format.read_array_header_1_0(header)
+        if version == (1, 0)
+        else np.lib.format.read_array_header_2_0(header)
+    )
+
+    # The array is a read only view over the response body
+    array = np.frombuffer(buffer, dtype=dtype, offset=header.tell())
+    return array.reshape(shape, order="F" if fortran_order else "C")
+
+
+def _decode_arrow(data: Any) -> Any:
+    import pyarrow as pa
+
+    with pa.ipc.open_stream(pa.py_buffer(data)) as reader:
+        return reader.read_all()
+
+
+def decode_binary(data: bytes | bytearray | memoryview, content_type: str) -> Any:
+    """
+    Decode a binary payload encoded with `encode_binary`.
+
+    NumPy arrays and Arrow tables are views over `data` and are not copied.
+
+    :param data: The payload.
+    :type data: bytes | bytearray | memoryview
+    :param content_type: The content type of the payload.
+    :type content_type: str
+    :return: A NumPy array, an Arrow table, or `data` itself for octet streams.
+    :rtype: Any
+    """
+    match media_type(content_type):
+        case "application/x-npy":
+            return _decode_numpy(data)
+        case "application/vnd.apache.arrow.stream":
+            return _decode_arrow(data)
+        case _:
+            return data
+
+
+def decode_result(result: Any, content_type: str = OctetStreamContentType) -> Any:
+    """
+    Decode the `result` of a workflow run holding a binary payload.
+
+    Results delivered as bytes (e.g. in MessagePack responses) are decoded directly,
+    results delivered as base64 strings (in JSON responses) are decoded from base64 first.
+
+    :param result: The result of a workflow run.
+    :type result: Any
+    :param content_type: The content type of the payload.
+    :type content_type: str
+    :return: The decoded payload.
+    :rtype: Any
+    """
+    if isinstance(result, str):
+        result = base64.b64decode(result)
+    return decode_binary(result, content_type)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import orjson
+
+_Schema = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    family TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    headers BLOB NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_family ON responses (family);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+class CachedResponse:
+    def __init__(self, status_code: int, headers: dict, body: bytes) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+
+class ResponseCache:
+    """
+    An on-disk cache of GET responses that can be shared by every process on a host.
+
+    Responses are stored in a SQLite database in WAL mode, so any number of processes
+    can read it while one writes, keyed by the URL, the `X-API-Version` header and the
+    accepted content types of the request. Entries expire after `ttl` seconds, and once
+    the cache grows beyond `max_size` bytes the least recently used entries are evicted.
+    Any write to an endpoint family (e.g. a PUT to `/configs/...`) invalidates the
+    cached responses of that family.
+
+    Recording the access time of a hit takes the write lock of the database, so it is
+    only recorded once per `access_granularity` seconds per entry and most hits are
+    plain reads that do not wait for each other.
+
+    A cache holds an open database connection, which must not be used on both sides of
+    a fork. Create the cache in each process after forking instead of inheriting it.
+
+    :param path: The path of the database file, created if it does not exist.
+    :param ttl: Seconds a response is served from the cache.
+    :param max_size: The maximum total size in bytes of the cached bodies.
+    :param max_entry_size: The size in bytes above which responses are not cached.
+    :param timeout: Seconds to wait for another process holding the database lock.
+    :param access_granularity: Seconds within which further hits of an entry do not
+        update its access time for the least recently used eviction.
+    """
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        ttl: float = 60.0,
+        max_size: int = 256 * 1024 * 1024,
+        max_entry_size: int = 16 * 1024 * 1024,
+        timeout: float = 5.0,
+        access_granularity: float = 10.0,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+        self.access_granularity = access_granularity
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.path,
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_Schema)
+
+    @staticmethod
+    def key(url: str, version: str | None = None, accept: str | None = None) -> str:
+        return hashlib.sha256(f"{url}\n{version or ''}\n{accept or ''}".encode()).hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        """
+        Get the cached response for `key` if there is one that has not expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status_code, headers, body, accessed_at FROM responses "
+                "WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            if now - row[3] >= self.access_granularity:
+                self._connection.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+
+        self.hits += 1
+        status_code, headers, body, _ = row
+        return CachedResponse(status_code, orjson.loads(headers), body)
+
+    def set(self, key: str, family: str, status_code: int, headers: dict, body: Any) -> None:
+        """
+        Cache a response, evicting the least recently used entries if the cache is full.
+        """
+        body = bytes(body)
+        if len(body) > self.max_entry_size:
+            return
+
+        now = time.time()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        family,
+                        status_code,
+                        orjson.dumps(headers),
+                        body,
+                        len(body),
+                        now + self.ttl,
+                        now,
+                    ),
+                )
+                connection.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                self._evict()
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _evict(self) -> None:
+        (total,) = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+        if total <= self.max_size:
+            return
+
+        rows = self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            evicted.append((key,))
+            total -= size
+
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def invalidate(self, family: str | None = None) -> None:
+        """
+        Remove the cached responses of an endpoint family, or every cached response.
+        """
+        with self._lock:
+            if family is None:
+                self._connection.execute("DELETE FROM responses")
+            else:
+                self._connection.execute("DELETE FROM responses WHERE family = ?", (family,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,231 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Iterable
+
+import orjson
+from httpx import AsyncClient, TransportError
+
+from flowdapt_sdk.compression import Compression, available_encodings
+from flowdapt_sdk.constants import APIVersionHeader
+from flowdapt_sdk.serialize import msgpack
+from flowdapt_sdk.utils import build_url, build_version_header
+
+
+def _header_values(headers: Any, *names: str) -> frozenset[str]:
+    return frozenset(
+        value.split(";")[0].strip().lower()
+        for name in names
+        for value in headers.get(name, "").split(",")
+        if value.strip()
+    )
+
+
+class Capabilities:
+    """
+    What a server supports, as discovered by `probe_capabilities`.
+
+    :param server_version: The version of Flowdapt the server runs, if known.
+    :param http_version: The HTTP version the server answered with.
+    :param encodings: The content encodings the server accepts for request bodies.
+    :param content_types: The content types the server accepts or produces.
+    :param versions: The versions the server supports per resource type.
+    :param features: The names of optional features the server advertises,
+        e.g. `pagination` or `sse`.
+    :param batch_endpoint: The path of the endpoint accepting batched requests, if any.
+    """
+    def __init__(
+        self,
+        server_version: str | None = None,
+        http_version: str = "HTTP/1.1",
+        encodings: frozenset[str] = frozenset(),
+        content_types: frozenset[str] = frozenset(),
+        versions: dict[str, tuple[str, ...]] | None = None,
+        features: frozenset[str] = frozenset(),
+        batch_endpoint: str | None = None,
+    ) -> None:
+        self.server_version = server_version
+        self.http_version = http_version
+        self.encodings = encodings
+        self.content_types = content_types
+        self.versions = versions or {}
+        self.features = features
+        self.batch_endpoint = batch_endpoint
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(server_version={self.server_version!r}, "
+            f"http_version={self.http_version!r}, encodings={sorted(self.encodings)}, "
+            f"features={sorted(self.features)}, batch_endpoint={self.batch_endpoint!r})"
+        )
+
+    @property
+    def http2(self) -> bool:
+        return self.http_version == "HTTP/2"
+
+    @property
+    def msgpack(self) -> bool:
+        """
+        Whether responses can be received as MessagePack, which needs the `msgpack`
+        package installed as well.
+        """
+        return msgpack is not None and any("msgpack" in ct for ct in self.content_types)
+
+    @property
+    def sse(self) -> bool:
+        return "sse" in self.features or "text/event-stream" in self.content_types
+
+    @property
+    def pagination(self) -> bool:
+        return "pagination" in self.features
+
+    @property
+    def compression(self) -> Compression | None:
+        """
+        The preferred content encoding for request bodies that both sides support.
+        """
+        return next(
+            (encoding for encoding in available_encodings() if encoding.value in self.encodings),
+            None,
+        )
+
+    def version(self, resource_type: str, versions: tuple[str, ...]) -> str | None:
+        """
+        The newest of `versions`, ordered oldest first, that the server supports for
+        a resource type, None if the server did not say.
+        """
+        supported = self.versions.get(resource_type)
+        if not supported:
+            return None
+        return next((version for version in reversed(versions) if version in supported), None)
+
+
+async def probe_capabilities(client: AsyncClient, base_url: str) -> Capabilities | None:
+    """
+    Discover what a server supports with a single `OPTIONS /` request.
+
+    The `Accept-Encoding` header of the answer lists the encodings accepted for
+    request bodies, `Accept`, `Accept-Post` and `Accept-Patch` the content types.
+    A JSON body may list the supported `versions` per resource type, optional
+    `features` and the path of a `batch` endpoint. Servers that do not answer
+    `OPTIONS` are asked for `/status` to learn their version only.
+
+    :param client: The HTTP client to send the probe with.
+    :type client: AsyncClient
+    :param base_url: The URL of the server.
+    :type base_url: str
+    :return: The capabilities, or None if the server could not be reached.
+    :rtype: Capabilities | None
+    """
+    try:
+        response = await client.options(build_url(base_url, "/"))
+
+        if not response.is_success:
+            response = await client.get(
+                build_url(base_url, "/status"),
+                headers={APIVersionHeader: build_version_header("system", "v1alpha1")},
+            )
+    except TransportError:
+        return None
+
+    try:
+        content = orjson.loads(response.content) if response.is_success else None
+    except orjson.JSONDecodeError:
+        content = None
+    content = content if isinstance(content, dict) else {}
+
+    return Capabilities(
+        server_version=content.get("version") or response.headers.get("Server"),
+        http_version=response.http_version,
+        encodings=_header_values(response.headers, "Accept-Encoding"),
+        content_types=_header_values(response.headers, "Accept", "Accept-Post", "Accept-Patch"),
+        versions={
+            resource_type: tuple(versions)
+            for resource_type, versions in (content.get("versions") or {}).items()
+        },
+        features=frozenset(content.get("features") or ()),
+        batch_endpoint=content.get("batch"),
+    )
+
+
+def common_capabilities(probed: Iterable[Capabilities | None]) -> Capabilities | None:
+    """
+    The capabilities every one of several replicas of a server supports, so the
+    requests sent to any of them use only what it understands. Replicas that could
+    not be probed are left out.
+
+    :param probed: The capabilities of every replica, None for the ones not probed.
+    :type probed: Iterable[Capabilities | None]
+    :return: The common capabilities, or None if no replica could be probed.
+    :rtype: Capabilities | None
+    """
+    available = [capabilities for capabilities in probed if capabilities is not None]
+    if len(available) <= 1:
+        return available[0] if available else None
+
+    def same(values: list[Any], default: Any = None) -> Any:
+        return values[0] if all(value == values[0] for value in values) else default
+
+    first, *others = available
+    return Capabilities(
+        server_version=same([c.server_version for c in available]),
+        http_version=same([c.http_version for c in available], "HTTP/1.1"),
+        encodings=first.encodings.intersection(*(c.encodings for c in others)),
+        content_types=first.content_types.intersection(*(c.content_types for c in others)),
+        versions={
+            resource_type: tuple(
+                version for version in versions
+                if all(version in c.versions.get(resource_type, ()) for c in others)
+            )
+            for resource_type, versions in first.versions.items()
+            if all(resource_type in c.versions for c in others)
+        },
+        features=first.features.intersection(*(c.features for c in others)),
+        batch_endpoint=same([c.batch_endpoint for c in available]),
+    )
+
+
+class CapabilityCache:
+    """
+    The capabilities of servers by base URL, so every client of a server probes
+    it once per `ttl` seconds. A cache can be shared by several clients. Servers
+    that could not be probed are remembered as well, so they are not probed again
+    on every request.
+
+    :param ttl: Seconds before the capabilities of a server are probed again.
+    """
+    def __init__(self, ttl: float = 300.0) -> None:
+        self.ttl = ttl
+        self._entries: dict[str, tuple[Capabilities | None, float]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, base_url: str) -> tuple[bool, Capabilities | None]:
+        """
+        Whether a server was probed within the TTL, and its capabilities, None if
+        it could not be probed.
+        """
+        with self._lock:
+            entry = self._entries.get(base_url)
+            if entry is None:
+                return False, None
+            if entry[1] <= time.monotonic():
+                del self._entries[base_url]
+                return False, None
+            return True, entry[0]
+
+    def get(self, base_url: str) -> Capabilities | None:
+        return self.lookup(base_url)[1]
+
+    def set(self, base_url: str, capabilities: Capabilities | None) -> None:
+        with self._lock:
+            self._entries[base_url] = (capabilities, time.monotonic() + self.ttl)
+
+    def invalidate(self, base_url: str | None = None) -> None:
+        """
+        Forget the capabilities of a server, or of every server.
+        """
+        with self._lock:
+            if base_url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(base_url, None)
@@ -1,18 +1,75 @@
 from __future__ import annotations
-from typing import Optional, Any
-from httpx import AsyncClient, HTTPStatusError
+import asyncio
+import random
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional, Any
+from httpx import (
+    AsyncClient,
+    ConnectError,
+    ConnectTimeout,
+    PoolTimeout,
+    Response,
+    TransportError,
+)
 from enum import Enum
 
 from flowdapt_sdk.version import __version__
-from flowdapt_sdk.serialize import serialize, deserialize
-from flowdapt_sdk.errors import raise_from_json
+from flowdapt_sdk._compat import BaseModel
+from flowdapt_sdk.serialize import as_msgpack, decode, encode, is_json
+from flowdapt_sdk.binary import (
+    BufferStream,
+    RequestStream,
+    encode_binary,
+    is_binary,
+    is_stream,
+)
+from flowdapt_sdk.compression import (
+    Compression,
+    available_encodings,
+    compress,
+    iter_content,
+    iter_lines,
+    read_content,
+)
+from flowdapt_sdk.balancer import BalancingStrategy, Endpoint, LoadBalancer
+from flowdapt_sdk.batching import BatchPolicy
+from flowdapt_sdk.cache import ResponseCache
+from flowdapt_sdk.capabilities import (
+    Capabilities,
+    CapabilityCache,
+    common_capabilities,
+    probe_capabilities,
+)
+from flowdapt_sdk.constants import APIVersionHeader
+from flowdapt_sdk.decode import DecodePool, validate_content
+from flowdapt_sdk.intern import Interner
+from flowdapt_sdk.errors import (
+    APIConnectionError,
+    APIError,
+    RateLimitedError,
+    ServiceUnavailableError,
+    error_from_response,
+)
+from flowdapt_sdk.ratelimit import RateLimiter
+from flowdapt_sdk.resilience import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    HedgingPolicy,
+    endpoint_family,
+)
 from flowdapt_sdk.utils import (
     build_accept_header,
+    build_path,
     build_url,
-    determine_content_type
+    determine_content_type,
+    NegotiationTable,
 )
 
 
+IdempotentMethods = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+SafeMethods = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
 class StreamType(str, Enum):
     bytes = "bytes"
     lines = "lines"
@@ -30,28 +87,85 @@ class APIRequest:
         headers: Optional[dict] = None,
         params: Optional[dict] = None,
         accept: Optional[list[tuple[str, float]]] = None,
+        compression: Optional[Compression | str] = None,
+        compression_threshold: int = 1024,
+        msgpack: bool = False,
+        long_poll: bool = False,
+        stream: bool = False,
     ) -> None:
         self.base_url = base_url
         self.method = method
+        self.long_poll = long_poll
+        self.stream = stream
         self.endpoint = endpoint
         self.query = query
         self.params = params
         self.accept = accept
+        self.path = build_path(self.endpoint, self.params)
         self.url = build_url(
             base_url=self.base_url,
             path=self.endpoint,
             query=self.query,
             params=self.params
         )
-        self.content_type = determine_content_type(body)
-        self.body = serialize(body) if body else None
+        self.body: bytes | BufferStream | RequestStream | None
+        if body is not None and is_stream(body):
+            self.body = body if isinstance(body, RequestStream) else RequestStream(body)
+            self.content_type = self.body.content_type
+        elif body is not None and is_binary(body):
+            self.body, self.content_type = encode_binary(body)
+        else:
+            self.content_type = determine_content_type(body)
+            self.body = encode(body, self.content_type) if body else None
         self.accept = accept or [
             (self.content_type if "json" in self.content_type else "application/json", 1.0)
         ]
-        self.headers = headers or {}
+        self.headers = dict(headers) if headers else {}
         self.headers["Content-Type"] = self.headers.pop("Content-Type", self.content_type)
+
+        if isinstance(self.body, BufferStream):
+            # Send the length up front so the body is not chunk encoded
+            self.headers["Content-Length"] = str(len(self.body))
+
+        if msgpack:
+            # Prefer the MessagePack equivalent of every accepted JSON type
+            self.accept = [
+                accepted
+                for content_type, quality in self.accept
+                for accepted in (
+                    [(as_msgpack(content_type), quality), (content_type, quality * 0.9)]
+                    if is_json(content_type) else [(content_type, quality)]
+                )
+            ]
+
         self.headers["Accept"] = build_accept_header(self.accept)
 
+        if (
+            compression
+            and isinstance(self.body, bytes)
+            and len(self.body) >= compression_threshold
+        ):
+            self.body = compress(self.body, compression)
+            self.headers["Content-Encoding"] = Compression(compression).value
+
+    @property
+    def replayable(self) -> bool:
+        """
+        Whether the body can still be sent again, streamed bodies that can not be
+        rewound are only sent once.
+        """
+        return getattr(self.body, "replayable", True)
+
+
+async def _close_after(response: Response, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except TransportError as e:
+        raise APIConnectionError(str(e) or type(e).__name__) from e
+    finally:
+        await response.aclose()
+
 
 class APIResponse:
     def __init__(
@@ -61,39 +175,122 @@ class APIResponse:
         headers: dict,
         body: bytes,
         stream: bool = False,
+        close: Optional[Callable[[], Awaitable[None]]] = None,
     ) -> None:
         self.request = request
         self.status_code = status_code
         self.headers = headers
         self.body = body
         self.stream = stream
-        self.content_type = headers.get("Content-Type", "application/json")
-        self.content = self.deserialize_body() if not self.stream else self.body
+        self._close = close
+        self.content_type = next(
+            (value for key, value in headers.items() if key.lower() == "content-type"),
+            "application/json",
+        )
+        self._content: Any = None
+        self._decoded = False
 
-    def deserialize_body(self) -> Any:
-        if self.content_type == "application/octet-stream":
-            return self.body
-        elif self.content_type == "application/json":
-            return deserialize(self.body)
-        elif self.content_type == "text/plain":
-            return self.body.decode("utf-8")
-        else:
+    async def aclose(self) -> None:
+        """
+        Close a streamed response without reading the rest of its body. Streamed
+        responses are closed once their body has been read to the end.
+        """
+        if self._close is not None:
+            await self._close()
+
+    @classmethod
+    def from_content(
+        cls,
+        request: APIRequest,
+        status_code: int,
+        headers: dict,
+        content: Any,
+    ) -> APIResponse:
+        """
+        Build a response whose body is already decoded, e.g. one of the responses
+        of a batch.
+        """
+        response = cls(request, status_code, headers, b"")
+        response._content = content
+        response._decoded = True
+        return response
+
+    @property
+    def content(self) -> Any:
+        """
+        The body of the response, deserialized the first time it is accessed.
+        """
+        if self.stream:
             return self.body
 
+        if not self._decoded:
+            self._content = self.deserialize_body()
+            self._decoded = True
+
+        return self._content
+
+    def deserialize_body(self) -> Any:
+        return decode(self.body, self.content_type)
+
 
 class APIClient:
     def __init__(
         self,
-        base_url: str,
+        base_url: str | list[str],
         verify_ssl: bool = True,
         retries: int = 3,
         timeout: Optional[float] = None,
         follow_redirects: bool = True,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        circuit_breaker: CircuitBreaker | None = None,
+        concurrency_limiter: AdaptiveConcurrencyLimiter | None = None,
+        rate_limiter: RateLimiter | None = None,
+        hedging: HedgingPolicy | None = None,
+        load_balancing: BalancingStrategy | str = BalancingStrategy.round_robin,
+        health_check_interval: float | None = None,
+        compression: Compression | str | None = None,
+        compression_threshold: int = 1024,
+        msgpack: bool = False,
+        cache: ResponseCache | None = None,
+        decode_pool: DecodePool | None = None,
+        offload_threshold: int | None = None,
+        blocking_hook: Callable[[str, float], None] | None = None,
+        interner: Interner | None = None,
+        capabilities: CapabilityCache | None = None,
+        batching: BatchPolicy | None = None,
     ) -> None:
+        self.balancer: LoadBalancer | None = None
+        self.health_check_interval = health_check_interval
+        self._health_check_task: asyncio.Task | None = None
+
+        if isinstance(base_url, list):
+            self.balancer = LoadBalancer(base_url, strategy=load_balancing)
+            base_url = base_url[0]
+
         self.base_url = base_url
         self.verify_ssl = verify_ssl
         self.retries = retries
         self.timeout = timeout
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.circuit_breaker = circuit_breaker
+        self.concurrency_limiter = concurrency_limiter
+        self.rate_limiter = rate_limiter
+        self.hedging = hedging
+        self.compression = Compression(compression) if compression else None
+        self.compression_threshold = compression_threshold
+        self.msgpack = msgpack
+        self.cache = cache
+        self.decode_pool = decode_pool
+        self.offload_threshold = offload_threshold
+        self.blocking_hook = blocking_hook
+        self.interner = interner
+        self.capabilities = capabilities
+        self.batching = batching
+        self._probe_lock = asyncio.Lock()
+        # The versions negotiated with the server per endpoint, see `BaseAPI.request`
+        self.negotiated_versions: dict[NegotiationTable, str] = {}
 
         self._client = AsyncClient(
             base_url=self.base_url,
@@ -101,11 +298,18 @@ class APIClient:
             timeout=self.timeout,
             follow_redirects=follow_redirects,
             headers={
-                "User-Agent": f"flowdapt-sdk-python/{__version__}"
+                "User-Agent": f"flowdapt-sdk-python/{__version__}",
+                "Accept-Encoding": ", ".join(
+                    encoding.value for encoding in available_encodings()
+                ),
             }
         )
 
     async def close(self) -> None:
+        if self._health_check_task:
+            self._health_check_task.cancel()
+            self._health_check_task = None
+
         await self._client.aclose()
 
     async def __aenter__(self) -> APIClient:
@@ -126,7 +330,16 @@ class APIClient:
         headers: Optional[dict] = None,
         params: Optional[dict] = None,
         accept: Optional[list[tuple[str, float]]] = None,
+        capabilities: Optional[Capabilities] = None,
+        long_poll: bool = False,
+        stream: bool = False,
     ) -> APIRequest:
+        compression, msgpack = self.compression, self.msgpack
+        if capabilities is not None:
+            # Use the faster encodings the server supports unless set explicitly
+            compression = compression or capabilities.compression
+            msgpack = msgpack or capabilities.msgpack
+
         return APIRequest(
             base_url=self.base_url,
             method=method,
@@ -136,7 +349,259 @@ class APIClient:
             headers=headers,
             params=params,
             accept=accept,
+            compression=compression,
+            compression_threshold=self.compression_threshold,
+            msgpack=msgpack,
+            long_poll=long_poll,
+            stream=stream,
+        )
+
+    async def server_capabilities(self) -> Capabilities | None:
+        """
+        The capabilities of the server, probed on first use and cached per base URL
+        if a capability cache is set. A multi endpoint client probes every endpoint
+        and uses what they all support, as a request may be sent to any of them.
+
+        :return: The capabilities, or None if there is no cache or the server could
+            not be probed.
+        :rtype: Capabilities | None
+        """
+        cache = self.capabilities
+        if cache is None:
+            return None
+
+        urls = (
+            [endpoint.url for endpoint in self.balancer.endpoints]
+            if self.balancer else [self.base_url]
         )
+        probed = self._probed_capabilities(cache, urls)
+        if len(probed) < len(urls):
+            async with self._probe_lock:
+                # Concurrent first requests wait for a single probe
+                probed = self._probed_capabilities(cache, urls)
+                missing = [url for url in urls if url not in probed]
+                results = await asyncio.gather(
+                    *(probe_capabilities(self._client, url) for url in missing)
+                )
+                for url, capabilities in zip(missing, results):
+                    cache.set(url, capabilities)
+                    probed[url] = capabilities
+
+        return common_capabilities(probed.values())
+
+    @staticmethod
+    def _probed_capabilities(
+        cache: CapabilityCache, urls: list[str]
+    ) -> dict[str, Capabilities | None]:
+        probed = {}
+        for url in urls:
+            found, capabilities = cache.lookup(url)
+            if found:
+                probed[url] = capabilities
+        return probed
+
+    async def negotiated_version(self, table: NegotiationTable) -> str | None:
+        """
+        The version of an endpoint to use when none is requested: the one negotiated
+        earlier, or the newest one the server reports supporting.
+        """
+        version = self.negotiated_versions.get(table)
+        if version is None:
+            capabilities = await self.server_capabilities()
+            if capabilities is not None:
+                version = capabilities.version(table.resource_type, table.versions)
+                if version is not None:
+                    self.negotiated_versions[table] = version
+
+        return version
+
+    def retry_delay(self, request: APIRequest, error: APIError, attempt: int) -> float | None:
+        """
+        Decide whether a failed request should be retried.
+
+        Retryable errors are retried for idempotent methods. Other methods are only
+        retried when the server cannot have processed the request: it was never sent,
+        or the server answered 429 or 503. The delay grows exponentially with full
+        jitter and honours `Retry-After`, a `Retry-After` beyond `max_backoff` is not
+        waited for. Requests whose streamed body has already been read are not retried.
+
+        :param request: The request that failed.
+        :type request: APIRequest
+        :param error: The error the request failed with.
+        :type error: APIError
+        :param attempt: The number of retries already made.
+        :type attempt: int
+        :return: The number of seconds to wait before retrying, or None to give up.
+        :rtype: float | None
+        """
+        if attempt >= self.retries or not error.retryable or not request.replayable:
+            return None
+
+        if request.method.upper() not in IdempotentMethods:
+            if isinstance(error, APIConnectionError) and error.sent:
+                return None
+            if not isinstance(
+                error, (APIConnectionError, RateLimitedError, ServiceUnavailableError)
+            ):
+                return None
+
+        delay = random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+        retry_after = getattr(error, "retry_after", None)
+
+        if retry_after is not None:
+            if retry_after > self.max_backoff:
+                return None
+            delay = max(delay, retry_after)
+
+        return delay
+
+    async def check_health(self) -> None:
+        """
+        Ping every endpoint of a multi endpoint client, ejecting the ones that do not
+        respond successfully from load balancing and reinstating the ones that do.
+        """
+        if not self.balancer:
+            return
+
+        async def check(endpoint: Endpoint) -> bool:
+            response = await self._client.get(build_url(endpoint.url, "/"))
+            return response.is_success
+
+        await self.balancer.probe(check)
+
+    async def _health_check_loop(self, interval: float) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def _dispatch(self, request: APIRequest, url: str) -> Response:
+        # Streamed responses are returned as soon as their headers arrive, their
+        # body is read by the caller
+        return await self._client.send(
+            self._client.build_request(
+                method=request.method,
+                url=url,
+                # Stream bodies yield memoryviews, which httpx sends like bytes
+                content=request.body,  # type: ignore[arg-type]
+                headers=request.headers,
+            ),
+            stream=request.stream,
+        )
+
+    async def _send_once(self, request: APIRequest) -> Response:
+        if not self.balancer:
+            return await self._dispatch(request, request.url)
+
+        endpoint = self.balancer.choose()
+        endpoint.outstanding += 1
+        start = time.monotonic()
+        latency, failed = None, False
+        try:
+            response = await self._dispatch(
+                request,
+                build_url(endpoint.url, request.endpoint, request.query, request.params),
+            )
+            latency, failed = time.monotonic() - start, response.status_code >= 500
+            return response
+        except TransportError:
+            failed = True
+            raise
+        finally:
+            endpoint.outstanding -= 1
+            if failed or latency is not None:
+                self.balancer.record(endpoint, latency, failed)
+
+    async def _send_hedged(self, request: APIRequest, policy: HedgingPolicy) -> Response:
+        start = time.monotonic()
+        tasks = {asyncio.ensure_future(self._send_once(request))}
+        try:
+            delay = policy.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and policy.try_hedge():
+                    tasks.add(asyncio.ensure_future(self._send_once(request)))
+
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                succeeded = [task for task in done if task.exception() is None]
+
+                if succeeded:
+                    policy.record(time.monotonic() - start)
+                    return succeeded[0].result()
+                if not tasks:
+                    # Every attempt failed, surface the error of one of them
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def send(self, request: APIRequest) -> Response:
+        """
+        Send a request, going through the rate limiter, circuit breaker and
+        concurrency limiter if set.
+        """
+        family = endpoint_family(request.endpoint)
+
+        if self.balancer and self.health_check_interval and not self._health_check_task:
+            self._health_check_task = asyncio.create_task(
+                self._health_check_loop(self.health_check_interval)
+            )
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(request.method, request.path)
+
+        if self.circuit_breaker:
+            self.circuit_breaker.before_request(family)
+
+        if self.concurrency_limiter:
+            try:
+                await self.concurrency_limiter.acquire()
+            except BaseException:
+                if self.circuit_breaker:
+                    self.circuit_breaker.release(family)
+                raise
+
+        start = time.monotonic()
+        latency, failed = None, False
+        try:
+            # Streamed bodies are read as they are sent and can not be sent twice at
+            # once, the losing attempt of a streamed response would be left open
+            if (
+                self.hedging
+                and request.method.upper() == "GET"
+                and not request.stream
+                and not isinstance(request.body, RequestStream)
+            ):
+                response = await self._send_hedged(request, self.hedging)
+            else:
+                response = await self._send_once(request)
+
+            latency, failed = time.monotonic() - start, response.status_code >= 500
+            return response
+        except TransportError as e:
+            failed = True
+            raise APIConnectionError(
+                str(e) or type(e).__name__,
+                sent=not isinstance(e, (ConnectError, ConnectTimeout, PoolTimeout)),
+            ) from e
+        finally:
+            # A cancelled request, or one that failed with an unexpected error, has
+            # neither a latency nor a failure and says nothing about the health of
+            # the server, but must give back its trial slot if the circuit is half open
+            if self.circuit_breaker and failed:
+                self.circuit_breaker.record_failure(family)
+            elif self.circuit_breaker and latency is not None:
+                self.circuit_breaker.record_success(family)
+            elif self.circuit_breaker:
+                self.circuit_breaker.release(family)
+
+            if self.concurrency_limiter:
+                # Long polls are slow by design, their latency says nothing about load
+                self.concurrency_limiter.release(
+                    latency=None if request.long_poll else latency,
+                    dropped=failed,
+                    key=f"{request.method.upper()} {family}",
+                )
 
     async def request(
         self,
@@ -149,7 +614,17 @@ class APIClient:
         accept: Optional[list[tuple[str, float]]] = None,
         stream: bool = False,
         stream_type: StreamType = StreamType.bytes,
+        long_poll: bool = False,
     ) -> APIResponse:
+        """
+        Send a request and read its response.
+
+        Long polls, such as running a workflow and waiting for it to finish, are slow
+        by design and their latency is not used to adapt the concurrency limit.
+        """
+        capabilities = await self.server_capabilities()
+
+        start = time.perf_counter()
         request = self.build_request(
             method=method,
             endpoint=endpoint,
@@ -158,31 +633,74 @@ class APIClient:
             headers=headers,
             params=params,
             accept=accept,
+            capabilities=capabilities,
+            long_poll=long_poll,
+            stream=stream,
         )
+        if self.blocking_hook:
+            self.blocking_hook("encode", time.perf_counter() - start)
 
-        response = await self._client.request(
-            method=request.method,
-            url=request.url,
-            content=request.body,
-            headers=request.headers,
-        )
-        try:
-            response.raise_for_status()
-        except HTTPStatusError as e:
-            raise_from_json(
-                e.response.json()
+        cache_key = None
+        if self.cache and method.upper() == "GET" and not stream:
+            cache_key = self.cache.key(
+                request.url,
+                request.headers.get(APIVersionHeader),
+                request.headers.get("Accept"),
             )
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return APIResponse(
+                    request=request,
+                    status_code=cached.status_code,
+                    headers=cached.headers,
+                    body=cached.body,
+                )
+
+        attempt = 0
+        while True:
+            try:
+                response = await self.send(request)
+                if response.is_error:
+                    if request.stream:
+                        await response.aread()
+                    raise error_from_response(
+                        response.status_code,
+                        response.headers,
+                        read_content(response),
+                    )
+                break
+            except APIError as e:
+                delay = self.retry_delay(request, e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
 
         if stream:
             match stream_type:
                 case StreamType.bytes:
-                    response_body = response.aiter_bytes()
+                    response_body = _close_after(response, iter_content(response))
                 case StreamType.lines:
-                    response_body = response.aiter_lines()
+                    response_body = _close_after(response, iter_lines(response))
                 case StreamType.raw:
-                    response_body = response.aiter_raw()
+                    response_body = _close_after(response, response.aiter_raw())
         else:
-            response_body = response.content
+            response_body = read_content(response)
+
+        if self.cache and cache_key and response.status_code == 200 and not any(
+            directive.strip().lower() == "no-store"
+            for directive in response.headers.get("Cache-Control", "").split(",")
+        ):
+            await asyncio.to_thread(
+                self.cache.set,
+                cache_key,
+                endpoint_family(request.endpoint),
+                response.status_code,
+                dict(response.headers.items()),
+                response_body,
+            )
+        elif self.cache and method.upper() not in SafeMethods:
+            await asyncio.to_thread(self.cache.invalidate, endpoint_family(request.endpoint))
 
         return APIResponse(
             request=request,
@@ -190,8 +708,53 @@ class APIClient:
             headers=dict(response.headers.items()),
             body=response_body,
             stream=stream,
+            close=response.aclose if stream else None,
         )
 
+    async def validate(self, response: APIResponse, dto: type, many: bool = False) -> Any:
+        """
+        Validate the body of a response into `dto`, or into a list of `dto` if `many`,
+        sharing equal values with previous responses if an interner is set.
+        """
+        result = await self._validate(response, dto, many=many)
+
+        if self.interner is not None and isinstance(result, (BaseModel, list)):
+            start = time.perf_counter()
+            result = self.interner.intern(result)
+            if self.blocking_hook:
+                self.blocking_hook("intern", time.perf_counter() - start)
+
+        return result
+
+    async def _validate(self, response: APIResponse, dto: type, many: bool = False) -> Any:
+        """
+        Validate the body of a response into `dto`, or into a list of `dto` if `many`.
+
+        Large bodies are decoded and validated in the decode pool if one is set, or
+        else in a thread if they are at least `offload_threshold` bytes, so they do not
+        block the event loop. orjson and pydantic-core spend most of that time in
+        native code, letting the loop carry on meanwhile.
+        """
+        if response.stream:
+            return validate_content(response.content, dto, many=many)
+
+        if self.decode_pool and self.decode_pool.accepts(response.body, response.content_type):
+            return await self.decode_pool.validate(
+                response.body, response.content_type, dto, many=many
+            )
+
+        if self.offload_threshold is not None and len(response.body) >= self.offload_threshold:
+            return await asyncio.to_thread(
+                lambda: validate_content(response.content, dto, many=many)
+            )
+
+        start = time.perf_counter()
+        try:
+            return validate_content(response.content, dto, many=many)
+        finally:
+            if self.blocking_hook:
+                self.blocking_hook("decode", time.perf_counter() - start)
+
     async def get(
         self,
         endpoint: str,
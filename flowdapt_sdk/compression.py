@@ -0,0 +1,183 @@
+from __future__ import annotations
+import codecs
+import gzip
+import zlib
+from enum import Enum
+from typing import AsyncIterator
+
+from httpx import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+
+
+class Compression(str, Enum):
+    gzip = "gzip"
+    deflate = "deflate"
+    br = "br"
+    zstd = "zstd"
+
+
+def _require(module: object, encoding: Compression) -> None:
+    if module is None:
+        package = "brotli" if encoding == Compression.br else "zstandard"
+        raise ImportError(
+            f"The `{package}` package is required for `{encoding.value}` compression, "
+            "install it with `pip install flowdapt_sdk[compression]`"
+        )
+
+
+def available_encodings() -> list[Compression]:
+    """
+    Get the content encodings that can be decoded with the installed packages,
+    in order of preference.
+    """
+    encodings = []
+    if zstandard is not None:
+        encodings.append(Compression.zstd)
+    if brotli is not None:
+        encodings.append(Compression.br)
+    encodings.extend([Compression.gzip, Compression.deflate])
+    return encodings
+
+
+def compress(data: bytes, encoding: Compression | str, level: int | None = None) -> bytes:
+    """
+    Compress `data` with the given content encoding.
+
+    :param data: The data to compress.
+    :type data: bytes
+    :param encoding: The content encoding.
+    :type encoding: Compression | str
+    :param level: The compression level, defaults to a fast level suited to request bodies.
+    :type level: int | None
+    :return: The compressed data.
+    :rtype: bytes
+    """
+    encoding = Compression(encoding)
+
+    match encoding:
+        case Compression.gzip:
+            return gzip.compress(data, compresslevel=level or 6, mtime=0)
+        case Compression.deflate:
+            return zlib.compress(data, level or 6)
+        case Compression.br:
+            _require(brotli, encoding)
+            return brotli.compress(data, quality=level or 4)
+        case Compression.zstd:
+            _require(zstandard, encoding)
+            return zstandard.ZstdCompressor(level=level or 3).compress(data)
+
+
+def decompress(data: bytes, encoding: Compression | str) -> bytes:
+    """
+    Decompress `data` encoded with the given content encoding.
+
+    :param data: The data to decompress.
+    :type data: bytes
+    :param encoding: The content encoding.
+    :type encoding: Compression | str
+    :return: The decompressed data.
+    :rtype: bytes
+    """
+    encoding = Compression(encoding)
+
+    match encoding:
+        case Compression.gzip:
+            return gzip.decompress(data)
+        case Compression.deflate:
+            return zlib.decompress(data)
+        case Compression.br:
+            _require(brotli, encoding)
+            return brotli.decompress(data)
+        case Compression.zstd:
+            _require(zstandard, encoding)
+            return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def read_content(response: Response) -> bytes:
+    """
+    Get the decoded body of a response.
+
+    httpx decodes gzip, deflate and brotli itself but leaves zstd untouched, which
+    is decoded here.
+
+    :param response: The response.
+    :type response: Response
+    :return: The decoded body.
+    :rtype: bytes
+    """
+    if not _is_zstd(response):
+        return response.content
+
+    return decompress(response.content, Compression.zstd)
+
+
+def _is_zstd(response: Response) -> bool:
+    return Compression.zstd.value in (
+        value.strip().lower()
+        for value in response.headers.get_list("Content-Encoding", split_commas=True)
+    )
+
+
+async def iter_content(response: Response) -> AsyncIterator[bytes]:
+    """
+    Iterate over the decoded body of a streamed response, decoding zstd as the
+    chunks arrive like httpx does for the other encodings.
+
+    :param response: The streamed response.
+    :type response: Response
+    :return: An async iterator of the decoded chunks.
+    :rtype: AsyncIterator[bytes]
+    """
+    if not _is_zstd(response):
+        async for chunk in response.aiter_bytes():
+            yield chunk
+        return
+
+    _require(zstandard, Compression.zstd)
+    decoder = zstandard.ZstdDecompressor().decompressobj()
+
+    async for chunk in response.aiter_bytes():
+        data = decoder.decompress(chunk)
+        if data:
+            yield data
+
+
+async def iter_lines(response: Response) -> AsyncIterator[str]:
+    """
+    Iterate over the lines of the decoded body of a streamed response, without
+    their line endings.
+
+    :param response: The streamed response.
+    :type response: Response
+    :return: An async iterator of the lines.
+    :rtype: AsyncIterator[str]
+    """
+    if not _is_zstd(response):
+        async for line in response.aiter_lines():
+            yield line
+        return
+
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    pending = ""
+
+    async for chunk in iter_content(response):
+        pending += decoder.decode(chunk)
+        lines = pending.splitlines(keepends=True)
+        # The last line may be incomplete, or a `\r` whose `\n` is still to come
+        pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+
+        for line in lines:
+            yield line.rstrip("\r\n")
+
+    pending += decoder.decode(b"", final=True)
+    for line in pending.splitlines():
+        yield line
@@ -0,0 +1,136 @@
+from __future__ import annotations
+import asyncio
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+from flowdapt_sdk._compat import BaseModel, validate_model
+from flowdapt_sdk.dto.compact import CompactRecord
+from flowdapt_sdk.serialize import decode, is_json, is_msgpack
+
+
+def validate_content(content: Any, dto: type, many: bool = False) -> Any:
+    """
+    Validate decoded content into `dto`, or into a list of `dto` if `many`. `dto` may
+    also be a compact record type, which is built without full validation.
+    """
+    if issubclass(dto, CompactRecord):
+        if many:
+            return [dto.from_dict(item) for item in content]
+        return dto.from_dict(content)
+
+    if many:
+        return [validate_model(dto, item) for item in content]
+    return validate_model(dto, content)
+
+
+def _attach(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+
+    # Before Python 3.13 attaching registers the segment again, but spawned workers
+    # share the resource tracker of the parent which already tracks it. The parent
+    # owns the segment and unregisters it when unlinking, so it must not be
+    # unregistered here as well.
+    return SharedMemory(name=name)
+
+
+def _buffer(shm: SharedMemory) -> memoryview:
+    if shm.buf is None:
+        raise ValueError(f"Shared memory {shm.name} is closed")
+    return shm.buf
+
+
+def _decode_shared(
+    name: str,
+    size: int,
+    content_type: str,
+    dto: type[BaseModel],
+    many: bool,
+) -> Any:
+    shm = _attach(name)
+    try:
+        buffer = _buffer(shm)[:size]
+        try:
+            return validate_content(decode(buffer, content_type), dto, many)
+        finally:
+            buffer.release()
+    finally:
+        shm.close()
+
+
+class DecodePool:
+    """
+    A pool of worker processes that decode and validate large response bodies.
+
+    Decoding and validating a large body holds the GIL for as long as it takes, so a
+    single event loop can only use one core for it. Bodies of at least `threshold`
+    bytes are instead copied once into shared memory, decoded and validated by one
+    of the workers and the validated models sent back, so pulling many large results
+    scales with the number of cores. Smaller bodies are cheaper to handle in place.
+
+    :param max_workers: The number of worker processes, defaults to the number of CPUs.
+    :param threshold: The size in bytes from which bodies are handled by the pool.
+    :param mp_context: The multiprocessing context to start workers with, defaults to `spawn`.
+    """
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        threshold: int = 1024 * 1024,
+        mp_context: Any | None = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.threshold = threshold
+        self.mp_context = mp_context or multiprocessing.get_context("spawn")
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self.mp_context,
+            )
+        return self._executor
+
+    def accepts(self, body: Any, content_type: str) -> bool:
+        """
+        Whether a body should be handled by the pool.
+        """
+        if len(body) < max(self.threshold, 1):
+            return False
+        return is_json(content_type) or is_msgpack(content_type)
+
+    async def validate(
+        self,
+        body: bytes,
+        content_type: str,
+        dto: type[BaseModel],
+        many: bool = False,
+    ) -> Any:
+        """
+        Decode `body` and validate it into `dto`, or into a list of `dto` if `many`,
+        in a worker process.
+        """
+        shm = SharedMemory(create=True, size=len(body))
+        try:
+            _buffer(shm)[:len(body)] = body
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                _decode_shared,
+                shm.name,
+                len(body),
+                content_type,
+                dto,
+                many,
+            )
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
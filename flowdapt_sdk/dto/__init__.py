@@ -37,6 +37,11 @@ from flowdapt_sdk.dto.metrics import (
     V1Alpha1MetricsBucketValue,
     V1Alpha1Metrics,
 )
+from flowdapt_sdk.dto.compact import (
+    CompactRecord,
+    CompactWorkflowRun,
+    CompactMetricsCountValue,
+)
 from flowdapt_sdk.dto.plugin import (
     V1Alpha1PluginMetadata,
     V1Alpha1Plugin,
@@ -83,6 +88,9 @@ __all__ = (
     'V1Alpha1MetricsCountValue',
     'V1Alpha1MetricsBucketValue',
     'V1Alpha1Metrics',
+    'CompactRecord',
+    'CompactWorkflowRun',
+    'CompactMetricsCountValue',
     'V1Alpha1PluginMetadata',
     'V1Alpha1Plugin',
     'V1Alpha1PluginFiles',
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, ClassVar
+from uuid import UUID
+
+from flowdapt_sdk._compat import BaseModel, validate_model
+from flowdapt_sdk.dto.metrics import V1Alpha1MetricsBucketValue, V1Alpha1MetricsCountValue
+from flowdapt_sdk.dto.workflows import V1Alpha1WorkflowRunReadResponse
+
+
+def _datetime(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class CompactRecord(ABC):
+    """
+    A lightweight, read only stand-in for a DTO that is created in large numbers.
+
+    Compact records keep their fields in `__slots__` rather than in a pydantic model,
+    they are built from the decoded payload with light conversions instead of full
+    validation, and can be converted to the DTO they stand for with `to_dto`.
+    """
+    __slots__: tuple[str, ...] = ()
+    __dto__: ClassVar[type[BaseModel]]
+
+    @classmethod
+    @abstractmethod
+    def from_dict(cls, data: dict) -> CompactRecord:
+        """
+        Build a record from a decoded payload.
+        """
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_dto(self) -> Any:
+        return validate_model(self.__dto__, self.to_dict())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is read only")
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({fields})"
+
+
+class CompactWorkflowRun(CompactRecord):
+    __slots__ = ("uid", "name", "workflow", "started_at", "finished_at", "result", "state")
+    __dto__ = V1Alpha1WorkflowRunReadResponse
+
+    def __init__(
+        self,
+        uid: UUID,
+        name: str,
+        workflow: str,
+        started_at: datetime,
+        finished_at: datetime | None,
+        result: Any,
+        state: str,
+    ) -> None:
+        set_field = object.__setattr__
+        set_field(self, "uid", uid)
+        set_field(self, "name", name)
+        set_field(self, "workflow", workflow)
+        set_field(self, "started_at", started_at)
+        set_field(self, "finished_at", finished_at)
+        set_field(self, "result", result)
+        set_field(self, "state", state)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> CompactWorkflowRun:
+        uid, finished_at = data["uid"], data.get("finished_at")
+        return cls(
+            uid=uid if isinstance(uid, UUID) else UUID(uid),
+            name=data["name"],
+            workflow=data["workflow"],
+            started_at=_datetime(data["started_at"]),
+            finished_at=_datetime(finished_at) if finished_at is not None else None,
+            result=data.get("result"),
+            state=data["state"],
+        )
+
+
+class CompactMetricsCountValue(CompactRecord):
+    __slots__ = ("attributes", "start_time_unix_nano", "time_unix_nano", "value")
+    __dto__ = V1Alpha1MetricsCountValue
+
+    def __init__(
+        self,
+        attributes: dict[str, Any],
+        start_time_unix_nano: int,
+        time_unix_nano: int,
+        value: float | int,
+    ) -> None:
+        set_field = object.__setattr__
+        set_field(self, "attributes", attributes)
+        set_field(self, "start_time_unix_nano", start_time_unix_nano)
+        set_field(self, "time_unix_nano", time_unix_nano)
+        set_field(self, "value", value)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> CompactMetricsCountValue:
+        return cls(
+            attributes=data["attributes"],
+            start_time_unix_nano=data["start_time_unix_nano"],
+            time_unix_nano=data["time_unix_nano"],
+            value=data["value"],
+        )
+
+
+def compact_metrics(
+    data: dict[str, list[dict]] | None,
+) -> dict[str, list[CompactMetricsCountValue | V1Alpha1MetricsBucketValue]] | None:
+    """
+    Build compact metrics from a decoded metrics payload. Count values become
+    `CompactMetricsCountValue` records, histogram values are validated as usual.
+    """
+    if data is None:
+        return None
+
+    return {
+        name: [
+            validate_model(V1Alpha1MetricsBucketValue, point)
+            if "bucket_counts" in point
+            else CompactMetricsCountValue.from_dict(point)
+            for point in points
+        ]
+        for name, points in data.items()
+    }
@@ -1,5 +1,14 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import orjson
+
+
 class APIError(Exception):
     status_code: int = 500
+    retryable: bool = False
 
     def __init__(self, detail: str, status_code: int | None = None) -> None:
         self.status_code = status_code or self.status_code
@@ -29,6 +38,13 @@ class MethodNotAllowed(APIError):
     status_code = 405
 
 
+class UnsupportedVersionError(APIError):
+    """
+    The server does not support the requested version of the endpoint.
+    """
+    status_code = 406
+
+
 class ValidationError(APIError):
     status_code = 422
     detail: dict
@@ -38,18 +54,160 @@ class ValidationError(APIError):
         self.detail = detail
 
 
-ErrorMap = {
+class RetryableError(APIError):
+    """
+    An error after which the same request may succeed if retried, optionally
+    after waiting `retry_after` seconds.
+    """
+    retryable = True
+
+    def __init__(
+        self,
+        detail: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(detail, status_code)
+        self.retry_after = retry_after
+
+
+class RequestTimeoutError(RetryableError):
+    status_code = 408
+
+
+class RateLimitedError(RetryableError):
+    status_code = 429
+
+
+class BadGatewayError(RetryableError):
+    status_code = 502
+
+
+class ServiceUnavailableError(RetryableError):
+    status_code = 503
+
+
+class GatewayTimeoutError(RetryableError):
+    status_code = 504
+
+
+class APIConnectionError(RetryableError):
+    """
+    The request failed before a response was received, e.g. the connection
+    was refused, reset or timed out.
+
+    :param sent: Whether the request may have reached the server.
+    """
+    status_code = 0
+
+    def __init__(self, detail: str, sent: bool = True) -> None:
+        super().__init__(detail)
+        self.sent = sent
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}: {self.detail}"
+
+
+class CircuitOpenError(APIError):
+    status_code = 503
+
+    def __init__(
+        self,
+        detail: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(detail, status_code)
+        self.retry_after = retry_after
+
+
+ErrorMap: dict[int, type[APIError]] = {
     400: BadRequestError,
     401: UnauthorizedError,
     403: ForbiddenError,
     404: ResourceNotFoundError,
     405: MethodNotAllowed,
+    406: UnsupportedVersionError,
+    408: RequestTimeoutError,
     422: ValidationError,
+    429: RateLimitedError,
     500: APIError,
+    502: BadGatewayError,
+    503: ServiceUnavailableError,
+    504: GatewayTimeoutError,
 }
 
 def raise_from_json(json: dict) -> None:
-    status_code = json.get("status_code")
-    detail = json.get("detail")
+    status_code = json.get("status_code") or APIError.status_code
+    detail = json.get("detail", "")
 
     raise ErrorMap.get(status_code, APIError)(detail, status_code)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a `Retry-After` header given either in seconds or as an HTTP date.
+
+    :param value: The header value.
+    :type value: str | None
+    :return: The number of seconds to wait, or None if the header is missing or invalid.
+    :rtype: float | None
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def error_from_response(status_code: int, headers: Any, body: bytes) -> APIError:
+    """
+    Build the error for an unsuccessful response.
+
+    JSON error bodies are used for the detail of the error, any other body such as
+    an HTML page from a proxy is used as text so the error type always follows the
+    HTTP status code.
+
+    :param status_code: The HTTP status code of the response.
+    :type status_code: int
+    :param headers: The headers of the response.
+    :type headers: Mapping[str, str]
+    :param body: The body of the response.
+    :type body: bytes
+    :return: The error.
+    :rtype: APIError
+    """
+    try:
+        content = orjson.loads(body) if body else None
+    except orjson.JSONDecodeError:
+        content = None
+
+    if isinstance(content, dict) and "detail" in content:
+        detail = content["detail"]
+    elif content is not None:
+        detail = content
+    else:
+        detail = body.decode("utf-8", errors="replace").strip()[:500] or f"HTTP {status_code}"
+
+    error_cls = ErrorMap.get(status_code)
+    if error_cls is None:
+        error_cls = RetryableError if status_code >= 500 and status_code != 501 else APIError
+
+    if issubclass(error_cls, RetryableError):
+        return error_cls(
+            detail, status_code, retry_after=parse_retry_after(headers.get("Retry-After"))
+        )
+
+    return error_cls(detail, status_code)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+import asyncio
+import os
+from enum import Enum
+from typing import Any, AsyncIterable, Iterable
+
+import orjson
+
+from flowdapt_sdk._compat import model_dump_json, validate_model
+from flowdapt_sdk.dto import V1Alpha1WorkflowRunReadResponse
+from flowdapt_sdk.serialize import serialize
+
+WorkflowRunReadResponse = V1Alpha1WorkflowRunReadResponse
+
+
+class ExportFormat(str, Enum):
+    jsonl = "jsonl"
+    parquet = "parquet"
+
+
+def _require_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "The `pyarrow` package is required to export Parquet files, "
+            "install it with `pip install flowdapt_sdk[parquet]`"
+        ) from e
+    return pyarrow
+
+
+class _JSONLinesWriter:
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.file = open(path, "wb")
+
+    def write(self, runs: list[WorkflowRunReadResponse]) -> None:
+        self.file.write(b"".join(model_dump_json(run).encode("utf-8") + b"\n" for run in runs))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str | os.PathLike) -> None:
+        pa = self.pa = _require_pyarrow()
+
+        self.schema = pa.schema([
+            ("uid", pa.string()),
+            ("name", pa.string()),
+            ("workflow", pa.string()),
+            ("state", pa.string()),
+            ("started_at", pa.timestamp("us", tz="UTC")),
+            ("finished_at", pa.timestamp("us", tz="UTC")),
+            # Results can be anything, they are stored as their JSON representation
+            ("result", pa.string()),
+        ])
+        self.writer = pa.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, runs: list[WorkflowRunReadResponse]) -> None:
+        columns = {
+            "uid": [str(run.uid) for run in runs],
+            "name": [run.name for run in runs],
+            "workflow": [run.workflow for run in runs],
+            "state": [run.state for run in runs],
+            "started_at": [run.started_at for run in runs],
+            "finished_at": [run.finished_at for run in runs],
+            "result": [
+                serialize(run.result).decode("utf-8") if run.result is not None else None
+                for run in runs
+            ],
+        }
+        self.writer.write_table(self.pa.table(columns, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+async def export_workflow_runs(
+    runs: AsyncIterable[WorkflowRunReadResponse] | Iterable[WorkflowRunReadResponse],
+    path: str | os.PathLike,
+    format: ExportFormat | str = ExportFormat.jsonl,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Write workflow runs, including their results, to a JSON Lines or Parquet file.
+
+    Runs are written in batches of `batch_size` as they are produced, so exporting
+    any number of runs, e.g. from `WorkflowsAPI.iter_workflow_runs`, only holds one
+    batch in memory. Writes happen in a thread so they do not block the event loop.
+    In Parquet files every batch is a row group, and results are stored as JSON
+    strings since they have no fixed type.
+
+    :param runs: The runs to export.
+    :type runs: AsyncIterable[WorkflowRunReadResponse] | Iterable[WorkflowRunReadResponse]
+    :param path: The path of the file to write.
+    :type path: str | os.PathLike
+    :param format: The format of the file.
+    :type format: ExportFormat | str
+    :param batch_size: The number of runs written at a time.
+    :type batch_size: int
+    :return: The number of runs written.
+    :rtype: int
+    """
+    writer: _JSONLinesWriter | _ParquetWriter
+    match ExportFormat(format):
+        case ExportFormat.jsonl:
+            writer = _JSONLinesWriter(path)
+        case ExportFormat.parquet:
+            writer = _ParquetWriter(path)
+
+    if not hasattr(runs, "__aiter__"):
+        runs = _aiter(runs)
+
+    count = 0
+    batch: list[WorkflowRunReadResponse] = []
+    try:
+        async for run in runs:
+            batch.append(run)
+            if len(batch) >= batch_size:
+                await asyncio.to_thread(writer.write, batch)
+                count += len(batch)
+                batch = []
+
+        if batch:
+            await asyncio.to_thread(writer.write, batch)
+            count += len(batch)
+    finally:
+        await asyncio.to_thread(writer.close)
+
+    return count
+
+
+async def _aiter(items: Iterable[Any]) -> AsyncIterable[Any]:
+    for item in items:
+        yield item
+
+
+def read_workflow_runs(path: str | os.PathLike) -> Iterable[WorkflowRunReadResponse]:
+    """
+    Read back the runs of a JSON Lines export one at a time.
+
+    :param path: The path of the file.
+    :type path: str | os.PathLike
+    :return: An iterator of the workflow runs.
+    :rtype: Iterable[WorkflowRunReadResponse]
+    """
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield validate_model(WorkflowRunReadResponse, orjson.loads(line))
@@ -0,0 +1,72 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import Callable
+
+
+class LoopLagMonitor:
+    """
+    Measure how late the event loop runs scheduled callbacks.
+
+    The monitor sleeps for `interval` seconds over and over, any time beyond that it
+    takes to wake up is time the loop was blocked by synchronous work (e.g. decoding
+    a large response in place). Every sample is passed to `callback` if one is set,
+    and the number of samples, the total and the largest lag are kept.
+
+    :param interval: Seconds between samples.
+    :param callback: A function called with the lag in seconds of every sample.
+    """
+    def __init__(
+        self,
+        interval: float = 0.1,
+        callback: Callable[[float], None] | None = None,
+    ) -> None:
+        self.interval = interval
+        self.callback = callback
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+        self._task: asyncio.Task | None = None
+
+    @property
+    def mean_lag(self) -> float:
+        return self.total_lag / self.samples if self.samples else 0.0
+
+    def record(self, lag: float) -> None:
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+        if self.callback:
+            self.callback(lag)
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def __aenter__(self) -> LoopLagMonitor:
+        self.start()
+        # Let the first sample start before the body of the block runs
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(samples={self.samples}, "
+            f"mean_lag={self.mean_lag:.6f}, max_lag={self.max_lag:.6f})"
+        )
@@ -0,0 +1,112 @@
+from __future__ import annotations
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, Hashable
+from uuid import UUID
+
+from flowdapt_sdk._compat import BaseModel
+
+# Types whose equal values are interchangeable, any of them can stand for the others
+_ExactTypes = (str, bytes, int, UUID, Enum, type(None))
+
+
+def _scalar_key(value: Any) -> Hashable | None:
+    """
+    A key that is only equal for scalars that are the same in every respect, None for
+    scalars that are not shared.
+    """
+    if isinstance(value, _ExactTypes):
+        return (type(value), value)
+    if isinstance(value, float):
+        # 0.0 == -0.0 and NaN != NaN, their representations tell them apart
+        return (float, repr(value))
+    if isinstance(value, (datetime, time)):
+        # Equal instants in different timezones are different values
+        return (type(value), value.isoformat(), value.tzinfo, value.fold)
+    if isinstance(value, date):
+        return (type(value), value.isoformat())
+    return None
+
+
+class Interner:
+    """
+    Share equal values between decoded resources to cut the memory of large listings.
+
+    Listings repeat a lot: kinds, stage targets, annotation keys, option dicts and
+    whole nested models. The interner replaces every string, scalar, dict, list and
+    nested model of a resource with a canonical instance of an identical value it has
+    seen before, so identical values are only kept in memory once. Values that are
+    equal but not identical, like timestamps of the same instant in different
+    timezones or 0.0 and -0.0, are kept apart. The resources themselves are never
+    merged.
+
+    Shared values are the same objects in several resources, they must be treated as
+    frozen: mutating a nested value in place changes it in every resource sharing it.
+    Canonical values are kept for the lifetime of the interner, so keep one per cache
+    of resources rather than one per process, and call `clear` when the cache is
+    rebuilt.
+    """
+    def __init__(self) -> None:
+        self._values: dict[Hashable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def _identity(self, value: Any) -> Hashable:
+        # Children are already canonical, so containers are identified by the
+        # identity of their children and scalars by their exact value. Scalars that
+        # are not shared are kept alive by the canonical parent, so their id is unique.
+        if isinstance(value, (dict, list, tuple, BaseModel)):
+            return id(value)
+        key = _scalar_key(value)
+        return id(value) if key is None else key
+
+    def _canonical(self, key: Hashable, value: Any) -> Any:
+        return self._values.setdefault(key, value)
+
+    def _share(self, value: Any, top: bool = False) -> Any:
+        key: Hashable
+        if isinstance(value, BaseModel):
+            fields = vars(value)
+            for name, field in fields.items():
+                fields[name] = self._share(field)
+
+            if top:
+                return value
+
+            key = (
+                type(value),
+                tuple((name, self._identity(field)) for name, field in fields.items()),
+            )
+            return self._canonical(key, value)
+        elif isinstance(value, dict):
+            value = {self._share(k): self._share(v) for k, v in value.items()}
+            key = (dict, tuple((self._identity(k), self._identity(v)) for k, v in value.items()))
+            return self._canonical(key, value)
+        elif isinstance(value, (list, tuple)):
+            value = type(value)(self._share(item) for item in value)
+            key = (type(value), tuple(self._identity(item) for item in value))
+            return self._canonical(key, value)
+
+        scalar = _scalar_key(value)
+        if scalar is None:
+            # Values without an exact key are left as they are
+            return value
+        return self._canonical(scalar, value)
+
+    def intern(self, resources: Any) -> Any:
+        """
+        Share the values of a resource, or of a list of resources, with the ones seen
+        before. Models are updated in place and returned.
+
+        :param resources: A validated resource or a list of them.
+        :type resources: Any
+        :return: The resources.
+        :rtype: Any
+        """
+        if isinstance(resources, list):
+            return [self._share(resource, top=True) for resource in resources]
+        return self._share(resources, top=True)
@@ -0,0 +1,242 @@
+from __future__ import annotations
+import asyncio
+import inspect
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from importlib import import_module
+from typing import Any, Callable
+from uuid import uuid4
+
+from flowdapt_sdk._compat import validate_model
+from flowdapt_sdk.dto import (
+    V1Alpha1WorkflowResourceCreateRequest,
+    V1Alpha1WorkflowRunReadResponse,
+    V1Alpha1WorkflowStage,
+)
+
+WorkflowCreateRequest = V1Alpha1WorkflowResourceCreateRequest
+WorkflowRunReadResponse = V1Alpha1WorkflowRunReadResponse
+
+
+class ExecutorBackend(str, Enum):
+    thread = "thread"
+    process = "process"
+
+
+class StageType(str, Enum):
+    simple = "simple"
+    parameterized = "parameterized"
+
+
+class RunState(str, Enum):
+    pending = "pending"
+    running = "running"
+    finished = "finished"
+    failed = "failed"
+
+
+def import_target(target: str) -> Callable:
+    """
+    Import a stage target given as `package.module.function` or `package.module:function`.
+    """
+    module_name, sep, attribute = target.rpartition(":")
+
+    if not sep:
+        module_name, sep, attribute = target.rpartition(".")
+
+    if not sep or not module_name or not attribute:
+        raise ValueError(f"Invalid stage target: {target}")
+
+    obj = import_module(module_name)
+    for part in attribute.split("."):
+        obj = getattr(obj, part)
+
+    if not callable(obj):
+        raise TypeError(f"Stage target is not callable: {target}")
+
+    return obj
+
+
+def _call_target(target: str, args: tuple, kwargs: dict) -> Any:
+    # Runs inside the pool worker, targets are imported there so that
+    # only the target path needs to be pickled for the process backend.
+    func = import_target(target)
+
+    if inspect.iscoroutinefunction(func):
+        return asyncio.run(func(*args, **kwargs))
+
+    return func(*args, **kwargs)
+
+
+def sort_stages(stages: list[V1Alpha1WorkflowStage]) -> list[V1Alpha1WorkflowStage]:
+    """
+    Validate the stage graph and return the stages in a topological order.
+
+    :param stages: The stages of a workflow.
+    :type stages: list[V1Alpha1WorkflowStage]
+    :return: The stages ordered so that every stage comes after its dependencies.
+    :rtype: list[V1Alpha1WorkflowStage]
+    """
+    by_name = {stage.name: stage for stage in stages}
+
+    if len(by_name) != len(stages):
+        raise ValueError("Stage names must be unique")
+
+    for stage in stages:
+        for dependency in stage.depends_on:
+            if dependency not in by_name:
+                raise ValueError(f"Stage `{stage.name}` depends on unknown stage `{dependency}`")
+
+    ordered: list[V1Alpha1WorkflowStage] = []
+    visited: dict[str, bool] = {}
+
+    def visit(stage: V1Alpha1WorkflowStage) -> None:
+        state = visited.get(stage.name)
+        if state is True:
+            return
+        if state is False:
+            raise ValueError(f"Cycle detected in workflow at stage `{stage.name}`")
+
+        visited[stage.name] = False
+        for dependency in stage.depends_on:
+            visit(by_name[dependency])
+        visited[stage.name] = True
+        ordered.append(stage)
+
+    for stage in stages:
+        visit(stage)
+
+    return ordered
+
+
+class LocalExecutor:
+    """
+    Run a workflow definition in-process without a Flowdapt server.
+
+    Stages are imported from their `target` path and executed on a thread or process
+    pool. A stage is submitted as soon as all of the stages it `depends_on` have finished,
+    and when several stages become ready at the same time the ones with the highest
+    `priority` are submitted first.
+
+    Stages without dependencies are called with the workflow input as keyword arguments,
+    other stages are called with the results of their dependencies as positional arguments
+    in the order they are listed in `depends_on`. Parameterized stages are called once per
+    item of their single dependency's result, with the calls running concurrently. The
+    result of the run is the result of the last stage in the workflow definition.
+
+    :param backend: The pool backend to execute stages on, either `thread` or `process`.
+    :param max_workers: The maximum number of stages to execute concurrently.
+    """
+    def __init__(
+        self,
+        backend: ExecutorBackend | str = ExecutorBackend.thread,
+        max_workers: int | None = None,
+    ) -> None:
+        self.backend = ExecutorBackend(backend)
+        self.max_workers = max_workers
+
+    def _create_pool(self) -> Executor:
+        match self.backend:
+            case ExecutorBackend.thread:
+                return ThreadPoolExecutor(max_workers=self.max_workers)
+            case ExecutorBackend.process:
+                return ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _submit(
+        self,
+        pool: Executor,
+        stage: V1Alpha1WorkflowStage,
+        input: dict,
+        results: dict[str, Any],
+    ) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        args = tuple(results[dependency] for dependency in stage.depends_on)
+
+        match StageType(stage.type):
+            case StageType.simple:
+                kwargs = input if not stage.depends_on else {}
+                return loop.run_in_executor(pool, _call_target, stage.target, args, kwargs)
+            case StageType.parameterized:
+                if len(args) != 1:
+                    raise ValueError(
+                        f"Parameterized stage `{stage.name}` must depend on exactly one stage"
+                    )
+                # One call per item so the items of a fanned out stage run in parallel,
+                # the results are gathered in the order of the items
+                return asyncio.gather(
+                    *(
+                        loop.run_in_executor(pool, _call_target, stage.target, (item,), {})
+                        for item in args[0]
+                    )
+                )
+
+    async def run(
+        self,
+        workflow: WorkflowCreateRequest | dict,
+        input: dict | None = None,
+    ) -> WorkflowRunReadResponse:
+        """
+        Run a workflow locally.
+
+        :param workflow: The workflow definition to run.
+        :type workflow: WorkflowCreateRequest | dict
+        :param input: The input data for the workflow.
+        :type input: dict | None
+        :return: The workflow run.
+        :rtype: WorkflowRunReadResponse
+        """
+        definition: WorkflowCreateRequest = (
+            validate_model(WorkflowCreateRequest, workflow)
+            if isinstance(workflow, dict) else workflow
+        )
+
+        stages = sort_stages(definition.spec.stages)
+        input = input or {}
+
+        started_at = datetime.utcnow()
+        results: dict[str, Any] = {}
+        remaining = {stage.name: stage for stage in stages}
+        running: dict[asyncio.Future, str] = {}
+        state, result = RunState.finished, None
+
+        pool = self._create_pool()
+        try:
+            while remaining or running:
+                ready = sorted(
+                    (
+                        stage for stage in remaining.values()
+                        if all(dependency in results for dependency in stage.depends_on)
+                    ),
+                    key=lambda stage: stage.priority or 0,
+                    reverse=True,
+                )
+
+                for stage in ready:
+                    del remaining[stage.name]
+                    running[self._submit(pool, stage, input, results)] = stage.name
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        except Exception as e:
+            for future in running:
+                future.cancel()
+            state, result = RunState.failed, f"{type(e).__name__}: {e}"
+        else:
+            result = results[definition.spec.stages[-1].name] if stages else None
+        finally:
+            # Shutting down with `wait=True` would block the event loop until the stages
+            # still running after a failure or cancellation finish
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return WorkflowRunReadResponse(
+            uid=uuid4(),
+            name=f"{definition.metadata.name}-{uuid4().hex[:8]}",
+            workflow=definition.metadata.name,
+            started_at=started_at,
+            finished_at=datetime.utcnow(),
+            result=result,
+            state=state.value,
+        )
@@ -0,0 +1,304 @@
+from __future__ import annotations
+import hashlib
+import os
+import shutil
+import stat
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator
+from urllib.parse import quote
+
+import orjson
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore[assignment]
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _hash_file(path: Path, chunk_size: int = 1024 * 1024) -> Any:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest
+
+
+class MirrorEntry:
+    """
+    What is known about a mirrored file: the hash and size of its content and the
+    validators the server sent with it.
+    """
+    def __init__(
+        self,
+        sha256: str,
+        size: int,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        self.sha256 = sha256
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def to_dict(self) -> dict:
+        return {
+            "sha256": self.sha256,
+            "size": self.size,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(sha256={self.sha256!r}, size={self.size})"
+
+
+class PartialDownload:
+    """
+    A download in progress, kept on disk so it can be resumed with a Range request.
+
+    The partial file is locked while it is written to so several processes sharing a
+    cache do not write to it at once, a process that can not take the lock downloads
+    to a private file instead and can not resume.
+    """
+    def __init__(self, path: Path, validator: str | None, locked: bool) -> None:
+        self.path = path
+        self.validator = validator
+        self.locked = locked
+        self.file: IO[bytes] = open(path, "ab")
+        self.digest = hashlib.sha256()
+
+        if locked and fcntl is not None:
+            try:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self.file.close()
+                raise
+
+    @property
+    def offset(self) -> int:
+        return self.file.tell()
+
+    def restart(self) -> None:
+        self.file.seek(0)
+        self.file.truncate()
+        self.digest = hashlib.sha256()
+
+    def resume(self) -> None:
+        self.file.flush()
+        self.digest = _hash_file(self.path)
+
+    def write(self, chunk: bytes) -> None:
+        self.file.write(chunk)
+        self.digest.update(chunk)
+
+    def writelines(self, chunks: Iterable[bytes]) -> None:
+        for chunk in chunks:
+            self.write(chunk)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class PluginMirror:
+    """
+    A content addressed cache of plugin files on the local disk.
+
+    Files are stored once under `objects/` by the SHA-256 of their content no matter
+    how many plugins, versions or destinations use them, and linked (or copied where
+    links are not possible) into destination directories. Objects are read only, so a
+    linked file can not be edited in place and change it for every destination. An
+    index records the hash, size and validators (ETag and Last-Modified) of every
+    mirrored file so unchanged files are revalidated with a conditional request instead
+    of downloaded again. Every write goes to a temporary file that is renamed into
+    place, so readers never see a partially written file and the cache can be shared
+    between processes.
+
+    :param root: The directory of the cache.
+    """
+    def __init__(self, root: str | os.PathLike) -> None:
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.partials = self.root / "partial"
+        self.index_path = self.root / "index.json"
+
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.partials.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(plugin_name: str, file_name: str) -> str:
+        return f"{plugin_name}/{file_name}"
+
+    def object_path(self, sha256: str) -> Path:
+        return self.objects / sha256[:2] / sha256
+
+    def load_index(self) -> dict[str, MirrorEntry]:
+        try:
+            data = orjson.loads(self.index_path.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return {}
+        return {key: MirrorEntry(**entry) for key, entry in data.items()}
+
+    def save_index(self, index: dict[str, MirrorEntry]) -> None:
+        _atomic_write(
+            self.index_path,
+            orjson.dumps({key: entry.to_dict() for key, entry in index.items()}),
+        )
+
+    @contextmanager
+    def _index_lock(self) -> Iterator[None]:
+        with open(self.root / "index.lock", "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            # The lock is released when the file is closed
+            yield
+
+    def update_index(self, updates: dict[str, MirrorEntry], removed: Iterable[str] = ()) -> None:
+        """
+        Add and remove entries of the index, keeping what other processes sharing the
+        cache saved in the meantime. The index is locked while it is updated.
+        """
+        with self._index_lock():
+            index = self.load_index()
+            index.update(updates)
+            for key in removed:
+                index.pop(key, None)
+            self.save_index(index)
+
+    def is_current(self, entry: MirrorEntry, target: Path) -> bool:
+        """
+        Whether `target` holds the content described by `entry`.
+        """
+        try:
+            return target.stat().st_size == entry.size and (
+                target.samefile(self.object_path(entry.sha256))
+                or _hash_file(target).hexdigest() == entry.sha256
+            )
+        except OSError:
+            return False
+
+    def open_partial(self, key: str) -> PartialDownload:
+        """
+        Open the partial download of `key`, resuming a previous one if it exists.
+        """
+        path = self.partials / quote(key, safe="")
+
+        try:
+            validator = path.with_name(path.name + ".validator").read_text()
+        except FileNotFoundError:
+            validator = None
+
+        try:
+            partial = PartialDownload(path, validator, locked=True)
+        except BlockingIOError:
+            # Another process is downloading the same file
+            private = path.with_name(f"{path.name}.{uuid.uuid4().hex}")
+            partial = PartialDownload(private, None, locked=False)
+
+        if partial.validator is None:
+            partial.restart()
+
+        return partial
+
+    def set_validator(self, partial: PartialDownload, validator: str | None) -> None:
+        """
+        Record the validator of the response a partial download is written from, it
+        is only resumed from a response with the same validator.
+        """
+        partial.validator = validator
+        if partial.locked:
+            validator_path = partial.path.with_name(partial.path.name + ".validator")
+            if validator:
+                validator_path.write_text(validator)
+            else:
+                validator_path.unlink(missing_ok=True)
+
+    def commit(self, partial: PartialDownload) -> tuple[str, int]:
+        """
+        Move a complete download into the object store.
+
+        :return: The SHA-256 and size of the content.
+        """
+        partial.file.flush()
+        os.fsync(partial.file.fileno())
+        sha256, size = partial.digest.hexdigest(), partial.offset
+
+        target = self.object_path(sha256)
+        target.parent.mkdir(exist_ok=True)
+
+        if target.exists():
+            # Another download already stored the same content
+            partial.path.unlink(missing_ok=True)
+        else:
+            os.chmod(partial.path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(partial.path, target)
+
+        partial.close()
+        partial.path.with_name(partial.path.name + ".validator").unlink(missing_ok=True)
+        return sha256, size
+
+    def discard(self, partial: PartialDownload) -> None:
+        """
+        Close a partial download, keeping it for a later resume if anything was written.
+        """
+        if partial.file.closed:
+            return
+
+        empty = not partial.offset
+        partial.close()
+        if not partial.locked or empty:
+            partial.path.unlink(missing_ok=True)
+
+    def materialize(self, sha256: str, target: Path) -> None:
+        """
+        Atomically place the object with the given hash at `target`.
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+
+        try:
+            os.link(self.object_path(sha256), tmp)
+        except OSError:
+            shutil.copyfile(self.object_path(sha256), tmp)
+
+        os.replace(tmp, target)
+
+
+class SyncResult:
+    """
+    The outcome of mirroring the files of a plugin.
+
+    :param files: The local path of every file of the plugin.
+    :param downloaded: The files whose content was downloaded.
+    :param unchanged: The files that were already up to date.
+    :param removed: The files that were removed because the plugin no longer has them.
+    """
+    def __init__(self) -> None:
+        self.files: dict[str, Path] = {}
+        self.downloaded: list[str] = []
+        self.unchanged: list[str] = []
+        self.removed: list[str] = []
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(files={len(self.files)}, "
+            f"downloaded={len(self.downloaded)}, unchanged={len(self.unchanged)}, "
+            f"removed={len(self.removed)})"
+        )
+
+
+def resolve_target(dest: Path, file_name: str) -> Path:
+    """
+    Get the path of a plugin file under `dest`, refusing names that escape it.
+    """
+    target = (dest / file_name).resolve()
+    if not target.is_relative_to(dest.resolve()):
+        raise ValueError(f"Plugin file name escapes the destination: {file_name}")
+    return target
@@ -0,0 +1,163 @@
+from __future__ import annotations
+import asyncio
+import re
+import time
+
+
+class RateLimitStats:
+    """
+    Wait time statistics of a token bucket.
+    """
+    def __init__(self) -> None:
+        self.requests = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        return self.total_wait / self.requests if self.requests else 0.0
+
+    def record(self, wait: float, delayed: bool) -> None:
+        self.requests += 1
+        if delayed:
+            self.delayed += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(requests={self.requests}, delayed={self.delayed}, "
+            f"mean_wait={self.mean_wait:.4f}, max_wait={self.max_wait:.4f})"
+        )
+
+
+class TokenBucket:
+    """
+    A token bucket refilled at `rate` tokens per second holding at most `capacity` tokens.
+
+    Callers that find the bucket empty wait for tokens rather than failing, and are
+    served in the order they arrived.
+
+    :param rate: The number of tokens added per second.
+    :param capacity: The maximum number of tokens, i.e. the allowed burst. Defaults to `rate`.
+    """
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.stats = RateLimitStats()
+
+        self._updated_at = time.monotonic()
+        # asyncio.Lock wakes waiters in FIFO order which keeps the bucket fair
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take `tokens` from the bucket, waiting until they are available.
+
+        :param tokens: The number of tokens to take.
+        :type tokens: float
+        :return: The number of seconds spent waiting.
+        :rtype: float
+        """
+        start = time.monotonic()
+        delayed = self._lock.locked()
+
+        async with self._lock:
+            self._refill()
+            while self.tokens < tokens:
+                delayed = True
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+        wait = time.monotonic() - start if delayed else 0.0
+        self.stats.record(wait, delayed)
+        return wait
+
+
+def _compile_pattern(pattern: str) -> tuple[str | None, re.Pattern]:
+    method, _, path = pattern.strip().rpartition(" ")
+    parts = re.split(r"(\{[^/]*\})", "/" + path.lstrip("/"))
+    regex = "".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts)
+    return (method.upper() or None, re.compile(regex + "/?"))
+
+
+class RateLimiter:
+    """
+    Client side rate limiting with a global budget and per endpoint budgets.
+
+    Endpoint budgets are keyed by a path pattern, optionally prefixed by a method,
+    e.g. `/metrics` or `POST /workflows/{identifier}/run`. A request takes a token
+    from the global bucket and from the first endpoint bucket whose pattern matches
+    its path.
+
+    :param rate: The global number of requests per second, or None for no global limit.
+    :param burst: The global burst size. Defaults to `rate`.
+    :param endpoints: A mapping of endpoint pattern to `rate` or `(rate, burst)`.
+    """
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: float | None = None,
+        endpoints: dict[str, float | tuple[float, float | None]] | None = None,
+    ) -> None:
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.endpoints: list[tuple[str, str | None, re.Pattern, TokenBucket]] = []
+
+        for pattern, limits in (endpoints or {}).items():
+            endpoint_rate, endpoint_burst = (
+                limits if isinstance(limits, tuple) else (limits, None)
+            )
+            method, regex = _compile_pattern(pattern)
+            self.endpoints.append(
+                (pattern, method, regex, TokenBucket(endpoint_rate, endpoint_burst))
+            )
+
+    @property
+    def stats(self) -> dict[str, RateLimitStats]:
+        """
+        Wait time statistics per bucket, the global bucket is keyed by `*`.
+        """
+        stats = {pattern: bucket.stats for pattern, _, _, bucket in self.endpoints}
+        if self.bucket:
+            stats["*"] = self.bucket.stats
+        return stats
+
+    def match(self, method: str, path: str) -> TokenBucket | None:
+        for _, pattern_method, regex, bucket in self.endpoints:
+            if pattern_method not in (None, method.upper()):
+                continue
+            if regex.fullmatch(path):
+                return bucket
+        return None
+
+    async def acquire(self, method: str, path: str) -> float:
+        """
+        Wait until a request to `path` is allowed.
+
+        :param method: The HTTP method of the request.
+        :type method: str
+        :param path: The path of the request.
+        :type path: str
+        :return: The number of seconds spent waiting.
+        :rtype: float
+        """
+        wait = 0.0
+        endpoint_bucket = self.match(method, path)
+
+        if endpoint_bucket:
+            wait += await endpoint_bucket.acquire()
+        if self.bucket:
+            wait += await self.bucket.acquire()
+
+        return wait
@@ -0,0 +1,285 @@
+from __future__ import annotations
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+
+from flowdapt_sdk.errors import CircuitOpenError
+
+
+def endpoint_family(endpoint: str) -> str:
+    """
+    Get the family of an endpoint, the first segment of its path, e.g. `workflows`
+    for `/workflows/{identifier}/run`.
+    """
+    return endpoint.lstrip("/").split("/", 1)[0].split("?", 1)[0]
+
+
+class CircuitState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class _Circuit:
+    def __init__(self) -> None:
+        self.state = CircuitState.closed
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trials = 0
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker tracking each endpoint family separately.
+
+    After `failure_threshold` consecutive failures (transport errors or 5xx responses)
+    the circuit of that family opens and requests to it fail fast with a
+    `CircuitOpenError` instead of reaching the server. Once `recovery_timeout`
+    seconds have passed the circuit is half open and lets `half_open_requests`
+    trial requests through, closing again if they succeed or reopening if one fails.
+
+    :param failure_threshold: The number of consecutive failures that opens a circuit.
+    :param recovery_timeout: Seconds a circuit stays open before trial requests are allowed.
+    :param half_open_requests: The number of concurrent trial requests while half open.
+    """
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_requests: int = 1,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_requests = half_open_requests
+        self._circuits: dict[str, _Circuit] = {}
+
+    def state(self, family: str) -> CircuitState:
+        circuit = self._circuits.get(family)
+        if circuit is None:
+            return CircuitState.closed
+
+        if (
+            circuit.state == CircuitState.open
+            and time.monotonic() - circuit.opened_at >= self.recovery_timeout
+        ):
+            circuit.state = CircuitState.half_open
+            circuit.trials = 0
+
+        return circuit.state
+
+    def before_request(self, family: str) -> None:
+        """
+        Check whether a request to `family` may proceed, raising `CircuitOpenError` if not.
+        """
+        match self.state(family):
+            case CircuitState.closed:
+                return
+            case CircuitState.open:
+                circuit = self._circuits[family]
+                retry_after = self.recovery_timeout - (time.monotonic() - circuit.opened_at)
+                raise CircuitOpenError(
+                    f"Circuit for `{family}` is open", retry_after=max(retry_after, 0.0)
+                )
+            case CircuitState.half_open:
+                circuit = self._circuits[family]
+                if circuit.trials >= self.half_open_requests:
+                    raise CircuitOpenError(
+                        f"Circuit for `{family}` is half open", retry_after=0.0
+                    )
+                circuit.trials += 1
+
+    def release(self, family: str) -> None:
+        """
+        Give back the trial slot of a request whose outcome is unknown, e.g. because
+        it was cancelled, so that the circuit does not stay half open for good.
+        """
+        circuit = self._circuits.get(family)
+        if circuit is not None and circuit.state == CircuitState.half_open and circuit.trials:
+            circuit.trials -= 1
+
+    def record_success(self, family: str) -> None:
+        circuit = self._circuits.get(family)
+        if circuit is not None:
+            circuit.state = CircuitState.closed
+            circuit.failures = 0
+
+    def record_failure(self, family: str) -> None:
+        circuit = self._circuits.setdefault(family, _Circuit())
+        circuit.failures += 1
+
+        if (
+            circuit.state == CircuitState.half_open
+            or circuit.failures >= self.failure_threshold
+        ):
+            circuit.state = CircuitState.open
+            circuit.opened_at = time.monotonic()
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limit the number of in-flight requests, adapting the limit to observed latency.
+
+    The limit follows an AIMD (additive increase, multiplicative decrease) scheme.
+    The no-load latency is estimated from the lowest latency observed recently, for
+    every kind of request separately since e.g. running a workflow is slower than
+    listing workflows by design; while responses come back within `tolerance` times
+    that latency the limit grows by one per `limit` successful requests, and whenever
+    a request fails or is slower than that it is multiplied by `backoff`. Requests
+    over the limit wait in FIFO order.
+
+    :param initial_limit: The starting concurrency limit.
+    :param min_limit: The lowest the limit can go.
+    :param max_limit: The highest the limit can go.
+    :param tolerance: How much slower than the no-load latency a request may be before
+        it is considered a sign of overload.
+    :param backoff: The factor the limit is multiplied by on overload.
+    :param window: The number of latency samples the no-load latency of a kind of
+        request is estimated over.
+    """
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        window: int = 100,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.window = window
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+
+        self._samples: dict[str, deque[float]] = {}
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def no_load_latency(self, key: str = "") -> float | None:
+        """
+        The estimated no-load latency of a kind of request, None before any sample.
+        """
+        samples = self._samples.get(key)
+        return min(samples) if samples else None
+
+    async def acquire(self) -> None:
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # We were handed a slot but got cancelled, pass it on
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(
+        self,
+        latency: float | None = None,
+        dropped: bool = False,
+        key: str = "",
+    ) -> None:
+        """
+        Release a slot and update the limit.
+
+        :param latency: The latency of the request in seconds, if it completed and
+            its latency says something about the load of the server.
+        :param dropped: Whether the request failed in a way that indicates overload.
+        :param key: The kind of request, latencies are only compared to the no-load
+            latency of the same kind.
+        """
+        self.in_flight -= 1
+
+        if dropped:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif latency is not None:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(latency)
+            baseline = min(samples)
+
+            if latency > baseline * self.tolerance:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class HedgingPolicy:
+    """
+    When and how often to hedge idempotent requests.
+
+    A hedged request is duplicated if it has not completed after a delay, the first
+    of the two responses is used and the other request is cancelled. The delay is
+    either fixed or the `quantile` of the recently observed latencies, so that only
+    the slowest requests are hedged. To bound the extra load every request earns
+    `budget` hedges, e.g. a budget of 0.1 allows at most one hedge per ten requests.
+
+    :param delay: Seconds to wait before hedging. Defaults to the observed `quantile` latency.
+    :param quantile: The latency quantile to use as the delay when `delay` is not set.
+    :param budget: The fraction of requests that may be hedged.
+    :param min_samples: The number of latencies to observe before hedging on a quantile.
+    :param window: The number of recent latencies to compute the quantile over.
+    """
+    def __init__(
+        self,
+        delay: float | None = None,
+        quantile: float = 0.95,
+        budget: float = 0.1,
+        min_samples: int = 20,
+        window: int = 1000,
+    ) -> None:
+        self.delay = delay
+        self.quantile = quantile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.hedged = 0
+
+        self._tokens = 1.0
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+        self._tokens = min(self._tokens + self.budget, max(1.0, self.budget * 10))
+
+    def hedge_delay(self) -> float | None:
+        """
+        Get the delay after which to hedge, or None if there is not enough data yet.
+        """
+        if self.delay is not None:
+            return self.delay
+
+        if len(self._samples) < self.min_samples:
+            return None
+
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(len(samples) * self.quantile))]
+
+    def try_hedge(self) -> bool:
+        """
+        Take a hedge from the budget, returning whether one was available.
+        """
+        if self._tokens < 1.0:
+            return False
+
+        self._tokens -= 1.0
+        self.hedged += 1
+        return True
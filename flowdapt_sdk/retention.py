@@ -0,0 +1,92 @@
+from __future__ import annotations
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+DefaultCleanupStates = ("finished", "failed")
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps from the API are in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _cutoff(value: datetime | timedelta | None, now: datetime) -> datetime | None:
+    if value is None:
+        return None
+    return now - value if isinstance(value, timedelta) else _as_utc(value)
+
+
+def select_runs(
+    runs: Iterable[Any],
+    states: Iterable[str] | None = DefaultCleanupStates,
+    started_before: datetime | timedelta | None = None,
+    finished_before: datetime | timedelta | None = None,
+    now: datetime | None = None,
+) -> list[Any]:
+    """
+    Select the workflow runs matching a retention policy.
+
+    :param runs: The workflow runs to select from.
+    :type runs: Iterable[Any]
+    :param states: The states of the runs to select, None for any state.
+    :type states: Iterable[str] | None
+    :param started_before: Only select runs started before this time, or longer ago
+        than this duration.
+    :type started_before: datetime | timedelta | None
+    :param finished_before: Only select runs finished before this time, or longer ago
+        than this duration. Runs that have not finished are never selected by it.
+    :type finished_before: datetime | timedelta | None
+    :param now: The current time durations are relative to, defaults to now.
+    :type now: datetime | None
+    :return: The selected runs.
+    :rtype: list[Any]
+    """
+    now = _as_utc(now or datetime.now(timezone.utc))
+    states = set(states) if states is not None else None
+    started_cutoff = _cutoff(started_before, now)
+    finished_cutoff = _cutoff(finished_before, now)
+
+    return [
+        run for run in runs
+        if (states is None or run.state in states)
+        and (started_cutoff is None or _as_utc(run.started_at) < started_cutoff)
+        and (
+            finished_cutoff is None
+            or (run.finished_at is not None and _as_utc(run.finished_at) < finished_cutoff)
+        )
+    ]
+
+
+class CleanupProgress:
+    """
+    The progress of a bulk cleanup of workflow runs.
+
+    :param selected: The identifiers of the runs selected for deletion.
+    :param dry_run: Whether runs are only selected and not deleted.
+    :param more: Whether the last listing of runs was full, so older runs may remain
+        that were not considered.
+    """
+    def __init__(self, selected: list[str], dry_run: bool = False, more: bool = False) -> None:
+        self.selected = selected
+        self.dry_run = dry_run
+        self.more = more
+        self.deleted: list[str] = []
+        self.failed: dict[str, Exception] = {}
+
+    @property
+    def total(self) -> int:
+        return len(self.selected)
+
+    @property
+    def done(self) -> int:
+        return len(self.deleted) + len(self.failed)
+
+    @property
+    def remaining(self) -> int:
+        return self.total - self.done
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(total={self.total}, deleted={len(self.deleted)}, "
+            f"failed={len(self.failed)}, dry_run={self.dry_run}, more={self.more})"
+        )
@@ -0,0 +1,556 @@
+from __future__ import annotations
+import operator
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator
+
+import orjson
+
+from flowdapt_sdk._compat import validate_model
+from flowdapt_sdk.dto import (
+    V1Alpha1TriggerRuleResourceReadResponse,
+    V1Alpha1TriggerRuleResourceSpec,
+    V1Alpha1TriggerRuleType,
+)
+from flowdapt_sdk.serialize import deserialize
+
+TriggerRuleReadResponse = V1Alpha1TriggerRuleResourceReadResponse
+Predicate = Callable[[dict], bool]
+Expression = Callable[[dict], Any]
+
+_MISSING = object()
+
+
+def _resolve_var(data: Any, path: str, default: Any = None) -> Any:
+    if path == "":
+        return data
+
+    for part in str(path).split("."):
+        if isinstance(data, dict):
+            data = data.get(part, _MISSING)
+        elif isinstance(data, (list, tuple)) and part.lstrip("-").isdigit():
+            try:
+                data = data[int(part)]
+            except IndexError:
+                data = _MISSING
+        else:
+            data = _MISSING
+
+        if data is _MISSING:
+            return default
+
+    return data
+
+
+def _truthy(value: Any) -> bool:
+    # JSON Logic truthiness, an empty list is falsy just like in Python
+    return bool(value)
+
+
+def _binary(
+    op: Callable[[Any, Any], Any],
+    default: Any = False,
+) -> Callable[[list[Expression]], Expression]:
+    # Operands of the wrong type, or a division by zero, evaluate to `default`
+    # rather than failing the evaluation of every event
+    def build(args: list[Expression]) -> Expression:
+        left, right = args
+
+        def evaluate(data: dict) -> Any:
+            try:
+                return op(left(data), right(data))
+            except (TypeError, ValueError, ArithmeticError):
+                return default
+        return evaluate
+    return build
+
+
+def _between(op: Callable[[Any, Any], Any]) -> Callable[[list[Expression]], Expression]:
+    # `<` and `<=` accept three arguments to test that a value is between two others
+    def build(args: list[Expression]) -> Expression:
+        if len(args) == 2:
+            return _binary(op)(args)
+
+        low, value, high = args
+
+        def evaluate(data: dict) -> Any:
+            try:
+                middle = value(data)
+                return op(low(data), middle) and op(middle, high(data))
+            except (TypeError, ValueError, ArithmeticError):
+                return False
+        return evaluate
+    return build
+
+
+def _and(args: list[Expression]) -> Expression:
+    def evaluate(data: dict) -> Any:
+        value = None
+        for arg in args:
+            value = arg(data)
+            if not _truthy(value):
+                return value
+        return value
+    return evaluate
+
+
+def _or(args: list[Expression]) -> Expression:
+    def evaluate(data: dict) -> Any:
+        value = None
+        for arg in args:
+            value = arg(data)
+            if _truthy(value):
+                return value
+        return value
+    return evaluate
+
+
+def _not(args: list[Expression]) -> Expression:
+    (arg,) = args
+    return lambda data: not _truthy(arg(data))
+
+
+def _bool(args: list[Expression]) -> Expression:
+    (arg,) = args
+    return lambda data: _truthy(arg(data))
+
+
+def _if(args: list[Expression]) -> Expression:
+    def evaluate(data: dict) -> Any:
+        for index in range(0, len(args) - 1, 2):
+            if _truthy(args[index](data)):
+                return args[index + 1](data)
+        return args[-1](data) if len(args) % 2 else None
+    return evaluate
+
+
+def _in(args: list[Expression]) -> Expression:
+    needle, haystack = args
+
+    def evaluate(data: dict) -> bool:
+        try:
+            return needle(data) in haystack(data)
+        except TypeError:
+            return False
+    return evaluate
+
+
+def _var(args: list[Expression]) -> Expression:
+    path = args[0] if args else (lambda data: "")
+    default = args[1] if len(args) > 1 else (lambda data: None)
+    return lambda data: _resolve_var(data, path(data), default(data))
+
+
+def _missing(args: list[Expression]) -> Expression:
+    def evaluate(data: dict) -> list:
+        keys = [arg(data) for arg in args]
+        if len(keys) == 1 and isinstance(keys[0], list):
+            keys = keys[0]
+        return [key for key in keys if _resolve_var(data, key, _MISSING) in (_MISSING, None, "")]
+    return evaluate
+
+
+def _variadic(reducer: Callable[[list], Any]) -> Callable[[list[Expression]], Expression]:
+    def build(args: list[Expression]) -> Expression:
+        def evaluate(data: dict) -> Any:
+            try:
+                return reducer([arg(data) for arg in args])
+            except (TypeError, ValueError, ArithmeticError):
+                return None
+        return evaluate
+    return build
+
+
+def _sum(values: list) -> Any:
+    return sum(float(value) for value in values)
+
+
+def _product(values: list) -> Any:
+    result = 1.0
+    for value in values:
+        result *= float(value)
+    return result
+
+
+def _subtract(values: list) -> Any:
+    if len(values) == 1:
+        return -float(values[0])
+    return float(values[0]) - float(values[1])
+
+
+Operators: dict[str, Callable[[list[Expression]], Expression]] = {
+    "var": _var,
+    "missing": _missing,
+    "==": _binary(operator.eq),
+    "===": _binary(operator.eq),
+    "!=": _binary(operator.ne),
+    "!==": _binary(operator.ne),
+    ">": _binary(operator.gt),
+    ">=": _binary(operator.ge),
+    "<": _between(operator.lt),
+    "<=": _between(operator.le),
+    "and": _and,
+    "or": _or,
+    "!": _not,
+    "!!": _bool,
+    "if": _if,
+    "?:": _if,
+    "in": _in,
+    "+": _variadic(_sum),
+    "*": _variadic(_product),
+    "-": _variadic(_subtract),
+    "/": _binary(lambda a, b: float(a) / float(b), default=None),
+    "%": _binary(lambda a, b: float(a) % float(b), default=None),
+    "min": _variadic(lambda values: min(float(value) for value in values)),
+    "max": _variadic(lambda values: max(float(value) for value in values)),
+    "cat": _variadic(lambda values: "".join(str(value) for value in values)),
+}
+
+
+def _compile_expression(rule: Any) -> Expression:
+    if isinstance(rule, list):
+        items = [_compile_expression(item) for item in rule]
+        return lambda data: [item(data) for item in items]
+
+    if not isinstance(rule, dict) or len(rule) != 1:
+        return lambda data: rule
+
+    ((name, args),) = rule.items()
+
+    if name not in Operators:
+        raise ValueError(f"Unsupported condition operator: {name}")
+
+    if not isinstance(args, list):
+        args = [args]
+
+    return Operators[name]([_compile_expression(arg) for arg in args])
+
+
+@lru_cache(maxsize=1024)
+def _compile_condition(key: bytes) -> Predicate:
+    expression = _compile_expression(deserialize(key))
+    return lambda data: _truthy(expression(data))
+
+
+def compile_condition(rule: dict[str, Any]) -> Predicate:
+    """
+    Compile a condition rule into a predicate.
+
+    Condition rules are JSON Logic expressions, e.g.
+    `{"and": [{"==": [{"var": "type"}, "ingest"]}, {">": [{"var": "size"}, 10]}]}`.
+    Compiled predicates are cached so compiling the same rule twice is cheap.
+
+    :param rule: The condition rule to compile.
+    :type rule: dict[str, Any]
+    :return: A callable that takes an event and returns whether the rule matches it.
+    :rtype: Callable[[dict], bool]
+    """
+    return _compile_condition(orjson.dumps(rule, option=orjson.OPT_SORT_KEYS))
+
+
+class CronField:
+    def __init__(self, values: frozenset[int], restricted: bool) -> None:
+        self.values = values
+        self.restricted = restricted
+
+    def __contains__(self, value: int) -> bool:
+        return value in self.values
+
+
+_CRON_RANGES = (
+    (0, 59),  # minute
+    (0, 23),  # hour
+    (1, 31),  # day of month
+    (1, 12),  # month
+    (0, 7),   # day of week, 0 and 7 are both Sunday
+)
+_CRON_NAMES = {
+    3: {name: index + 1 for index, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+    )},
+    4: {name: index for index, name in enumerate(
+        ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+    )},
+}
+_CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+
+def _parse_cron_value(value: str, position: int) -> int:
+    names = _CRON_NAMES.get(position, {})
+    return names[value.lower()] if value.lower() in names else int(value)
+
+
+def _parse_cron_field(field: str, position: int) -> CronField:
+    low, high = _CRON_RANGES[position]
+    values: set[int] = set()
+
+    for part in field.split(","):
+        part, _, step = part.partition("/")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (_parse_cron_value(value, position) for value in part.split("-", 1))
+        else:
+            start = _parse_cron_value(part, position)
+            end = high if step else start
+
+        if not low <= start <= end <= high:
+            raise ValueError(f"Invalid cron field: {field}")
+
+        values.update(range(start, end + 1, int(step) if step else 1))
+
+    if position == 4 and 7 in values:
+        values.discard(7)
+        values.add(0)
+
+    return CronField(frozenset(values), restricted=field != "*")
+
+
+class CronSchedule:
+    """
+    A compiled 5 field cron expression.
+
+    :param expression: The cron expression, e.g. `*/5 * * * *` or `@hourly`.
+    """
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        fields = _CRON_ALIASES.get(expression.strip(), expression).split()
+
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: {expression}")
+
+        (
+            self.minutes,
+            self.hours,
+            self.days,
+            self.months,
+            self.weekdays,
+        ) = (_parse_cron_field(field, position) for position, field in enumerate(fields))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.expression!r})"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_matches = dt.day in self.days
+        weekday_matches = (dt.isoweekday() % 7) in self.weekdays
+
+        # Standard cron semantics, if both fields are restricted either may match
+        if self.days.restricted and self.weekdays.restricted:
+            return day_matches or weekday_matches
+        return day_matches and weekday_matches
+
+    def next_fire_time(self, after: datetime) -> datetime:
+        """
+        Get the first time strictly after `after` at which the schedule fires.
+
+        :param after: The time to start searching from.
+        :type after: datetime
+        :return: The next fire time.
+        :rtype: datetime
+        """
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=5 * 366)
+
+        while dt < limit:
+            if dt.month not in self.months:
+                year, month = divmod(dt.month, 12)
+                dt = dt.replace(year=dt.year + year, month=month + 1, day=1, hour=0, minute=0)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+
+        raise ValueError(f"Cron expression never fires: {self.expression}")
+
+    def fire_times(
+        self,
+        start: datetime,
+        end: datetime | None = None,
+        count: int | None = None,
+    ) -> Iterator[datetime]:
+        """
+        Iterate over the fire times after `start`, up to `end` and/or `count` times.
+
+        :param start: The time to start from.
+        :type start: datetime
+        :param end: The time to stop at, inclusive.
+        :type end: datetime | None
+        :param count: The maximum number of fire times to yield.
+        :type count: int | None
+        :return: An iterator of fire times.
+        :rtype: Iterator[datetime]
+        """
+        if end is None and count is None:
+            raise ValueError("Either `end` or `count` must be given")
+
+        dt, emitted = start, 0
+        while count is None or emitted < count:
+            dt = self.next_fire_time(dt)
+            if end is not None and dt > end:
+                return
+            yield dt
+            emitted += 1
+
+
+@lru_cache(maxsize=1024)
+def compile_schedule(expression: str) -> CronSchedule:
+    """
+    Compile a cron expression, compiled schedules are cached.
+
+    :param expression: The cron expression.
+    :type expression: str
+    :return: The compiled schedule.
+    :rtype: CronSchedule
+    """
+    return CronSchedule(expression)
+
+
+class CompiledTriggerRule:
+    """
+    A trigger rule spec compiled for local evaluation.
+
+    Condition rules are compiled into a predicate over events, schedule rules
+    (a list of cron expressions) into a set of schedules.
+
+    :param spec: The trigger rule spec to compile.
+    :param name: An optional name to identify the rule by.
+    """
+    def __init__(
+        self,
+        spec: V1Alpha1TriggerRuleResourceSpec | dict,
+        name: str | None = None,
+    ) -> None:
+        self.spec: V1Alpha1TriggerRuleResourceSpec = (
+            validate_model(V1Alpha1TriggerRuleResourceSpec, spec)
+            if isinstance(spec, dict) else spec
+        )
+        spec = self.spec
+        self.name = name
+        self.type = V1Alpha1TriggerRuleType(spec.type or "condition")
+        self.predicate: Predicate | None = None
+        self.schedules: list[CronSchedule] = []
+
+        match self.type:
+            case V1Alpha1TriggerRuleType.condition:
+                if not isinstance(spec.rule, dict):
+                    raise ValueError("Condition rules must be a dictionary")
+                self.predicate = compile_condition(spec.rule)
+            case V1Alpha1TriggerRuleType.schedule:
+                rules = [spec.rule] if isinstance(spec.rule, str) else spec.rule
+                if not isinstance(rules, list):
+                    raise ValueError("Schedule rules must be a list of cron expressions")
+                self.schedules = [compile_schedule(rule) for rule in rules]
+
+    @classmethod
+    def from_resource(cls, resource: TriggerRuleReadResponse) -> CompiledTriggerRule:
+        return cls(resource.spec, name=resource.metadata.name)
+
+    def matches(self, event: dict) -> bool:
+        """
+        Check whether an event would fire this rule. Schedule rules never match events.
+        """
+        return self.predicate is not None and self.predicate(event)
+
+    def next_fire_time(self, after: datetime) -> datetime | None:
+        """
+        Get the next time this rule fires after `after`, or None for condition rules.
+        """
+        if not self.schedules:
+            return None
+        return min(schedule.next_fire_time(after) for schedule in self.schedules)
+
+    def fire_times(self, start: datetime, end: datetime) -> list[datetime]:
+        """
+        Get all the times this rule fires between `start` and `end`.
+        """
+        times: set[datetime] = set()
+        for schedule in self.schedules:
+            times.update(schedule.fire_times(start, end))
+        return sorted(times)
+
+
+def _compile_all(
+    triggers: Iterable[TriggerRuleReadResponse | CompiledTriggerRule],
+) -> list[CompiledTriggerRule]:
+    compiled = [
+        trigger if isinstance(trigger, CompiledTriggerRule)
+        else CompiledTriggerRule.from_resource(trigger)
+        for trigger in triggers
+    ]
+
+    # The results are keyed by name, rules without one would collide
+    names = [trigger.name for trigger in compiled]
+    if None in names:
+        raise ValueError("Trigger rules evaluated together must have a name")
+    if len(set(names)) != len(names):
+        raise ValueError("Trigger rules evaluated together must have unique names")
+
+    return compiled
+
+
+def match_events(
+    triggers: Iterable[TriggerRuleReadResponse | CompiledTriggerRule],
+    events: Iterable[dict],
+) -> dict[str, list[dict]]:
+    """
+    Evaluate a batch of events against a set of condition triggers.
+
+    :param triggers: The triggers to evaluate, as returned by `list_triggers`. Every
+        trigger must have a unique name.
+    :type triggers: Iterable[TriggerRuleReadResponse | CompiledTriggerRule]
+    :param events: The events to evaluate.
+    :type events: Iterable[dict]
+    :return: A mapping of trigger name to the events that would fire it.
+    :rtype: dict[str, list[dict]]
+    """
+    compiled = [
+        (str(trigger.name), trigger.predicate)
+        for trigger in _compile_all(triggers)
+        if trigger.predicate
+    ]
+    matches: dict[str, list[dict]] = {name: [] for name, _ in compiled}
+
+    for event in events:
+        for name, predicate in compiled:
+            if predicate(event):
+                matches[name].append(event)
+
+    return matches
+
+
+def dry_run_schedules(
+    triggers: Iterable[TriggerRuleReadResponse | CompiledTriggerRule],
+    start: datetime,
+    end: datetime,
+) -> dict[str, list[datetime]]:
+    """
+    Compute when each schedule trigger would fire between `start` and `end`.
+
+    :param triggers: The triggers to evaluate, as returned by `list_triggers`. Every
+        trigger must have a unique name.
+    :type triggers: Iterable[TriggerRuleReadResponse | CompiledTriggerRule]
+    :param start: The start of the window.
+    :type start: datetime
+    :param end: The end of the window, inclusive.
+    :type end: datetime
+    :return: A mapping of trigger name to its fire times.
+    :rtype: dict[str, list[datetime]]
+    """
+    return {
+        str(trigger.name): trigger.fire_times(start, end)
+        for trigger in _compile_all(triggers)
+        if trigger.schedules
+    }
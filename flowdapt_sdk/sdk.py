@@ -1,7 +1,20 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Callable, Optional
 
+from flowdapt_sdk.balancer import BalancingStrategy
+from flowdapt_sdk.batching import BatchPolicy
+from flowdapt_sdk.cache import ResponseCache
+from flowdapt_sdk.capabilities import CapabilityCache
 from flowdapt_sdk.client import APIClient
+from flowdapt_sdk.compression import Compression
+from flowdapt_sdk.decode import DecodePool
+from flowdapt_sdk.intern import Interner
+from flowdapt_sdk.ratelimit import RateLimiter
+from flowdapt_sdk.resilience import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    HedgingPolicy,
+)
 from flowdapt_sdk.api import (
     ConfigsAPI,
     TriggersAPI,
@@ -16,23 +29,84 @@ class FlowdaptSDK:
     """
     The FlowdaptSDK class is the main entry point for interacting with the Flowdapt API.
 
-    :param base_url: The base URL of the Flowdapt API.
+    :param base_url: The base URL of the Flowdapt API, or a list of base URLs of its replicas
+        to load balance requests over.
     :param verify_ssl: Whether to verify the SSL certificate of the Flowdapt API.
-    :param retries: The number of times to retry a request if it fails.
+    :param retries: The number of times to retry a request if it fails with a retryable error.
     :param timeout: The timeout for requests to the Flowdapt API.
+    :param circuit_breaker: A circuit breaker to fail fast on endpoint families
+        that keep failing.
+    :param concurrency_limiter: A limiter adapting the number of in-flight requests
+        to the observed latency of the Flowdapt API.
+    :param rate_limiter: A rate limiter queueing requests that exceed the configured budgets.
+    :param hedging: A policy for hedging GET requests that are slower than usual.
+    :param load_balancing: The strategy to balance requests over several base URLs with.
+    :param health_check_interval: Seconds between active health checks of every base URL,
+        None to only track health passively from request failures.
+    :param compression: The content encoding to compress request bodies with, if any.
+    :param compression_threshold: The size in bytes above which request bodies are compressed.
+    :param msgpack: Whether to prefer MessagePack over JSON responses.
+    :param cache: An on-disk cache to serve GET responses from, which can be shared by
+        every process on a host.
+    :param decode_pool: A pool of worker processes to decode and validate large responses in.
+    :param offload_threshold: The size in bytes from which responses are decoded and
+        validated in a thread instead of on the event loop, None to never offload.
+    :param blocking_hook: A function called with the name of an operation (`encode`,
+        `decode` or `intern`) and the seconds it blocked the event loop for, see also
+        `flowdapt_sdk.instrumentation.LoopLagMonitor`.
+    :param interner: An interner sharing equal strings and nested values between
+        decoded resources, to reduce the memory of large listings kept around.
+    :param capabilities: A cache of server capabilities. If set, the server is probed
+        on first use and requests use the API versions, compression and MessagePack
+        support it reports, see `flowdapt_sdk.capabilities`.
+    :param batching: Collect the `get_config` and `get_trigger` calls made within a short
+        window and send them as one request to the batch endpoint of the server, or
+        concurrently if it has none.
     """
     def __init__(
         self,
-        base_url: str,
+        base_url: str | list[str],
         verify_ssl: bool = True,
         retries: int = 3,
         timeout: Optional[float] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        load_balancing: BalancingStrategy | str = BalancingStrategy.round_robin,
+        health_check_interval: Optional[float] = None,
+        compression: Optional[Compression | str] = None,
+        compression_threshold: int = 1024,
+        msgpack: bool = False,
+        cache: Optional[ResponseCache] = None,
+        decode_pool: Optional[DecodePool] = None,
+        offload_threshold: Optional[int] = None,
+        blocking_hook: Optional[Callable[[str, float], None]] = None,
+        interner: Optional[Interner] = None,
+        capabilities: Optional[CapabilityCache] = None,
+        batching: Optional[BatchPolicy] = None,
     ) -> None:
         self.client = APIClient(
             base_url=base_url,
             verify_ssl=verify_ssl,
             retries=retries,
             timeout=timeout,
+            circuit_breaker=circuit_breaker,
+            concurrency_limiter=concurrency_limiter,
+            rate_limiter=rate_limiter,
+            hedging=hedging,
+            load_balancing=load_balancing,
+            health_check_interval=health_check_interval,
+            compression=compression,
+            compression_threshold=compression_threshold,
+            msgpack=msgpack,
+            cache=cache,
+            decode_pool=decode_pool,
+            offload_threshold=offload_threshold,
+            blocking_hook=blocking_hook,
+            interner=interner,
+            capabilities=capabilities,
+            batching=batching,
         )
 
         self.configs = ConfigsAPI(self.client)
@@ -1,9 +1,143 @@
 import orjson
-from typing import Any
+from decimal import Decimal
+from typing import Any, Callable
+from pydantic import BaseModel
+
+from flowdapt_sdk._compat import model_dump_json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+SerializeOptions = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+_serializers: dict[type, Callable[[Any], Any]] = {}
+_resolved: dict[type, Callable[[Any], Any] | None] = {}
+
+
+def register_serializer(type_: type, serializer: Callable[[Any], Any]) -> None:
+    """
+    Register how to serialize instances of a type orjson does not support natively.
+
+    The serializer must return a value orjson can serialize, it is also used for
+    subclasses of `type_` unless they have a serializer of their own.
+
+    :param type_: The type to register the serializer for.
+    :type type_: type
+    :param serializer: A callable converting an instance into a serializable value.
+    :type serializer: Callable[[Any], Any]
+    """
+    _serializers[type_] = serializer
+    _resolved.clear()
+
+
+def _resolve_serializer(type_: type) -> Callable[[Any], Any] | None:
+    try:
+        return _resolved[type_]
+    except KeyError:
+        serializer = next((_serializers[cls] for cls in type_.__mro__ if cls in _serializers), None)
+        _resolved[type_] = serializer
+        return serializer
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        # Embed the model's own JSON rather than converting it to a dict first
+        return orjson.Fragment(model_dump_json(obj))
+
+    serializer = _resolve_serializer(type(obj))
+    if serializer is None:
+        raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+    return serializer(obj)
+
+
+register_serializer(Decimal, str)
+register_serializer(set, list)
+register_serializer(frozenset, list)
 
 
 def serialize(data: Any) -> bytes:
-    return orjson.dumps(data)
+    return orjson.dumps(data, default=_default, option=SerializeOptions)
 
-def deserialize(data: bytes) -> Any:
+def deserialize(data: bytes | memoryview) -> Any:
     return orjson.loads(data)
+
+
+def _require_msgpack() -> None:
+    if msgpack is None:
+        raise ImportError(
+            "The `msgpack` package is required for MessagePack payloads, "
+            "install it with `pip install flowdapt_sdk[msgpack]`"
+        )
+
+
+def serialize_msgpack(data: Any) -> bytes:
+    _require_msgpack()
+    # Types msgpack does not know, e.g. datetimes and UUIDs, are passed
+    # through orjson's JSON representation
+    return msgpack.packb(data, default=lambda obj: orjson.loads(serialize(obj)))
+
+def deserialize_msgpack(data: bytes | memoryview) -> Any:
+    _require_msgpack()
+    return msgpack.unpackb(data, raw=False)
+
+
+def media_type(content_type: str) -> str:
+    """
+    Get the media type of a content type without its parameters, e.g.
+    `application/json` for `application/json; charset=utf-8`.
+    """
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def is_json(content_type: str) -> bool:
+    media = media_type(content_type)
+    return media == "application/json" or media.endswith("+json")
+
+
+def is_msgpack(content_type: str) -> bool:
+    media = media_type(content_type)
+    return media in ("application/msgpack", "application/x-msgpack") or media.endswith("+msgpack")
+
+
+def as_msgpack(content_type: str) -> str:
+    """
+    Get the MessagePack equivalent of a JSON content type, e.g.
+    `application/vnd.flowdapt.workflow.v1alpha1+msgpack` for
+    `application/vnd.flowdapt.workflow.v1alpha1+json`.
+    """
+    media = media_type(content_type)
+    if media == "application/json":
+        return "application/msgpack"
+    return media[:-len("+json")] + "+msgpack"
+
+
+def encode(data: Any, content_type: str) -> bytes:
+    """
+    Serialize `data` for the given content type.
+    """
+    if isinstance(data, bytes):
+        return data
+    elif is_msgpack(content_type):
+        return serialize_msgpack(data)
+    elif isinstance(data, str):
+        return data.encode("utf-8")
+    elif isinstance(data, BaseModel):
+        # Serialized by pydantic in a single pass, without building a dict first
+        return model_dump_json(data).encode("utf-8")
+    return serialize(data)
+
+def decode(data: bytes | memoryview, content_type: str) -> Any:
+    """
+    Deserialize `data` according to its content type, unknown content types are
+    returned as they are.
+    """
+    if is_json(content_type):
+        return deserialize(data) if data else None
+    elif is_msgpack(content_type):
+        return deserialize_msgpack(data) if data else None
+    elif media_type(content_type).startswith("text/"):
+        return str(data, "utf-8")
+    return data
@@ -1,7 +1,9 @@
-from typing import Iterable, Any
+from functools import lru_cache
+from typing import Iterable, Any, Mapping, NamedTuple
 from urllib.parse import urljoin, urlencode
 
-from flowdapt_sdk._compat import BaseModel, validate_model
+from flowdapt_sdk._compat import BaseModel, model_dump, validate_model
+from flowdapt_sdk.constants import APIVersionHeader
 from flowdapt_sdk.dto.base import BaseSchema
 
 
@@ -10,6 +12,11 @@ def build_version_header(resource_type: str, version: str) -> str:
 
 
 def build_accept_header(accepted_types: list[tuple[str, float]]) -> str:
+    return _build_accept_header(tuple(accepted_types))
+
+
+@lru_cache(maxsize=256)
+def _build_accept_header(accepted_types: tuple[tuple[str, float], ...]) -> str:
     accept_strings = []
     for content_type, quality in accepted_types:
         quality = f"; q={quality}" if quality < 1.0 else ""
@@ -17,15 +24,18 @@ def build_accept_header(accepted_types: list[tuple[str, float]]) -> str:
     return ", ".join(accept_strings)
 
 
+def build_path(path: str, params: dict | None = None) -> str:
+    params = {k: str(v) for k, v in (params or {}).items()}
+    return path.format(**params)
+
+
 def build_url(
     base_url: str,
     path: str,
     query: dict | None = None,
     params: dict | None = None,
 ) -> str:
-    params = {k: str(v) for k, v in (params or {}).items()}
-    path = path.format(**params)
-    url = urljoin(base_url, path)
+    url = urljoin(base_url, build_path(path, params))
 
     if query:
         query_parts = []
@@ -42,7 +52,9 @@ def build_url(
 
 
 def determine_content_type(body: Any) -> str:
-    if hasattr(body, "content_type"):
+    if isinstance(body, BaseSchema):
+        return body.__content_type__
+    elif hasattr(body, "content_type"):
         return body.content_type
     elif isinstance(body, bytes):
         return "application/octet-stream"
@@ -52,30 +64,137 @@ def determine_content_type(body: Any) -> str:
         return "text/plain"
 
 
-def get_latest_version(dto_map: dict[str, tuple]):
-    return list(dto_map.keys())[-1]
-
-
-def build_request_data(
-    dto_map: dict[str, tuple[BaseModel | None, BaseModel]],
-    data: Any | None = None,
-    version: str | None = None,
-) -> tuple[BaseModel, Any, str]:
-    if not version:
-        if data and isinstance(data, BaseSchema):
-            version = data.__version__
-        else:
-            version = get_latest_version(dto_map)
-
-    (request_dto, response_dto) = dto_map[version]
-
-    if data:
-        if isinstance(data, dict) and request_dto:
-            data = validate_model(request_dto, data)
-
-            if version and not data.__version__ == version:
+def _dropped_fields(data: Any, dumped: Any, path: str = "") -> set[str]:
+    # The keys of a payload that did not make it into the model validated from it
+    if isinstance(data, dict) and isinstance(dumped, dict):
+        dropped = set()
+        for key, value in data.items():
+            if key not in dumped:
+                dropped.add(f"{path}{key}")
+            else:
+                dropped |= _dropped_fields(value, dumped[key], f"{path}{key}.")
+        return dropped
+
+    if isinstance(data, list) and isinstance(dumped, list):
+        return set().union(*(
+            _dropped_fields(value, item, f"{path}{index}.")
+            for index, (value, item) in enumerate(zip(data, dumped))
+        ))
+
+    return set()
+
+
+def dropped_fields(data: dict, model: BaseModel) -> set[str]:
+    """
+    The fields of a payload, as dotted paths, that a model validated from it ignored.
+    """
+    # The payload may use field names or aliases
+    return _dropped_fields(
+        data, model_dump(model, exclude_unset=True, by_alias=True)
+    ) & _dropped_fields(
+        data, model_dump(model, exclude_unset=True, by_alias=False)
+    )
+
+
+class Negotiation(NamedTuple):
+    """
+    Everything a request needs for one version of an endpoint, computed once.
+
+    The headers and accepted types are shared by every request using the version
+    and must not be modified.
+    """
+    version: str
+    request_dto: type[BaseModel] | None
+    response_dto: type[BaseModel]
+    headers: dict[str, str]
+    accept: list[tuple[str, float]]
+
+
+class NegotiationTable:
+    """
+    The negotiations of all versions of an endpoint, built once from its DTO map
+    instead of on every call.
+
+    :param resource_type: The resource type sent in the version header.
+    :param dto_map: The request and response DTOs of every version, oldest first.
+    """
+    def __init__(
+        self,
+        resource_type: str,
+        dto_map: Mapping[str, tuple[type[BaseModel] | None, type[BaseModel]]],
+    ) -> None:
+        self.resource_type = resource_type
+        self.versions = tuple(dto_map)
+        self.latest = self.versions[-1]
+        self.entries = {
+            version: Negotiation(
+                version=version,
+                request_dto=request_dto,
+                response_dto=response_dto,
+                headers={APIVersionHeader: build_version_header(resource_type, version)},
+                accept=[(
+                    getattr(response_dto, "__content_type__", "application/json"), 1.0
+                )],
+            )
+            for version, (request_dto, response_dto) in dto_map.items()
+        }
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.resource_type!r}, versions={self.versions})"
+
+    def older(self, version: str) -> str | None:
+        """
+        The version before `version`, None if it is the oldest.
+        """
+        index = self.versions.index(version)
+        return self.versions[index - 1] if index else None
+
+    def pinned(self, data: Any = None, version: str | None = None) -> str | None:
+        """
+        The version requested explicitly, or by the model of the payload.
+        """
+        if version:
+            return version
+        if isinstance(data, BaseSchema):
+            return data.__version__
+        return None
+
+    def negotiate(
+        self,
+        data: Any = None,
+        version: str | None = None,
+        default: str | None = None,
+        lossless: bool = False,
+    ) -> tuple[Negotiation, Any]:
+        """
+        Pick the negotiation of a request and validate its payload.
+
+        :param data: The payload, dicts are validated into the request DTO of the version.
+        :type data: Any
+        :param version: The version to use, defaults to the version of the payload model,
+            then `default`, then the latest version.
+        :type version: str | None
+        :param default: The version to use when none is pinned, e.g. one negotiated
+            with the server.
+        :type default: str | None
+        :return: The negotiation and the payload.
+        :rtype: tuple[Negotiation, Any]
+        """
+        version = self.pinned(data, version) or default or self.latest
+        negotiation = self.entries[version]
+
+        if isinstance(data, dict) and negotiation.request_dto:
+            payload, data = data, validate_model(negotiation.request_dto, data)
+
+            if not data.__version__ == version:
                 raise ValueError(
                     f"Version mismatch in payload model: {data.__version__} != {version}"
                 )
 
-    return (response_dto, data, version)
+            if lossless and (dropped := dropped_fields(payload, data)):
+                raise ValueError(
+                    f"Payload fields not supported by version {version}: "
+                    f"{', '.join(sorted(dropped))}"
+                )
+
+        return negotiation, data
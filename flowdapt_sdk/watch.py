@@ -0,0 +1,153 @@
+from __future__ import annotations
+import asyncio
+import random
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, Hashable, TypeVar
+
+from flowdapt_sdk.errors import APIError, CircuitOpenError
+
+T = TypeVar("T")
+
+
+class WatchEventType(str, Enum):
+    added = "added"
+    modified = "modified"
+    deleted = "deleted"
+
+
+class WatchEvent(Generic[T]):
+    """
+    A change to a watched resource.
+
+    :param type: The type of change.
+    :param object: The resource after the change, or the last seen version if it was deleted.
+    """
+    def __init__(self, type: WatchEventType, object: T) -> None:
+        self.type = type
+        self.object = object
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(type={self.type.value}, object={self.object!r})"
+
+
+def resource_key(resource: Any) -> Hashable:
+    return resource.metadata.uid
+
+
+def resource_version(resource: Any) -> Hashable:
+    return resource.metadata.updated_at
+
+
+def run_key(run: Any) -> Hashable:
+    return run.uid
+
+
+def run_version(run: Any) -> Hashable:
+    # Runs have no `updated_at`, their state and finish time change as they progress
+    return (run.state, run.finished_at)
+
+
+class Watcher(Generic[T]):
+    """
+    An async iterator of changes to a collection of resources.
+
+    The Flowdapt API does not offer change streams, so the watcher polls a list
+    endpoint and diffs consecutive snapshots by key and version, yielding only the
+    resources that were added, modified or deleted since the last poll.
+
+    Polling is pull based: the next poll only happens once the consumer has handled
+    every event of the previous one, so a slow consumer is never buried under a
+    growing backlog and changes that happen in the meantime are coalesced. Retryable
+    errors and open circuits are retried with exponential backoff, the last snapshot
+    is kept so watching resumes after a reconnect without replaying events. The
+    snapshot can also be passed to a new watcher to resume from it.
+
+    :param list_fn: A coroutine function returning the current list of resources.
+    :param key: A function returning the unique key of a resource.
+    :param version: A function returning a value that changes whenever the resource does.
+    :param interval: Seconds to wait between polls.
+    :param initial: Whether to emit `added` events for the resources that exist on the first poll.
+    :param snapshot: A snapshot of a previous watcher to resume from.
+    :param max_backoff: The maximum number of seconds to wait between retries.
+    """
+    def __init__(
+        self,
+        list_fn: Callable[[], Awaitable[list[T]]],
+        key: Callable[[T], Hashable] = resource_key,
+        version: Callable[[T], Hashable] = resource_version,
+        interval: float = 1.0,
+        initial: bool = True,
+        snapshot: dict[Hashable, tuple[Hashable, T]] | None = None,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self.list_fn = list_fn
+        self.key = key
+        self.version = version
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.snapshot: dict[Hashable, tuple[Hashable, T]] = dict(snapshot or {})
+        self._synced = snapshot is not None or initial
+        self._stopped = False
+
+    def stop(self) -> None:
+        """
+        Stop watching, the iterator finishes after the current poll.
+        """
+        self._stopped = True
+
+    async def _poll(self) -> list[T]:
+        attempt = 0
+        while True:
+            try:
+                return await self.list_fn()
+            except APIError as e:
+                if not e.retryable and not isinstance(e, CircuitOpenError):
+                    raise
+
+                attempt += 1
+                delay = min(self.max_backoff, self.interval * 2 ** attempt)
+                await asyncio.sleep(random.uniform(delay / 2, delay))
+
+    def diff(self, resources: list[T]) -> list[WatchEvent[T]]:
+        """
+        Diff a list of resources against the current snapshot and update it.
+
+        :param resources: The current list of resources.
+        :type resources: list[T]
+        :return: The events describing the changes since the last snapshot.
+        :rtype: list[WatchEvent[T]]
+        """
+        events: list[WatchEvent[T]] = []
+        current: dict[Hashable, tuple[Hashable, T]] = {}
+
+        for resource in resources:
+            key, version = self.key(resource), self.version(resource)
+            current[key] = (version, resource)
+
+            previous = self.snapshot.get(key)
+            if previous is None:
+                events.append(WatchEvent(WatchEventType.added, resource))
+            elif previous[0] != version:
+                events.append(WatchEvent(WatchEventType.modified, resource))
+
+        for key, (_, resource) in self.snapshot.items():
+            if key not in current:
+                events.append(WatchEvent(WatchEventType.deleted, resource))
+
+        self.snapshot = current
+        return events
+
+    def __aiter__(self) -> AsyncIterator[WatchEvent[T]]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[WatchEvent[T]]:
+        while not self._stopped:
+            events = self.diff(await self._poll())
+
+            if self._synced:
+                for event in events:
+                    yield event
+            self._synced = True
+
+            if not self._stopped:
+                await asyncio.sleep(self.interval)
@@ -0,0 +1,22 @@
+import pytest
+
+from flowdapt_sdk.binary import ArrowStreamContentType, encode_binary, is_binary
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+
+
+def test_numpy_scalars_are_not_binary():
+    assert not is_binary(np.float64(1.5))
+    assert not is_binary(np.int64(1))
+    assert is_binary(np.arange(3))
+
+
+def test_only_arrow_tables_and_record_batches_are_binary():
+    assert is_binary(pa.table({"a": [1]}))
+    assert is_binary(pa.record_batch({"a": [1]}))
+    assert not is_binary(pa.array([1]))
+    assert not is_binary(pa.chunked_array([[1]]))
+
+    _, content_type = encode_binary(pa.record_batch({"a": [1]}))
+    assert content_type == ArrowStreamContentType
@@ -0,0 +1,22 @@
+from flowdapt_sdk.cache import ResponseCache
+
+
+def accessed_at(cache: ResponseCache, key: str) -> float:
+    (value,) = cache._connection.execute(
+        "SELECT accessed_at FROM responses WHERE key = ?", (key,)
+    ).fetchone()
+    return value
+
+
+def test_hits_only_record_access_once_per_granularity(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.db", access_granularity=60.0)
+    cache.set("key", "configs", 200, {}, b"body")
+    stored = accessed_at(cache, "key")
+
+    assert cache.get("key").body == b"body"
+    assert accessed_at(cache, "key") == stored
+
+    cache.access_granularity = 0.0
+    assert cache.get("key").body == b"body"
+    assert accessed_at(cache, "key") > stored
+    assert cache.hits == 2
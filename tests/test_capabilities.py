@@ -0,0 +1,50 @@
+import httpx
+
+from flowdapt_sdk.capabilities import CapabilityCache
+from flowdapt_sdk.client import APIClient
+from tests.utils import json_response, mock_transport
+
+
+async def test_failed_probe_is_cached():
+    requests = []
+
+    def handler(request):
+        requests.append(request.method)
+        if request.method == "OPTIONS":
+            raise httpx.ConnectError("refused")
+        return json_response([])
+
+    client = mock_transport(
+        APIClient("http://flowdapt.test/", capabilities=CapabilityCache()), handler
+    )
+
+    for _ in range(3):
+        await client.get("/workflows/")
+
+    assert requests == ["OPTIONS", "GET", "GET", "GET"]
+
+
+async def test_every_balanced_endpoint_is_probed():
+    def handler(request):
+        if request.method == "OPTIONS":
+            encodings = "gzip" if request.url.host == "old.flowdapt.test" else "gzip, zstd"
+            return json_response(
+                {"versions": {"config": ["v1alpha1", "v1alpha2"]}, "features": ["sse"]},
+                headers={"Accept-Encoding": encodings},
+            )
+        return json_response([])
+
+    client = mock_transport(
+        APIClient(
+            ["http://new.flowdapt.test/", "http://old.flowdapt.test/"],
+            capabilities=CapabilityCache(),
+        ),
+        handler,
+    )
+
+    capabilities = await client.server_capabilities()
+
+    assert capabilities.encodings == {"gzip"}
+    assert capabilities.sse
+    assert capabilities.version("config", ("v1alpha1", "v1alpha2")) == "v1alpha2"
+    assert client.capabilities.get("http://old.flowdapt.test/") is not None
@@ -0,0 +1,38 @@
+import httpx
+import pytest
+import zstandard
+
+from flowdapt_sdk.client import APIClient, StreamType
+from tests.utils import mock_transport
+
+
+def zstd_client(body: bytes) -> APIClient:
+    compressed = zstandard.ZstdCompressor().compress(body)
+
+    def handler(request):
+        assert "zstd" in request.headers["Accept-Encoding"]
+        return httpx.Response(
+            200,
+            content=compressed,
+            headers={"Content-Type": "application/octet-stream", "Content-Encoding": "zstd"},
+        )
+
+    return mock_transport(APIClient("http://flowdapt.test/", retries=0), handler)
+
+
+async def test_streamed_zstd_response_is_decoded():
+    body = b"plugin file contents " * 1000
+    client = zstd_client(body)
+
+    response = await client.get("/plugin/a/files/b", stream=True)
+
+    assert b"".join([chunk async for chunk in response.content]) == body
+
+
+@pytest.mark.parametrize("body", [b"first\nsecond\r\nthird", b"first\nsecond\n"])
+async def test_streamed_zstd_lines_are_decoded(body):
+    client = zstd_client(body)
+
+    response = await client.get("/events", stream=True, stream_type=StreamType.lines)
+
+    assert [line async for line in response.content] == body.decode().splitlines()
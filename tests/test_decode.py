@@ -0,0 +1,50 @@
+import subprocess
+import sys
+import textwrap
+
+
+def test_pooled_decode_leaves_resource_tracker_quiet():
+    # The resource tracker runs in its own process and reports to stderr, so the
+    # pool is exercised in a fresh interpreter whose output can be inspected
+    script = textwrap.dedent(
+        """
+        import asyncio
+        import orjson
+
+        from flowdapt_sdk.decode import DecodePool
+        from flowdapt_sdk.dto import V1Alpha1WorkflowRunReadResponse
+
+        run = {
+            "uid": "00000000-0000-0000-0000-000000000001",
+            "name": "run",
+            "workflow": "workflow",
+            "started_at": "2024-01-01T00:00:00",
+            "state": "finished",
+        }
+
+        async def main():
+            pool = DecodePool(max_workers=1, threshold=0)
+            try:
+                for _ in range(3):
+                    runs = await pool.validate(
+                        orjson.dumps([run] * 10),
+                        "application/json",
+                        V1Alpha1WorkflowRunReadResponse,
+                        many=True,
+                    )
+                    assert len(runs) == 10
+            finally:
+                pool.shutdown()
+
+        if __name__ == "__main__":
+            asyncio.run(main())
+        """
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, timeout=120
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "KeyError" not in result.stderr
+    assert "leaked shared_memory" not in result.stderr
@@ -0,0 +1,36 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+from flowdapt_sdk.intern import Interner
+
+
+def test_equal_values_are_shared():
+    interner = Interner()
+    first, second = interner.intern([{"a": ["x", 1]}, {"a": ["x", 1]}])
+
+    assert first is second
+    assert first["a"] is second["a"]
+
+
+def test_equal_but_different_values_are_kept_apart():
+    interner = Interner()
+    utc = datetime(2023, 1, 1, 12, tzinfo=timezone.utc)
+    paris = utc.astimezone(timezone(timedelta(hours=1)))
+
+    values = interner.intern([{"at": utc}, {"at": paris}, 0.0, -0.0, 1, True, 1.0])
+
+    assert values[0]["at"].tzinfo is timezone.utc
+    assert values[1]["at"].utcoffset() == timedelta(hours=1)
+    assert math.copysign(1, values[3]) == -1
+    assert [type(value) for value in values[4:]] == [int, bool, float]
+
+
+def test_nan_does_not_grow_the_table():
+    interner = Interner()
+    interner.intern([float("nan")])
+    size = len(interner)
+
+    for _ in range(3):
+        interner.intern([float("nan")])
+
+    assert len(interner) == size
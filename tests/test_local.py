@@ -0,0 +1,64 @@
+import time
+
+from flowdapt_sdk.local import LocalExecutor
+
+
+def slow():
+    time.sleep(1.0)
+    return "slow"
+
+
+def fail():
+    raise RuntimeError("stage failed")
+
+
+async def test_failed_stage_does_not_wait_for_siblings():
+    workflow = {
+        "metadata": {"name": "failing"},
+        "spec": {
+            "stages": [
+                {"name": "slow", "target": "tests.test_local.slow"},
+                {"name": "fail", "target": "tests.test_local.fail"},
+            ]
+        },
+    }
+
+    start = time.monotonic()
+    run = await LocalExecutor(max_workers=2).run(workflow)
+
+    assert run.state == "failed"
+    assert "stage failed" in run.result
+    assert time.monotonic() - start < 0.5
+
+
+def numbers():
+    return [1, 2, 3, 4]
+
+
+def slow_square(x):
+    time.sleep(0.2)
+    return x * x
+
+
+async def test_parameterized_items_run_in_parallel():
+    workflow = {
+        "metadata": {"name": "fan-out"},
+        "spec": {
+            "stages": [
+                {"name": "numbers", "target": "tests.test_local.numbers"},
+                {
+                    "name": "square",
+                    "target": "tests.test_local.slow_square",
+                    "type": "parameterized",
+                    "depends_on": ["numbers"],
+                },
+            ]
+        },
+    }
+
+    start = time.monotonic()
+    run = await LocalExecutor(max_workers=4).run(workflow)
+
+    assert run.state == "finished"
+    assert run.result == [1, 4, 9, 16]
+    assert time.monotonic() - start < 0.6
@@ -0,0 +1,92 @@
+from typing import ClassVar
+
+import pytest
+
+from flowdapt_sdk.api.base import BaseAPI
+from flowdapt_sdk.client import APIClient
+from flowdapt_sdk.constants import APIVersionHeader
+from flowdapt_sdk.dto.base import BaseSchema
+from flowdapt_sdk.errors import UnsupportedVersionError
+from flowdapt_sdk.utils import NegotiationTable
+from tests.utils import json_response, mock_transport
+
+
+class V1Spec(BaseSchema):
+    old: int
+
+
+class V2Spec(V1Spec):
+    new: int = 0
+
+
+class V1Resource(BaseSchema):
+    name: str
+    spec: V1Spec
+
+
+class V2Resource(BaseSchema):
+    __version__: ClassVar[str] = "v2"
+
+    name: str
+    spec: V2Spec
+
+
+ResourceTable = NegotiationTable(
+    "resource",
+    {"v1alpha1": (V1Resource, V1Resource), "v2": (V2Resource, V2Resource)},
+)
+
+
+def old_server(requests: list):
+    def handler(request):
+        requests.append(request)
+        if request.headers[APIVersionHeader] != "resource.v1alpha1":
+            return json_response({"detail": "Unsupported version"}, 406)
+        return json_response({"name": "test", "spec": {"old": 1}})
+
+    return handler
+
+
+async def test_payload_without_newer_fields_is_downgraded():
+    requests = []
+    client = mock_transport(APIClient("http://flowdapt.test/"), old_server(requests))
+
+    _, negotiation = await BaseAPI(client).request(
+        "POST", ResourceTable, "/resources/", data={"name": "test", "spec": {"old": 1}}
+    )
+
+    assert negotiation.version == "v1alpha1"
+    assert len(requests) == 2
+    assert client.negotiated_versions[ResourceTable] == "v1alpha1"
+
+
+async def test_payload_with_newer_fields_is_not_downgraded():
+    requests = []
+    client = mock_transport(APIClient("http://flowdapt.test/"), old_server(requests))
+
+    with pytest.raises(UnsupportedVersionError) as info:
+        await BaseAPI(client).request(
+            "POST", ResourceTable, "/resources/", data={"name": "test", "spec": {"old": 1, "new": 2}}
+        )
+
+    assert "spec.new" in str(info.value.__cause__)
+    assert len(requests) == 1
+    assert ResourceTable not in client.negotiated_versions
+
+
+async def test_payload_with_newer_fields_is_not_truncated_after_downgrade():
+    requests = []
+    client = mock_transport(APIClient("http://flowdapt.test/"), old_server(requests))
+    api = BaseAPI(client)
+
+    await api.request("POST", ResourceTable, "/resources/", data={"name": "test", "spec": {"old": 1}})
+    assert client.negotiated_versions[ResourceTable] == "v1alpha1"
+
+    with pytest.raises(UnsupportedVersionError):
+        await api.request(
+            "POST", ResourceTable, "/resources/", data={"name": "test", "spec": {"old": 1, "new": 2}}
+        )
+
+    assert len(requests) == 3
+    assert requests[-1].headers[APIVersionHeader] == "resource.v2"
+    assert b'"new":2' in requests[-1].content.replace(b" ", b"")
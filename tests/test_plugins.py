@@ -0,0 +1,61 @@
+import httpx
+import pytest
+
+from flowdapt_sdk.errors import APIConnectionError
+from tests.utils import json_response, mock_sdk
+
+CONTENT = bytes(range(256)) * 400
+
+
+def file_server(requests: list, fail_after: int | None = None):
+    async def interrupted(body: bytes):
+        yield body[:fail_after]
+        raise httpx.ReadError("connection reset")
+
+    def handler(request):
+        if request.url.path == "/plugin/demo/files":
+            return json_response({"files": ["model.bin"]})
+
+        requests.append(request)
+        headers = {"Content-Type": "application/octet-stream", "ETag": '"v1"'}
+
+        if "Range" in request.headers and request.headers.get("If-Range") == '"v1"':
+            start = int(request.headers["Range"].removeprefix("bytes=").rstrip("-"))
+            headers["Content-Range"] = f"bytes {start}-{len(CONTENT) - 1}/{len(CONTENT)}"
+            return httpx.Response(206, content=CONTENT[start:], headers=headers)
+
+        if fail_after is not None:
+            return httpx.Response(200, content=interrupted(CONTENT), headers=headers)
+        return httpx.Response(200, content=CONTENT, headers=headers)
+
+    return handler
+
+
+async def test_interrupted_download_is_resumed(tmp_path):
+    requests = []
+    cache_dir = tmp_path / "cache"
+
+    sdk = mock_sdk(file_server(requests, fail_after=len(CONTENT) // 3), retries=0)
+    with pytest.raises(APIConnectionError):
+        await sdk.plugins.sync_plugin("demo", tmp_path / "dest", cache_dir=cache_dir)
+
+    # What arrived before the interruption was written to disk
+    partials = list((cache_dir / "partial").iterdir())
+    assert any(path.stat().st_size == len(CONTENT) // 3 for path in partials)
+
+    sdk = mock_sdk(file_server(requests), retries=0)
+    result = await sdk.plugins.sync_plugin("demo", tmp_path / "dest", cache_dir=cache_dir)
+
+    assert requests[-1].headers["Range"] == f"bytes={len(CONTENT) // 3}-"
+    assert requests[-1].headers["Accept-Encoding"] == "identity"
+    assert result.downloaded == ["model.bin"]
+    assert (tmp_path / "dest" / "model.bin").read_bytes() == CONTENT
+
+
+async def test_mirrored_objects_are_read_only(tmp_path):
+    sdk = mock_sdk(file_server([]), retries=0)
+    await sdk.plugins.sync_plugin("demo", tmp_path / "dest", cache_dir=tmp_path / "cache")
+
+    target = tmp_path / "dest" / "model.bin"
+    assert target.read_bytes() == CONTENT
+    assert not target.stat().st_mode & 0o222
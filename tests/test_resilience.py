@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from flowdapt_sdk.client import APIClient
+from flowdapt_sdk.errors import ServiceUnavailableError
+from flowdapt_sdk.resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, CircuitState
+from tests.utils import json_response, mock_transport
+
+
+def half_open_client(handler) -> APIClient:
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.01)
+    return mock_transport(APIClient("http://flowdapt.test/", retries=0, circuit_breaker=breaker), handler)
+
+
+async def open_circuit(client: APIClient) -> None:
+    with pytest.raises(ServiceUnavailableError):
+        await client.get("/workflows/")
+    await asyncio.sleep(0.02)
+    assert client.circuit_breaker.state("workflows") == CircuitState.half_open
+
+
+async def test_cancelled_half_open_trial_releases_its_slot():
+    outcomes = [json_response({"detail": "down"}, 503), "hang", json_response([])]
+
+    async def handler(request):
+        outcome = outcomes.pop(0)
+        if outcome == "hang":
+            await asyncio.sleep(10)
+        return outcome
+
+    client = half_open_client(handler)
+    await open_circuit(client)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(client.get("/workflows/"), timeout=0.01)
+
+    response = await client.get("/workflows/")
+    assert response.status_code == 200
+    assert client.circuit_breaker.state("workflows") == CircuitState.closed
+
+
+async def test_unexpected_error_in_half_open_trial_releases_its_slot():
+    outcomes = [json_response({"detail": "down"}, 503), ValueError("boom"), json_response([])]
+
+    def handler(request):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    client = half_open_client(handler)
+    await open_circuit(client)
+
+    with pytest.raises(ValueError):
+        await client.get("/workflows/")
+
+    response = await client.get("/workflows/")
+    assert response.status_code == 200
+
+
+def test_limiter_baselines_are_kept_per_kind_of_request():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=20)
+
+    for _ in range(200):
+        limiter.in_flight += 2
+        limiter.release(latency=0.005, key="GET workflows")
+        limiter.release(latency=2.0, key="POST workflows")
+
+    assert limiter.limit > 20
+    assert limiter.no_load_latency("GET workflows") == 0.005
+    assert limiter.no_load_latency("POST workflows") == 2.0
+
+
+async def test_long_polls_do_not_lower_the_limit():
+    async def handler(request):
+        if request.url.path.endswith("/run"):
+            await asyncio.sleep(0.05)
+        return json_response({})
+
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=20)
+    client = mock_transport(
+        APIClient("http://flowdapt.test/", retries=0, concurrency_limiter=limiter), handler
+    )
+
+    # Creating workflows is fast, running them in the same family is not
+    for _ in range(5):
+        await client.post("/workflows/", body={})
+    limit = limiter.limit
+
+    for _ in range(5):
+        await client.request("POST", "/workflows/a/run", long_poll=True)
+
+    assert limiter.limit >= limit
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from tests.utils import json_response, mock_sdk
+
+
+def workflow_runs(count: int, state: str = "finished") -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "uid": str(uuid4()),
+            "name": f"run-{i}",
+            "workflow": "test",
+            "started_at": (now - timedelta(minutes=i + 1)).isoformat(),
+            "finished_at": (now - timedelta(minutes=i)).isoformat() if state == "finished" else None,
+            "result": None,
+            "state": state,
+        }
+        for i in range(count)
+    ]
+
+
+def runs_server(runs: list[dict]):
+    def handler(request):
+        if request.method == "DELETE":
+            uid = request.url.path.rsplit("/", 1)[-1]
+            run = next(run for run in runs if run["uid"] == uid)
+            runs.remove(run)
+            return json_response(run)
+
+        return json_response(runs[:int(request.url.params["limit"])])
+
+    return handler
+
+
+async def test_cleanup_reaches_runs_past_the_first_listing():
+    runs = workflow_runs(25)
+    sdk = mock_sdk(runs_server(runs))
+
+    report = await sdk.workflows.cleanup_workflow_runs("test", limit=10)
+
+    assert len(report.deleted) == 25
+    assert not runs
+    assert not report.more
+
+
+async def test_cleanup_says_when_older_runs_were_not_reached():
+    runs = workflow_runs(10, state="running") + workflow_runs(5)
+    sdk = mock_sdk(runs_server(runs))
+
+    report = await sdk.workflows.cleanup_workflow_runs("test", limit=10)
+
+    assert report.total == 0
+    assert report.more
+    assert len(runs) == 15
@@ -0,0 +1,144 @@
+from datetime import datetime
+
+import pytest
+
+from flowdapt_sdk.rules import (
+    CompiledTriggerRule,
+    CronSchedule,
+    compile_condition,
+    dry_run_schedules,
+    match_events,
+)
+
+
+@pytest.mark.parametrize(
+    "rule, event, expected",
+    [
+        ({"==": [{"var": "type"}, "ingest"]}, {"type": "ingest"}, True),
+        ({"!=": [{"var": "type"}, "ingest"]}, {"type": "ingest"}, False),
+        ({">": [{"var": "size"}, 10]}, {"size": 11}, True),
+        ({">": [{"var": "size"}, 10]}, {"size": "big"}, False),
+        ({"<": [1, {"var": "size"}, 10]}, {"size": 5}, True),
+        ({"<=": [1, {"var": "size"}, 10]}, {"size": 11}, False),
+        ({"var": "a.b.0"}, {"a": {"b": [True]}}, True),
+        ({"var": ["missing", True]}, {}, True),
+        ({"and": [{"var": "a"}, {"var": "b"}]}, {"a": 1, "b": 0}, False),
+        ({"or": [{"var": "a"}, {"var": "b"}]}, {"a": 0, "b": 1}, True),
+        ({"!": {"var": "a"}}, {"a": []}, True),
+        ({"!!": {"var": "a"}}, {"a": [1]}, True),
+        ({"if": [{"var": "a"}, False, True]}, {"a": 0}, True),
+        ({"in": [{"var": "tag"}, ["a", "b"]]}, {"tag": "b"}, True),
+        ({"in": ["ing", {"var": "type"}]}, {"type": "ingest"}, True),
+        ({"in": ["a", {"var": "none"}]}, {}, False),
+        ({"missing": ["a", "b"]}, {"a": 1}, True),
+        ({"==": [{"+": [1, {"var": "x"}]}, 3]}, {"x": "2"}, True),
+        ({"==": [{"-": [{"var": "x"}]}, -2]}, {"x": 2}, True),
+        ({"==": [{"*": [2, 3]}, 6]}, {}, True),
+        ({"==": [{"/": [{"var": "x"}, 2]}, 2]}, {"x": 4}, True),
+        ({"==": [{"%": [{"var": "x"}, 3]}, 1]}, {"x": 7}, True),
+        ({"==": [{"max": [1, {"var": "x"}]}, 5]}, {"x": 5}, True),
+        ({"==": [{"cat": ["a", {"var": "x"}]}, "a1"]}, {"x": 1}, True),
+    ],
+)
+def test_condition_operators(rule, event, expected):
+    assert compile_condition(rule)(event) is expected
+
+
+@pytest.mark.parametrize("operator", ["/", "%"])
+def test_division_by_zero_does_not_match(operator):
+    predicate = compile_condition({">": [{operator: [{"var": "x"}, {"var": "y"}]}, 0]})
+
+    assert predicate({"x": 1, "y": 0}) is False
+    assert predicate({"x": 1, "y": 1}) is not None
+
+
+def test_unsupported_operator_is_rejected():
+    with pytest.raises(ValueError):
+        compile_condition({"regex": ["a", "b"]})
+
+
+def fires(expression: str, start: datetime, count: int = 3) -> list[datetime]:
+    return list(CronSchedule(expression).fire_times(start, count=count))
+
+
+def test_day_of_month_or_day_of_week_when_both_are_restricted():
+    # 2023-01-01 is a Sunday, the rule fires on every 13th and on every Friday
+    assert fires("0 0 13 * fri", datetime(2023, 1, 1)) == [
+        datetime(2023, 1, 6),
+        datetime(2023, 1, 13),
+        datetime(2023, 1, 20),
+    ]
+
+
+def test_day_of_month_and_day_of_week_when_one_is_unrestricted():
+    assert fires("0 0 13 * *", datetime(2023, 1, 1), 2) == [
+        datetime(2023, 1, 13),
+        datetime(2023, 2, 13),
+    ]
+    assert fires("0 0 * * 5", datetime(2023, 1, 1), 2) == [
+        datetime(2023, 1, 6),
+        datetime(2023, 1, 13),
+    ]
+
+
+def test_ranges_and_steps():
+    # Friday evening, the next fire is Monday morning
+    assert fires("*/15 9-10 * * mon-fri", datetime(2023, 1, 6, 10, 50)) == [
+        datetime(2023, 1, 9, 9, 0),
+        datetime(2023, 1, 9, 9, 15),
+        datetime(2023, 1, 9, 9, 30),
+    ]
+    assert fires("5-20/5 0 1 1 *", datetime(2023, 1, 1), 5) == [
+        datetime(2023, 1, 1, 0, 5),
+        datetime(2023, 1, 1, 0, 10),
+        datetime(2023, 1, 1, 0, 15),
+        datetime(2023, 1, 1, 0, 20),
+        datetime(2024, 1, 1, 0, 5),
+    ]
+
+
+def test_sunday_is_0_and_7():
+    assert CronSchedule("0 0 * * 7").weekdays.values == CronSchedule("0 0 * * 0").weekdays.values
+
+
+def test_aliases_and_fire_time_window():
+    assert list(CronSchedule("@daily").fire_times(datetime(2023, 1, 1), datetime(2023, 1, 3))) == [
+        datetime(2023, 1, 2),
+        datetime(2023, 1, 3),
+    ]
+
+
+@pytest.mark.parametrize("expression", ["* * *", "60 * * * *", "* * 0 * *", "5-1 * * * *"])
+def test_invalid_cron_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def trigger(type: str, rule, name: str | None = None) -> CompiledTriggerRule:
+    return CompiledTriggerRule(
+        {"type": type, "rule": rule, "action": {"target": "run_workflow"}}, name=name
+    )
+
+
+def test_match_events():
+    ingest = trigger("condition", {"==": [{"var": "type"}, "ingest"]}, "ingest")
+    ratio = trigger("condition", {">": [{"/": [{"var": "a"}, {"var": "b"}]}, 1]}, "ratio")
+    nightly = trigger("schedule", ["0 0 * * *"], "nightly")
+    events = [{"type": "ingest", "a": 1, "b": 0}, {"type": "other", "a": 2, "b": 1}]
+
+    assert match_events([ingest, ratio, nightly], events) == {
+        "ingest": [events[0]],
+        "ratio": [events[1]],
+    }
+    assert dry_run_schedules(
+        [ingest, nightly], datetime(2023, 1, 1), datetime(2023, 1, 2)
+    ) == {"nightly": [datetime(2023, 1, 2)]}
+
+
+def test_match_events_requires_unique_names():
+    rule = {"==": [1, 1]}
+
+    with pytest.raises(ValueError, match="must have a name"):
+        match_events([trigger("condition", rule), trigger("condition", rule)], [{}])
+    with pytest.raises(ValueError, match="unique names"):
+        match_events([trigger("condition", rule, "a"), trigger("condition", rule, "a")], [{}])
@@ -0,0 +1,31 @@
+import httpx
+import orjson
+
+from flowdapt_sdk.client import APIClient
+from flowdapt_sdk.sdk import FlowdaptSDK
+
+
+def mock_transport(client: APIClient, handler) -> APIClient:
+    """
+    Send the requests of `client` to `handler` instead of the network.
+    """
+    client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        base_url=client.base_url,
+        headers=client._client.headers,
+    )
+    return client
+
+
+def mock_sdk(handler, **kwargs) -> FlowdaptSDK:
+    sdk = FlowdaptSDK("http://flowdapt.test/", **kwargs)
+    mock_transport(sdk.client, handler)
+    return sdk
+
+
+def json_response(data, status_code: int = 200, headers: dict | None = None) -> httpx.Response:
+    return httpx.Response(
+        status_code,
+        content=orjson.dumps(data),
+        headers={"Content-Type": "application/json", **(headers or {})},
+    )